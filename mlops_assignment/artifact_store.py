@@ -0,0 +1,300 @@
+import copy
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+from urllib.parse import unquote, urlparse
+import weakref
+
+import joblib
+from loguru import logger
+import typer
+
+from mlops_assignment.config import (
+    ARTIFACT_STORE_DIR,
+    MLFLOW_ARTIFACTS_DIR,
+    MLFLOW_TRACKING_URI,
+    PROJ_ROOT,
+)
+
+app = typer.Typer()
+
+# The notebook registers the finalized lung cancer pipeline under this name.
+REGISTERED_MODELS = ["LungCancerPredictionModel"]
+
+# Loaded blobs by digest, shared by every pipeline assembled in this process
+# and dropped once no pipeline uses them.
+_blobs = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+def local_artifact_dir(artifact_uri: str) -> Path | None:
+    """Local directory behind an MLflow artifact URI, if it is stored on this machine."""
+    parsed = urlparse(artifact_uri)
+    if parsed.scheme == "mlflow-artifacts":
+        return MLFLOW_ARTIFACTS_DIR / unquote(parsed.path).lstrip("/")
+    if parsed.scheme in ("", "file"):
+        return Path(unquote(parsed.path))
+    return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+        handle.write(data)
+    os.replace(handle.name, path)
+
+
+def _blob_path(digest: str, store: Path) -> Path:
+    return store / "blobs" / digest[:2] / f"{digest}.joblib"
+
+
+def put_blob(obj, store: Path = ARTIFACT_STORE_DIR) -> str:
+    """Store `obj` once under the SHA-256 of its joblib serialization and return the digest."""
+    buffer = io.BytesIO()
+    # Uncompressed, so NumPy arrays in the blob can be memory-mapped on load.
+    joblib.dump(obj, buffer)
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest, store)
+    if not path.exists():
+        _write_atomic(path, data)
+    return digest
+
+
+def load_blob(digest: str, store: Path = ARTIFACT_STORE_DIR):
+    """Return the object stored under `digest`, loading it only if no pipeline holds it yet."""
+    key = (str(store), digest)
+    obj = _blobs.get(key)
+    if obj is not None:
+        return obj
+    with _lock:
+        obj = _blobs.get(key)
+        if obj is None:
+            obj = joblib.load(_blob_path(digest, store), mmap_mode="r")
+            try:
+                _blobs[key] = obj
+            except TypeError:
+                # Not every object supports weak references; those are not shared.
+                pass
+    return obj
+
+
+def put(model, store: Path = ARTIFACT_STORE_DIR) -> str:
+    """
+    Split `model` into per-step blobs and return the digest of its manifest.
+
+    A pipeline is stored as a shell, the pipeline with its steps removed, plus
+    one blob per step, so fitted transformers shared by many pipelines are
+    stored once. Anything else is stored as a single blob.
+    """
+    steps = getattr(model, "steps", None)
+    if steps is None:
+        manifest = {"shell": put_blob(model, store), "steps": None}
+    else:
+        shell = copy.copy(model)
+        shell.steps = [(name, None) for name, _ in steps]
+        manifest = {
+            "shell": put_blob(shell, store),
+            "steps": [[name, put_blob(step, store)] for name, step in steps],
+        }
+
+    data = json.dumps(manifest, sort_keys=True).encode()
+    digest = hashlib.sha256(data).hexdigest()
+    path = store / "manifests" / f"{digest}.json"
+    if not path.exists():
+        _write_atomic(path, data)
+    return digest
+
+
+def assemble(manifest_digest: str, store: Path = ARTIFACT_STORE_DIR):
+    """Rebuild the model stored under `manifest_digest` from its step blobs."""
+    manifest = json.loads((store / "manifests" / f"{manifest_digest}.json").read_text())
+    shell = load_blob(manifest["shell"], store)
+    if manifest["steps"] is None:
+        return shell
+    model = copy.copy(shell)
+    model.steps = [(name, load_blob(digest, store)) for name, digest in manifest["steps"]]
+    return model
+
+
+def _source_key(path: Path) -> str:
+    path = Path(path).resolve()
+    return path.relative_to(PROJ_ROOT).as_posix() if path.is_relative_to(PROJ_ROOT) else str(path)
+
+
+def _read_refs(store: Path) -> dict:
+    refs_path = store / "refs.json"
+    return json.loads(refs_path.read_text()) if refs_path.exists() else {}
+
+
+def _write_refs(refs: dict, store: Path) -> None:
+    _write_atomic(store / "refs.json", json.dumps(refs, indent=1, sort_keys=True).encode())
+
+
+def lookup(path: Path, store: Path = ARTIFACT_STORE_DIR) -> str | None:
+    """
+    Return the manifest digest recorded for the pickle at `path`.
+
+    Returns None if `path` was never ingested or has changed since. A
+    ref whose pickle has been deleted is still valid.
+    """
+    ref = _read_refs(store).get(_source_key(path))
+    if ref is None:
+        return None
+    if Path(path).exists():
+        stat = Path(path).stat()
+        if (stat.st_size, stat.st_mtime_ns) != (ref["size"], ref["mtime_ns"]):
+            return None
+    return ref["manifest"]
+
+
+def load(path: Path, store: Path = ARTIFACT_STORE_DIR):
+    """Load the pickle at `path` from the store, or return None if it is not stored."""
+    digest = lookup(path, store)
+    return None if digest is None else assemble(digest, store)
+
+
+def ingest(paths: list[Path], store: Path = ARTIFACT_STORE_DIR) -> dict[str, str]:
+    """
+    Store the pickles at `paths` and record which manifest each one maps to.
+
+    Pickles that cannot be loaded here, for example because a model's
+    library is not installed, are skipped with a warning.
+
+    Returns
+    -------
+    dict
+        `{source key: manifest digest}` for the pickles stored.
+    """
+    refs = _read_refs(store)
+    stored = {}
+    for path in paths:
+        path = Path(path)
+        try:
+            model = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        stat = path.stat()
+        key = _source_key(path)
+        refs[key] = {
+            "manifest": put(model, store),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        stored[key] = refs[key]["manifest"]
+    _write_refs(refs, store)
+    return stored
+
+
+def collect_garbage(store: Path = ARTIFACT_STORE_DIR) -> int:
+    """Delete manifests and blobs that no ref reaches; return the number of files removed."""
+    manifests = {ref["manifest"] for ref in _read_refs(store).values()}
+    blobs = set()
+    for digest in manifests:
+        manifest = json.loads((store / "manifests" / f"{digest}.json").read_text())
+        blobs.add(manifest["shell"])
+        blobs.update(blob for _, blob in manifest["steps"] or [])
+
+    removed = 0
+    for path in list(store.glob("manifests/*.json")) + list(store.glob("blobs/*/*.joblib")):
+        if path.name.split(".")[0] not in manifests | blobs:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def registered_model_path(name: str, version: str = "latest") -> Path | None:
+    """
+    Local `model.pkl` of version `version` of the MLflow registered model `name`.
+
+    Returns None if the registry has no such version or its artifacts are
+    not stored on this machine.
+    """
+    from mlflow import MlflowClient
+    from mlflow.exceptions import MlflowException
+
+    client = MlflowClient(MLFLOW_TRACKING_URI)
+    try:
+        if version == "latest":
+            versions = client.search_model_versions(f"name = '{name}'")
+            if not versions:
+                return None
+            version = str(max(int(v.version) for v in versions))
+        source = client.get_model_version(name, version).source
+        if source.startswith("runs:/"):
+            run_id, _, artifact_path = source[len("runs:/") :].partition("/")
+            source = f"{client.get_run(run_id).info.artifact_uri}/{artifact_path}"
+    except MlflowException as e:
+        logger.warning(f"Cannot resolve {name} version {version}: {e}")
+        return None
+    model_dir = local_artifact_dir(source)
+    return None if model_dir is None else model_dir / "model.pkl"
+
+
+def load_registered(name: str, version: str = "latest", store: Path = ARTIFACT_STORE_DIR):
+    """
+    Load a version of an MLflow registered model, from the store if it was ingested.
+
+    Falls back to `mlflow.sklearn.load_model` for versions that are not
+    in the store.
+    """
+    path = registered_model_path(name, version)
+    model = None if path is None else load(path, store)
+    if model is None:
+        import mlflow.sklearn
+
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        model = mlflow.sklearn.load_model(f"models:/{name}/{version}")
+    return model
+
+
+def default_sources(registered: list[str] = REGISTERED_MODELS) -> list[Path]:
+    """The served pipelines, every pickle under `mlartifacts/` and the registered versions."""
+    from mlops_assignment.registry import MODEL_PATHS
+
+    paths = list(MODEL_PATHS.values()) + sorted(MLFLOW_ARTIFACTS_DIR.rglob("*.pkl"))
+    for name in registered:
+        path = registered_model_path(name)
+        if path is not None and path not in paths:
+            paths.append(path)
+    return [path for path in paths if path.exists()]
+
+
+def _disk_usage(paths: list[Path]) -> int:
+    return sum(path.stat().st_size for path in paths if path.is_file())
+
+
+@app.command()
+def main(
+    paths: list[Path] = typer.Argument(None, help="Pickles to store. Defaults to all known."),
+    store: Path = ARTIFACT_STORE_DIR,
+):
+    """
+    Store saved pipelines as deduplicated per-step blobs.
+
+    By default this ingests `models/*.pkl`, every pickle under `mlartifacts/`
+    and the latest `LungCancerPredictionModel` version. The pickles
+    themselves are left in place; `registry.load` and `load_registered`
+    read from the store while a pickle is unchanged.
+    """
+    paths = paths or default_sources()
+    stored = ingest(paths, store)
+    removed = collect_garbage(store)
+
+    source_bytes = _disk_usage([PROJ_ROOT / key for key in stored])
+    store_bytes = _disk_usage(list(store.rglob("*")))
+    logger.info(
+        f"{len(stored)} pickles, {source_bytes / 2**20:,.1f} MiB -> "
+        f"{len(list(store.glob('blobs/*/*')))} blobs, {store_bytes / 2**20:,.1f} MiB "
+        f"({removed} unreferenced files removed)"
+    )
+    logger.success("Artifact store ingest complete.")
+
+
+if __name__ == "__main__":
+    app()
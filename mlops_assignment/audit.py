@@ -0,0 +1,341 @@
+import atexit
+from datetime import datetime, timezone
+import gzip
+import itertools
+import json
+import multiprocessing.util
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from mlops_assignment.config import (
+    AUDIT_DIR,
+    AUDIT_ENABLED,
+    AUDIT_FLUSH_SECONDS,
+    AUDIT_FORMAT,
+    AUDIT_MAX_PENDING,
+    AUDIT_SEGMENT_BYTES,
+    AUDIT_SEGMENT_SECONDS,
+)
+from mlops_assignment.registry import identity
+from mlops_assignment.schema import SCHEMAS
+
+# Record every predictor call; can be changed at runtime, e.g. by benchmarks.
+enabled = AUDIT_ENABLED
+
+_files = itertools.count()
+
+
+def _json_default(value):
+    # NumPy scalars, such as the Alzheimer model's integer labels.
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _version(model_identity: tuple[str, int]) -> str:
+    path, mtime_ns = model_identity
+    return f"{Path(path).name}@{mtime_ns}"
+
+
+def _columns(record) -> pd.DataFrame:
+    """Flat audit rows of one queued call, one per scored row."""
+    stamp, model, model_identity, frame, predictions, probabilities, seconds = record
+    features = [c for c in SCHEMAS[model] if c in frame.columns]
+    columns = {
+        "time": pd.Timestamp(stamp, unit="s", tz="UTC"),
+        "model_version": _version(model_identity),
+        "latency_ms": seconds * 1e3,
+        "batch_rows": len(frame),
+    }
+    columns.update({c: frame[c].to_numpy(dtype=np.float64) for c in features})
+    columns["prediction"] = np.asarray(predictions)
+    columns["probability"] = np.asarray(probabilities, dtype=np.float64)
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(frame)))
+
+
+class _Segment:
+    """An open segment of single-prediction records, rotated by size and age."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.opened = time.monotonic()
+        self.writer = None
+
+    def size(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+
+class AuditLog:
+    """
+    Append-only audit trail of predictions, written from a background thread.
+
+    `record` only queues a reference to the call, so the request path pays
+    for a shallow copy of the input frame and a queue put. When `max_pending`
+    calls are already queued, the call is counted in `dropped` instead, so a
+    writer that falls behind never holds more input frames than that. The
+    writer thread wakes every `flush_seconds` and writes everything queued:
+
+    - Single-row calls are appended to one segment per model, as gzipped
+      JSONL (one gzip member per flush, so a segment stays readable even if
+      the process dies) or as a Parquet row group. A segment is closed and
+      a new one started once it reaches `segment_bytes` or `segment_seconds`.
+    - Each multi-row call, such as an uploaded batch, becomes its own
+      zstd-compressed Parquet segment instead of one JSON line per row.
+
+    Segments are written to `directory/<model>/` and named by creation time,
+    process ID and a counter, so concurrent processes never share a file.
+
+    Parameters
+    ----------
+    directory : Path
+        Root folder of the audit segments.
+    format : str
+        `"jsonl"` or `"parquet"`, for single-row segments.
+    flush_seconds : float
+        Longest time a queued record waits before it is written.
+    segment_bytes : int
+        Size at which a single-row segment is rotated.
+    segment_seconds : float
+        Age at which a single-row segment is rotated.
+    max_pending : int
+        Calls queued and not yet written before further calls are dropped.
+    """
+
+    def __init__(
+        self,
+        directory: Path = AUDIT_DIR,
+        format: str = AUDIT_FORMAT,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        segment_bytes: int = AUDIT_SEGMENT_BYTES,
+        segment_seconds: float = AUDIT_SEGMENT_SECONDS,
+        max_pending: int = AUDIT_MAX_PENDING,
+    ):
+        if format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown audit format '{format}', expected 'jsonl' or 'parquet'")
+        self.directory = Path(directory)
+        self.format = format
+        self.flush_seconds = flush_seconds
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Also called in forked children, which inherit the queue but not the thread.
+        self._queue = queue.Queue(self.max_pending)
+        self._wake = threading.Event()
+        # Calls not recorded because the queue was full: {model: count}.
+        self.dropped = {}
+        self._thread = None
+        self._segments = {}
+
+    def record(
+        self,
+        model: str,
+        input_df: pd.DataFrame,
+        predictions,
+        probabilities,
+        seconds: float,
+    ) -> None:
+        """Queue one predictor call: its input rows, outputs and latency in seconds."""
+        if self._thread is None:
+            self._start()
+        if len(input_df) > 1 or self.format == "parquet":
+            # Loaded before the call is queued, since Arrow's pandas conversion registers
+            # exit hooks on import, which fails once the process is exiting and writing
+            # its last queued calls.
+            import pyarrow.pandas_compat  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        try:
+            self._queue.put_nowait(
+                (
+                    time.time(),
+                    model,
+                    identity(model),
+                    # Callers add result columns to their frame afterwards, as `score_chunk` does.
+                    input_df.copy(deep=False),
+                    predictions,
+                    probabilities,
+                    seconds,
+                )
+            )
+        except queue.Full:
+            if not self.dropped:
+                logger.warning(
+                    f"Prediction audit queue is full ({self.max_pending} calls); "
+                    f"dropping calls until the writer catches up"
+                )
+            self.dropped[model] = self.dropped.get(model, 0) + 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        """Block until everything queued so far has been written."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """Write everything queued, close the open segments and stop the writer."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._put(None)
+        thread.join()
+
+    def _put(self, item) -> None:
+        # Control items are never dropped: wait for the writer to make room.
+        while True:
+            self._wake.set()
+            try:
+                self._queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            # The writer wakes on a timer rather than on every record, so a `record`
+            # call never hands the GIL to this thread mid-request.
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            items = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write([item for item in items if isinstance(item, tuple)])
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                for model in list(self._segments):
+                    self._close_segment(model)
+                return
+
+    def _write(self, records: list) -> None:
+        singles = {}
+        for record in records:
+            model, frame = record[1], record[3]
+            try:
+                if len(frame) == 1:
+                    singles.setdefault(model, []).append(record)
+                elif len(frame) > 1:
+                    self._write_batch(model, _columns(record))
+            except Exception as e:
+                # Auditing must never fail a prediction, so failed writes are only reported.
+                logger.warning(f"Prediction audit write failed: {e}")
+        for model, batch in singles.items():
+            try:
+                self._write_singles(model, batch)
+            except Exception as e:
+                logger.warning(f"Prediction audit write failed: {e}")
+        for model, segment in list(self._segments.items()):
+            age = time.monotonic() - segment.opened
+            if age >= self.segment_seconds or segment.size() >= self.segment_bytes:
+                self._close_segment(model)
+
+    def _path(self, model: str, kind: str, suffix: str) -> Path:
+        folder = self.directory / model
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return folder / f"{kind}-{stamp}-{os.getpid()}-{next(_files)}{suffix}"
+
+    def _write_batch(self, model: str, rows: pd.DataFrame) -> None:
+        rows.to_parquet(self._path(model, "batch", ".parquet"), compression="zstd", index=False)
+
+    def _write_singles(self, model: str, records: list) -> None:
+        segment = self._segments.get(model)
+        if segment is None:
+            suffix = ".jsonl.gz" if self.format == "jsonl" else ".parquet"
+            segment = self._segments[model] = _Segment(self._path(model, "single", suffix))
+
+        if self.format == "jsonl":
+            lines = []
+            for stamp, _, model_identity, frame, predictions, probabilities, seconds in records:
+                features = [c for c in SCHEMAS[model] if c in frame.columns]
+                # Whole-row NumPy access; pandas row lookups cost ~100x more per record.
+                values = frame.to_numpy()[0, frame.columns.get_indexer(features)]
+                lines.append(
+                    json.dumps(
+                        {
+                            "time": datetime.fromtimestamp(stamp, timezone.utc).isoformat(),
+                            "model": model,
+                            "model_version": _version(model_identity),
+                            "latency_ms": seconds * 1e3,
+                            "inputs": dict(zip(features, map(float, values))),
+                            "prediction": predictions[0],
+                            "probability": float(probabilities[0]),
+                        },
+                        default=_json_default,
+                    )
+                )
+            with gzip.open(segment.path, "at", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+            return
+
+        # Imported here so processes that only log JSONL never load Arrow.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = pd.concat([_columns(record) for record in records], ignore_index=True)
+        if segment.writer is None:
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            segment.writer = pq.ParquetWriter(segment.path, table.schema, compression="zstd")
+        else:
+            table = pa.Table.from_pandas(rows, schema=segment.writer.schema, preserve_index=False)
+        segment.writer.write_table(table)
+
+    def _close_segment(self, model: str) -> None:
+        segment = self._segments.pop(model)
+        if segment.writer is not None:
+            segment.writer.close()
+
+
+_log = AuditLog()
+
+
+def record(model: str, input_df: pd.DataFrame, predictions, probabilities, seconds: float):
+    """Queue one predictor call for the audit log, unless auditing is disabled."""
+    if enabled and len(input_df):
+        _log.record(model, input_df, predictions, probabilities, seconds)
+
+
+def flush() -> None:
+    """Block until every prediction recorded so far is on disk."""
+    _log.flush()
+
+
+def close() -> None:
+    """Write every queued record and close the open segments."""
+    _log.close()
+
+
+def _register_finalizer(_=None) -> None:
+    # Pool workers, such as the batch CLI's, exit without running `atexit` handlers,
+    # and forked ones drop the finalizers inherited from their parent.
+    multiprocessing.util.Finalize(None, close, exitpriority=10)
+
+
+atexit.register(close)
+_register_finalizer()
+multiprocessing.util.register_after_fork(_log, _register_finalizer)
+os.register_at_fork(after_in_child=_log._reset)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from mlops_assignment.config import BATCH_RESULTS_DIR, BATCH_RESULTS_KEEP
+from mlops_assignment.registry import identity
+from mlops_assignment.streaming import DEFAULT_CHUNK_SIZE, ShardWriter, score_chunk
+
+# Confidence histogram bin edges, 5 points wide.
+CONFIDENCE_BINS = np.linspace(0, 1, 21)
+_BIN_COUNT = len(CONFIDENCE_BINS) - 1
+
+# Rows per Parquet row group; reading a page decodes at most two row groups.
+ROW_GROUP_SIZE = 10_000
+
+# Files of a finished run, by download format.
+FILES = {
+    "csv": "results.csv.gz",
+    "parquet": "results.parquet",
+    "rejected": "rejected.csv.gz",
+}
+
+
+def _digest(source, *parts) -> str:
+    """BLAKE2 digest of a file's content followed by `parts`, read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (str, Path)):
+        handle = open(source, "rb")
+    else:
+        handle = source
+        handle.seek(0)
+    try:
+        while block := handle.read(1 << 20):
+            digest.update(block)
+    finally:
+        if handle is source:
+            source.seek(0)
+        else:
+            handle.close()
+    digest.update(json.dumps(parts).encode())
+    return digest.hexdigest()
+
+
+class BatchResults:
+    """
+    One scored upload on disk, read back a page at a time.
+
+    Holds the scored rows as Parquet in `ROW_GROUP_SIZE`-row groups, the
+    same rows as a gzipped CSV, the rejected rows as a gzipped CSV, and the
+    summary computed while scoring. Nothing is re-read or re-encoded to
+    show a summary or serve a download.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.key = self.directory.name
+        self.summary = json.loads((self.directory / "summary.json").read_text())
+        self.rows = self.summary["rows"]
+        self.rejected = self.summary["rejected"]
+
+    def exists(self) -> bool:
+        """False once the run has been pruned from `BATCH_RESULTS_DIR`."""
+        return (self.directory / "summary.json").exists()
+
+    def path(self, format: str) -> Path:
+        """File of `format` (`"csv"`, `"parquet"` or `"rejected"`) to download."""
+        return self.directory / FILES[format]
+
+    def page_count(self, size: int) -> int:
+        return max(1, -(-self.rows // size))
+
+    def page(self, number: int, size: int) -> pd.DataFrame:
+        """Scored rows `number * size` to `(number + 1) * size`, counting pages from 0."""
+        if not self.rows:
+            return pd.DataFrame()
+        parquet = pq.ParquetFile(self.path("parquet"))
+        start = number * size
+        stop = min(start + size, self.rows)
+        ends = np.cumsum(
+            [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)]
+        )
+        first = int(np.searchsorted(ends, start, side="right"))
+        last = int(np.searchsorted(ends, stop - 1, side="right"))
+        offset = start - (ends[first - 1] if first else 0)
+        table = parquet.read_row_groups(range(first, last + 1))
+        frame = table.slice(offset, stop - start).to_pandas()
+        frame.index = pd.RangeIndex(start, stop)
+        return frame
+
+    def label_summary(self) -> pd.DataFrame:
+        """`Count`, `Share` and `Mean Confidence` of each predicted label."""
+        labels = self.summary["labels"]
+        counts = np.array([label["count"] for label in labels])
+        sums = np.array([label["confidence_sum"] for label in labels])
+        return pd.DataFrame(
+            {
+                "Count": counts,
+                "Share": counts / max(self.rows, 1),
+                "Mean Confidence": sums / counts,
+            },
+            index=pd.Index([label["label"] for label in labels], name="PredictionLabel"),
+        )
+
+    def confidence_histogram(self) -> pd.DataFrame:
+        """
+        Rows per confidence bin and predicted label, from the lowest non-empty bin.
+
+        Indexed by each bin's lower edge, in percent.
+        """
+        labels = self.summary["labels"]
+        counts = np.array([label["histogram"] for label in labels]).reshape(len(labels), -1)
+        histogram = pd.DataFrame(
+            counts.T,
+            index=pd.Index(np.round(CONFIDENCE_BINS[:-1] * 100).astype(int), name="Confidence"),
+            columns=[label["label"] for label in labels],
+        )
+        filled = np.flatnonzero(counts.sum(axis=0))
+        return histogram.iloc[filled[0] :] if len(filled) else histogram.iloc[:0]
+
+
+def _summarize(summary: dict, scored: pd.DataFrame) -> None:
+    labels = scored["PredictionLabel"].to_numpy()
+    confidence = scored["Confidence"].to_numpy(dtype=float)
+    values, codes = np.unique(labels, return_inverse=True)
+    # One pass per chunk: bin every row by (label, confidence bin) at once.
+    bins = np.searchsorted(CONFIDENCE_BINS, confidence, side="right") - 1
+    bins = np.clip(bins, 0, _BIN_COUNT - 1)  # A confidence of exactly 1 joins the last bin.
+    histogram = np.bincount(
+        codes * _BIN_COUNT + bins, minlength=len(values) * _BIN_COUNT
+    ).reshape(-1, _BIN_COUNT)
+    sums = np.bincount(codes, weights=confidence, minlength=len(values))
+    for i, value in enumerate(values.tolist()):
+        label = summary.setdefault(
+            value,
+            {"label": value, "count": 0, "confidence_sum": 0.0, "histogram": [0] * _BIN_COUNT},
+        )
+        label["count"] += int(histogram[i].sum())
+        label["confidence_sum"] += float(sums[i])
+        label["histogram"] = np.add(label["histogram"], histogram[i]).tolist()
+
+
+def _prune(root: Path, keep: int) -> None:
+    runs = sorted(
+        (path for path in root.iterdir() if (path / "summary.json").exists()),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in runs[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def score_upload(
+    source,
+    model: str,
+    explain: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    directory: Path = BATCH_RESULTS_DIR,
+    keep: int = BATCH_RESULTS_KEEP,
+) -> BatchResults:
+    """
+    Score a CSV upload once and keep its results, downloads and summary on disk.
+
+    Runs are keyed by the upload's content, the model file's version and
+    `explain`. A run already in `directory` is reused as is, so the same
+    upload is scored once however many sessions or reruns show it. A new
+    run streams the upload chunk by chunk through `score_chunk`, writing
+    each scored chunk to Parquet and gzipped CSV and adding it to the
+    label counts, mean confidences and confidence histogram, so memory use
+    is bounded by the chunk size. Only the `keep` most recently used runs
+    are kept.
+
+    Parameters
+    ----------
+    source : path or file-like
+        CSV input, e.g. a path or a Streamlit `UploadedFile`.
+    model : str
+        `"alzheimer"` or `"lung_cancer"`.
+    explain : bool
+        Append per-feature contributions to each scored row, as in `score_chunk`.
+    chunk_size : int
+        Number of rows held in memory at a time.
+    directory : Path
+        Root folder of the stored runs.
+    keep : int
+        Number of runs to keep.
+
+    Returns
+    -------
+    BatchResults
+        The stored run.
+
+    Raises
+    ------
+    ValueError
+        If the upload lacks a required column.
+    """
+    directory = Path(directory)
+    run = directory / _digest(source, model, identity(model), explain)
+    if (run / "summary.json").exists():
+        os.utime(run)  # Mark it recently used.
+        return BatchResults(run)
+
+    # Written under a scratch name and renamed once complete, so a run that
+    # fails, or one being scored by another session, is never read half-written.
+    scratch = directory / f".{run.name}-{uuid.uuid4().hex}"
+    scratch.mkdir(parents=True)
+    try:
+        writers = [
+            ShardWriter(scratch / FILES["parquet"], ROW_GROUP_SIZE, compression="zstd"),
+            ShardWriter(scratch / FILES["csv"]),
+        ]
+        rejected_writer = ShardWriter(scratch / FILES["rejected"])
+        labels = {}
+        rows = rejected = 0
+        try:
+            for chunk in pd.read_csv(source, chunksize=chunk_size):
+                scored, invalid = score_chunk(chunk, model, rows + rejected, explain)
+                if len(scored):
+                    for writer in writers:
+                        writer.write(scored)
+                    _summarize(labels, scored)
+                if len(invalid):
+                    rejected_writer.write(invalid)
+                rows += len(scored)
+                rejected += len(invalid)
+        finally:
+            for writer in [*writers, rejected_writer]:
+                writer.close()
+
+        labels = [labels[value] for value in sorted(labels)]
+        summary = {"rows": rows, "rejected": rejected, "labels": labels}
+        (scratch / "summary.json").write_text(json.dumps(summary))
+        try:
+            scratch.rename(run)
+        except OSError:
+            # Another session stored the same run first.
+            shutil.rmtree(scratch)
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    _prune(directory, keep)
+    return BatchResults(run)
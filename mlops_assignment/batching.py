@@ -0,0 +1,107 @@
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent small prediction calls into one batched call.
+
+    Callers block in `submit` while a background thread collects queued
+    frames until `max_batch_size` rows are waiting or `max_wait_ms` has
+    passed since the first one arrived. The frames are concatenated, scored
+    with a single `predict_batch` call, and each caller receives the slice
+    of results for its own rows. If that call fails, each frame is scored
+    on its own, so an invalid request fails only its own caller. While a
+    batch is being scored, new requests keep queueing, so batches grow with
+    load and stay small when idle.
+
+    Parameters
+    ----------
+    predict_batch : callable
+        Takes an N-row DataFrame and returns `(predictions, probabilities)`
+        aligned with its rows.
+    max_batch_size : int
+        Maximum number of rows scored in one call.
+    max_wait_ms : float
+        Longest time the first request of a batch waits for others.
+    """
+
+    def __init__(self, predict_batch, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+
+        self.batches = 0
+        self.rows = 0
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """Score `input_df` as part of the next batch and return its own results."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((input_df, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="micro-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+
+            while rows < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._score(batch)
+
+    def _score(self, batch: list) -> None:
+        try:
+            # Only the columns every frame has, so a frame missing a column fails the
+            # batch rather than having the gap filled with NaN from its neighbours.
+            combined = pd.concat([df for df, _ in batch], join="inner", ignore_index=True)
+            predictions, probabilities = self.predict_batch(combined)
+            predictions = np.asarray(predictions)
+            probabilities = np.asarray(probabilities)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One bad request must not fail the others that shared its batch, so
+            # each frame is scored on its own and gets its own result or error.
+            for item in batch:
+                self._score([item])
+            return
+
+        self.batches += 1
+        self.rows += len(combined)
+
+        offset = 0
+        for df, future in batch:
+            end = offset + len(df)
+            future.set_result((predictions[offset:end], probabilities[offset:end]))
+            offset = end
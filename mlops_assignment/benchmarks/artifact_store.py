@@ -0,0 +1,87 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+from loguru import logger
+import typer
+
+from mlops_assignment import artifact_store
+from mlops_assignment.config import MLFLOW_ARTIFACTS_DIR, PROJ_ROOT
+from mlops_assignment.registry import MODEL_PATHS
+
+app = typer.Typer()
+
+# Loads pickles in a fresh interpreter and prints the seconds and resident MiB the
+# loads add. Libraries the pickles need are imported first, so both loaders
+# are timed without import costs.
+PROBE = """
+import os, time
+from pathlib import Path
+import catboost, joblib, lightgbm, pycaret.internal.pipeline, sklearn.ensemble
+from mlops_assignment import artifact_store
+
+def rss():
+    return int(open("/proc/self/statm").read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+paths = {paths!r}
+before = rss()
+start = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - start
+print(elapsed, (rss() - before) / 2**20)
+"""
+
+LOADERS = {
+    "pickle": "models = [joblib.load(p) for p in paths]",
+    "store": "models = [artifact_store.load(p, Path({store!r})) for p in paths]",
+}
+
+
+def measure(loader: str, paths: list[Path], store: Path) -> tuple[float, float]:
+    load = LOADERS[loader].format(store=str(store))
+    code = PROBE.format(paths=[str(p) for p in paths], load=load)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJ_ROOT, capture_output=True, text=True, check=True
+    )
+    seconds, rss_mib = map(float, result.stdout.split()[-2:])
+    return seconds, rss_mib
+
+
+def _size(paths: list[Path]) -> float:
+    return sum(p.stat().st_size for p in paths if p.is_file()) / 2**20
+
+
+@app.command()
+def main():
+    """
+    Measure the artifact store's disk use and load times on `models/` and `mlartifacts/`.
+
+    Ingests every pickle into a temporary store, then loads the served
+    pipelines and all MLflow pickles in fresh interpreters, once by
+    unpickling each file and once by assembling it from the store.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = Path(tmp_dir)
+        stored = artifact_store.ingest(artifact_store.default_sources(), store)
+        sources = [PROJ_ROOT / key for key in stored]
+        blobs = list(store.glob("blobs/*/*"))
+        logger.info(
+            f"{len(sources)} pickles {_size(sources):,.1f} MiB -> "
+            f"{len(blobs)} blobs {_size(list(store.rglob('*'))):,.1f} MiB"
+        )
+
+        served = list(MODEL_PATHS.values())
+        mlflow_pickles = [p for p in sources if p.is_relative_to(MLFLOW_ARTIFACTS_DIR)]
+        for label, paths in [("served models", served), ("MLflow pickles", mlflow_pickles)]:
+            for loader in LOADERS:
+                seconds, rss_mib = measure(loader, paths, store)
+                logger.info(
+                    f"{label} ({len(paths)}), {loader:<7}{seconds:>8.2f}s  "
+                    f"+{rss_mib:>6,.1f} MiB resident"
+                )
+    logger.success("Artifact store benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,81 @@
+import tempfile
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import audit, predict_alzheimer, predict_lung_cancer, schema
+from mlops_assignment.benchmarks.synthetic import FRAMES
+
+app = typer.Typer()
+
+
+def predict(name: str, df):
+    if name == "alzheimer":
+        preds, probs = predict_alzheimer.predict(df)
+        return preds.to_numpy(), probs.to_numpy()
+    return predict_lung_cancer.predict_lung_cancer_batch(df)
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    calls: int = 300,
+    batch_rows: int = 10_000,
+    format: str = typer.Option("jsonl", help="Single-row segment format: jsonl or parquet."),
+):
+    """
+    Time what the audit log adds to the request path.
+
+    Each predictor call is followed by a timed `record` of its result into
+    a scratch audit log, so the writer thread runs alongside the calls as
+    it would in the app. Reports the median and p99 cost of queueing a
+    single prediction and a `batch_rows`-row batch, the cost of the same
+    calls back to back, without the predictors' threads competing for the
+    GIL, and how long the writer then takes to drain.
+    """
+    audit.enabled = False  # The predictors' own records would go to the real log.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = audit.AuditLog(tmp_dir, format)
+        for name in models:
+            df = FRAMES[name](max(calls, batch_rows))
+            predict(name, df.iloc[:1])  # Load the model and warm up.
+
+            for label, frames in [
+                ("single", [df.iloc[[i]] for i in range(calls)]),
+                (f"batch x{batch_rows:,}", [df.iloc[:batch_rows]] * 20),
+            ]:
+                seconds = []
+                for frame in frames:
+                    start = time.perf_counter()
+                    preds, probs = predict(name, frame)
+                    latency = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    log.record(name, frame, preds, probs, latency)
+                    seconds.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                log.flush()
+                drain = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for frame in frames:
+                    log.record(name, frame, preds, probs, latency)
+                alone = (time.perf_counter() - start) / len(frames)
+                log.flush()
+
+                median, p99 = np.percentile(seconds, [50, 99]) * 1e6
+                logger.info(
+                    f"{name} {label:<13} record median {median:.1f} us, p99 {p99:.1f} us, "
+                    f"back to back {alone * 1e6:.1f} us | "
+                    f"writer drained {len(frames)} calls {drain * 1e3:.0f} ms after the last"
+                )
+        log.close()
+
+    logger.success("Audit log benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
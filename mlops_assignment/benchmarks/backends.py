@@ -0,0 +1,63 @@
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import compiled, predict_alzheimer, predict_lung_cancer, schema
+from mlops_assignment.benchmarks.synthetic import FRAMES
+
+app = typer.Typer()
+
+# Uncached, unbatched scoring of each predictor; the backend is chosen inside.
+SCORERS = {
+    "alzheimer": predict_alzheimer._predict_batch,
+    "lung_cancer": predict_lung_cancer._score,
+}
+
+
+def median_seconds(run, rows: int, budget_rows: int) -> float:
+    # Small batches are repeated more, so each batch size gets a similar time budget.
+    repeats = int(np.clip(budget_rows // rows, 3, 200))
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds))
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    batch_sizes: list[int] = typer.Option([1, 10, 100, 1_000, 10_000, 100_000], "--batch-size"),
+    budget_rows: int = typer.Option(200_000, help="Rows scored per batch size, at least 3 calls."),
+):
+    """
+    Latency and throughput of each inference backend across batch sizes, on CPU.
+
+    Scores synthetic batches through each predictor's uncached, unbatched
+    path with the native pipeline and with every compiled build in
+    `models/compiled/` (see `modeling/compile.py`). Backends without a
+    build are skipped.
+    """
+    for name in models:
+        df = FRAMES[name](max(batch_sizes))
+        for backend in compiled.BACKENDS:
+            if backend != "native" and compiled.get(name, backend) is None:
+                logger.warning(f"{name}: no {backend} build, skipped")
+                continue
+            compiled.backend = backend
+            SCORERS[name](df.iloc[:10])  # Load the model and warm up.
+            for rows in batch_sizes:
+                batch = df.iloc[:rows]
+                seconds = median_seconds(lambda: SCORERS[name](batch), rows, budget_rows)
+                logger.info(
+                    f"{name} {backend:<8} {rows:>7,} rows: {seconds * 1e3:9.2f} ms, "
+                    f"{rows / seconds:>12,.0f} rows/s"
+                )
+    logger.success("Inference backend benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
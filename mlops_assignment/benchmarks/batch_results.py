@@ -0,0 +1,140 @@
+from pathlib import Path
+import tempfile
+import time
+
+from loguru import logger
+import pandas as pd
+import typer
+
+from mlops_assignment import (
+    audit,
+    batch_results,
+    predict_alzheimer,
+    predict_lung_cancer,
+    schema,
+)
+from mlops_assignment.benchmarks.synthetic import FRAMES
+from mlops_assignment.streaming import score_csv
+
+app = typer.Typer()
+
+# Rows the pages showed before results were paginated.
+PREVIEW_ROWS = 1000
+
+
+def arrow_bytes(df: pd.DataFrame) -> int:
+    """Size of `df` as Streamlit serializes it for `st.dataframe` or `st.bar_chart`."""
+    # Imported here so importing this module does not start Streamlit.
+    from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+    return len(convert_pandas_df_to_arrow_bytes(df))
+
+
+def rerun_full(results: pd.DataFrame) -> int:
+    """The original pages: every row to the browser and a fresh CSV for the download."""
+    return arrow_bytes(results) + len(results.to_csv(index=False).encode())
+
+
+def rerun_preview(results_path: Path) -> int:
+    """Pages since streaming: the first rows, plus the whole CSV read for the download."""
+    return arrow_bytes(pd.read_csv(results_path, nrows=PREVIEW_ROWS)) + len(
+        results_path.read_bytes()
+    )
+
+
+def rerun_paged(results: batch_results.BatchResults, page: int, page_size: int) -> int:
+    """Pages now: one page, the summary and histogram; downloads are read when clicked."""
+    return (
+        arrow_bytes(results.page(page, page_size))
+        + arrow_bytes(results.label_summary())
+        + arrow_bytes(results.confidence_histogram())
+    )
+
+
+def clear_caches() -> None:
+    """Score from scratch, not from rows the prediction caches kept from an earlier run."""
+    predict_alzheimer._cache.clear()
+    predict_lung_cancer._cache.clear()
+
+
+def best_of(run, repeats: int) -> tuple[float, int]:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        payload = run()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), payload
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    rows: int = 500_000,
+    page_size: int = 100,
+    repeats: int = 3,
+):
+    """
+    Compare what one rerun of a page showing batch results costs, by page version.
+
+    For a `rows`-row upload, reports the bytes a rerun sends to the browser
+    (dataframes as Arrow, plus download data) and the server time to
+    produce them: in the original pages, which showed the whole result
+    frame and re-encoded the CSV; in the streaming pages, which showed
+    the first 1,000 rows and read the whole CSV for the download; and in
+    the paginated pages, which show one `page_size`-row page and the
+    summary and defer the download. Also reports scoring time, the time
+    to reuse a stored run, and the size of each download format.
+    """
+    audit.enabled = False  # Keep the benchmark's batches out of the real log.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        for name in models:
+            upload = tmp_dir / f"{name}.csv"
+            FRAMES[name](rows).to_csv(upload, index=False)
+
+            clear_caches()
+            start = time.perf_counter()
+            results_path = tmp_dir / f"{name}_predictions.csv"
+            score_csv(upload, results_path, name)
+            streamed = time.perf_counter() - start
+
+            clear_caches()
+            start = time.perf_counter()
+            results = batch_results.score_upload(upload, name, directory=tmp_dir / "runs")
+            stored = time.perf_counter() - start
+            reused, _ = best_of(
+                lambda: batch_results.score_upload(upload, name, directory=tmp_dir / "runs"),
+                repeats,
+            )
+            logger.info(
+                f"{name}: scored {rows:,} rows to CSV in {streamed:.1f}s, to a stored run in "
+                f"{stored:.1f}s; reusing the stored run takes {reused * 1e3:.0f} ms"
+            )
+
+            frame = pd.read_parquet(results.path("parquet"))
+            middle = results.page_count(page_size) // 2
+            for label, run in [
+                ("whole frame", lambda: rerun_full(frame)),
+                (f"first {PREVIEW_ROWS:,}", lambda: rerun_preview(results_path)),
+                (f"{page_size}-row page", lambda: rerun_paged(results, middle, page_size)),
+            ]:
+                seconds, payload = best_of(run, repeats)
+                logger.info(
+                    f"{name} rerun, {label:<14} {payload / 2**10:8,.0f} KiB, "
+                    f"{seconds * 1e3:7.0f} ms"
+                )
+
+            sizes = {
+                "CSV": results_path.stat().st_size,
+                "gzipped CSV": results.path("csv").stat().st_size,
+                "Parquet": results.path("parquet").stat().st_size,
+            }
+            logger.info(
+                f"{name} downloads: "
+                + ", ".join(f"{fmt} {size / 2**20:.1f} MiB" for fmt, size in sizes.items())
+            )
+    logger.success("Batch results benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
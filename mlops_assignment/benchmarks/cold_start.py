@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+
+from loguru import logger
+import typer
+
+from mlops_assignment.config import PROJ_ROOT
+
+app = typer.Typer()
+
+# Runs in a fresh interpreter so nothing is already imported or loaded.
+# ru_maxrss is reported in KiB on Linux.
+PROBE = """
+import json, resource, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+from mlops_assignment.registry import get_model
+get_model("{model}")
+loaded = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "first_load_s": loaded - imported,
+    "import_rss_mib": import_rss / 1024,
+    "loaded_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+# The predictor modules before the registry: importing one loaded its model
+# with PyCaret, so the import is the whole cold start.
+EAGER_PROBE = """
+import json, resource, time
+start = time.perf_counter()
+import pandas as pd
+from pycaret.classification import load_model, predict_model
+from mlops_assignment.registry import MODEL_PATHS
+model = load_model(str(MODEL_PATHS["{model}"].with_suffix("")), verbose=False)
+imported = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{
+    "import_s": imported - start,
+    "first_load_s": 0.0,
+    "import_rss_mib": rss,
+    "loaded_rss_mib": rss,
+}}))
+"""
+
+PREDICTORS = {
+    "alzheimer": "mlops_assignment.predict_alzheimer",
+    "lung_cancer": "mlops_assignment.predict_lung_cancer",
+}
+
+
+def probe(module: str, model: str, eager: bool = False) -> dict:
+    """
+    Measure import time, first model load time and peak RSS in a new process.
+
+    With `eager`, the import is the old one that loaded the model, and the
+    first load takes no further time.
+    """
+    code = EAGER_PROBE.format(model=model) if eager else PROBE.format(module=module, model=model)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJ_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@app.command()
+def main(
+    modes: list[str] = typer.Option(
+        ["eager", "lazy"],
+        "--mode",
+        help="eager: the old import, which loaded the model; lazy: the registry's first load.",
+    ),
+):
+    """Report cold-start cost of importing each predictor and loading its model."""
+    for mode in modes:
+        if mode not in ("eager", "lazy"):
+            raise typer.BadParameter(f"Unknown mode '{mode}', expected 'eager' or 'lazy'")
+    for model, module in PREDICTORS.items():
+        for mode in modes:
+            stats = probe(module, model, eager=mode == "eager")
+            logger.info(
+                f"{module} ({mode}): import {stats['import_s']:.2f}s "
+                f"({stats['import_rss_mib']:.0f} MiB RSS), "
+                f"first load {stats['first_load_s']:.2f}s ({stats['loaded_rss_mib']:.0f} MiB RSS)"
+            )
+    logger.success("Cold start benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
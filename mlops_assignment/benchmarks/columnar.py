@@ -0,0 +1,99 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+from loguru import logger
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import typer
+
+from mlops_assignment.config import ALZHEIMER_RAW_PATH, LUNG_CANCER_RAW_PATH, PROJ_ROOT
+from mlops_assignment.dataset import compact_dtypes
+
+app = typer.Typer()
+
+DATASETS = {
+    "alzheimer": ALZHEIMER_RAW_PATH,
+    "lung_cancer": LUNG_CANCER_RAW_PATH,
+}
+
+# Loads a file in a fresh interpreter and prints seconds, frame MiB and peak RSS MiB.
+PROBE = """
+import resource, time
+import pandas as pd
+import pyarrow.parquet as pq
+start = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - start
+print(elapsed, df.memory_usage(deep=True).sum() / 2**20,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+LOADERS = {
+    "read_csv": "df = pd.read_csv({path!r})",
+    "read_csv usecols": "df = pd.read_csv({path!r}, usecols={columns!r})",
+    "parquet": "df = pq.read_pandas({path!r}, memory_map=True).to_pandas()",
+    "parquet columns": (
+        "df = pq.read_pandas({path!r}, columns={columns!r}, memory_map=True).to_pandas()"
+    ),
+}
+
+
+def write_scaled_copies(source: Path, scale: int, csv_path: Path, parquet_path: Path) -> None:
+    """Write `scale` stacked copies of `source` as a CSV and as a typed Parquet file."""
+    df = pd.read_csv(source)
+    table = pa.Table.from_pandas(compact_dtypes(df), preserve_index=False)
+    with open(csv_path, "w", newline="") as handle, pq.ParquetWriter(
+        parquet_path, table.schema
+    ) as writer:
+        for i in range(scale):
+            df.to_csv(handle, header=i == 0, index=False)
+            writer.write_table(table)
+
+
+def measure(loader: str, path: Path, columns: list[str]) -> tuple[float, float, float]:
+    code = PROBE.format(load=LOADERS[loader].format(path=str(path), columns=columns))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJ_ROOT, capture_output=True, text=True, check=True
+    )
+    seconds, frame_mib, rss_mib = map(float, result.stdout.split())
+    return seconds, frame_mib, rss_mib
+
+
+@app.command()
+def main(
+    datasets: list[str] = typer.Option(list(DATASETS), "--dataset"),
+    scales: list[int] = typer.Option([1, 100, 1_000], "--scale"),
+    n_columns: int = typer.Option(5, help="Columns loaded by the projected readers."),
+):
+    """
+    Compare CSV and typed Parquet loads of scaled-up copies of the raw datasets.
+
+    Each load runs in a fresh interpreter and reports wall time, the size of
+    the resulting DataFrame and the process's peak RSS.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in datasets:
+            columns = list(pd.read_csv(DATASETS[name], nrows=0).columns[1 : n_columns + 1])
+            for scale in scales:
+                csv_path = Path(tmp_dir) / f"{name}.csv"
+                parquet_path = Path(tmp_dir) / f"{name}.parquet"
+                write_scaled_copies(DATASETS[name], scale, csv_path, parquet_path)
+                logger.info(
+                    f"{name} x{scale}: CSV {csv_path.stat().st_size / 2**20:,.1f} MiB, "
+                    f"Parquet {parquet_path.stat().st_size / 2**20:,.1f} MiB"
+                )
+                for loader in LOADERS:
+                    path = csv_path if loader.startswith("read_csv") else parquet_path
+                    seconds, frame_mib, rss_mib = measure(loader, path, columns)
+                    logger.info(
+                        f"  {loader:<18}{seconds:>8.3f}s  frame {frame_mib:>8,.1f} MiB  "
+                        f"peak RSS {rss_mib:>8,.0f} MiB"
+                    )
+    logger.success("Columnar storage benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,78 @@
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment import explain, predict_alzheimer, predict_lung_cancer, schema
+from mlops_assignment.benchmarks.synthetic import FRAMES
+from mlops_assignment.streaming import score_chunk
+
+app = typer.Typer()
+
+
+def best_of(run, repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def score_uncached(name: str, df, explained: bool) -> None:
+    predict_alzheimer._cache.clear()
+    predict_lung_cancer._cache.clear()
+    explain._caches[name].clear()
+    score_chunk(df.copy(), name, explain=explained)
+
+
+def explain_uncached(name: str, df) -> None:
+    explain._caches[name].clear()
+    explain.explain(df, name)
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    rows: int = 10_000,
+    per_row_sample: int = typer.Option(200, help="Rows explained one call at a time."),
+    repeats: int = 3,
+):
+    """
+    Explanation throughput on `rows`-row uploads.
+
+    Compares one batched call per upload, with the explanation cache cold
+    and warm, against explaining a sample of rows one call at a time, and
+    prices `--explain` in `score_chunk` against scoring alone. Caches are
+    cleared before every timed call except the warm one.
+    """
+    for name in models:
+        df = FRAMES[name](rows)
+        explain_uncached(name, df.iloc[:10])  # Load the model and the explainer.
+
+        cold = best_of(lambda: explain_uncached(name, df), repeats)
+        warm = best_of(lambda: explain.explain(df, name), repeats)
+
+        explain._caches[name].clear()
+        sample = [df.iloc[[i]] for i in range(per_row_sample)]
+        start = time.perf_counter()
+        for row in sample:
+            explain._caches[name].clear()
+            explain.explain(row, name)
+        per_row = (time.perf_counter() - start) / per_row_sample
+
+        plain = best_of(lambda: score_uncached(name, df, False), repeats)
+        explained = best_of(lambda: score_uncached(name, df, True), repeats)
+
+        logger.info(
+            f"{name} x{rows:,}: batched cold {rows / cold:,.0f} rows/s, "
+            f"cached {rows / warm:,.0f} rows/s, one row per call {1 / per_row:,.0f} rows/s"
+        )
+        logger.info(
+            f"  score_chunk {plain * 1e3:,.0f} ms, with --explain {explained * 1e3:,.0f} ms"
+        )
+    logger.success("Explanation benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
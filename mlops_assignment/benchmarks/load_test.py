@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import httpx
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment.benchmarks.synthetic import alzheimer_frame, lung_cancer_frame
+
+app = typer.Typer()
+
+
+def _payloads(endpoint: str, batch_size: int, n_payloads: int) -> list:
+    frame = lung_cancer_frame if endpoint == "lung-cancer" else alzheimer_frame
+    df = frame(batch_size * n_payloads)
+
+    records = df.to_dict(orient="records")
+    if batch_size == 1:
+        return records
+    return [records[i : i + batch_size] for i in range(0, len(records), batch_size)]
+
+
+async def _worker(client: httpx.AsyncClient, url: str, payloads: list, latencies: list) -> None:
+    for payload in payloads:
+        start = time.perf_counter()
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def _run(url: str, payloads: list, concurrency: int) -> tuple[list, float]:
+    latencies = []
+    async with httpx.AsyncClient(timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _worker(client, url, payloads[i::concurrency], latencies)
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+@app.command()
+def main(
+    base_url: str = "http://127.0.0.1:8000",
+    endpoint: str = typer.Option("lung-cancer", help="alzheimer or lung-cancer"),
+    requests: int = 1_000,
+    concurrency: int = 16,
+    batch_size: int = 1,
+):
+    """Send `requests` predictions to a running service and report latency and throughput."""
+    payloads = _payloads(endpoint, batch_size, requests)
+    latencies, elapsed = asyncio.run(_run(f"{base_url}/predict/{endpoint}", payloads, concurrency))
+
+    p50, p99 = np.percentile(np.array(latencies) * 1e3, [50, 99])
+    logger.info(
+        f"{endpoint}: {len(latencies)} requests x {batch_size} rows, concurrency {concurrency} | "
+        f"p50 {p50:.1f} ms | p99 {p99:.1f} ms | {len(latencies) / elapsed:,.1f} req/s | "
+        f"{len(latencies) * batch_size / elapsed:,.0f} rows/s"
+    )
+    logger.success("Load test complete.")
+
+
+if __name__ == "__main__":
+    app()
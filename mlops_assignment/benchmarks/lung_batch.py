@@ -0,0 +1,64 @@
+import time
+
+from loguru import logger
+import pandas as pd
+from pycaret.classification import predict_model
+import typer
+
+from mlops_assignment import predict_lung_cancer
+from mlops_assignment.benchmarks.synthetic import lung_cancer_frame
+from mlops_assignment.predict_lung_cancer import FEATURE_COLUMNS, predict_lung_cancer_batch
+from mlops_assignment.registry import get_model
+
+app = typer.Typer()
+
+
+def legacy_row_loop(df: pd.DataFrame) -> list:
+    """Reproduce the page's previous per-row `iterrows` batch loop."""
+    model = get_model("lung_cancer")
+    preds = []
+    for _, row in df.iterrows():
+        row_df = pd.DataFrame([row[FEATURE_COLUMNS]])
+        prediction_df = predict_model(model, data=row_df)
+        model.predict_proba(row_df)
+        preds.append(prediction_df["prediction_label"].iloc[0])
+    return preds
+
+
+def rows_per_second(func, df: pd.DataFrame) -> float:
+    # Score every row, rather than answering rows an earlier call scored from the cache.
+    predict_lung_cancer._cache.clear()
+    start = time.perf_counter()
+    func(df)
+    return len(df) / (time.perf_counter() - start)
+
+
+@app.command()
+def main(
+    sizes: list[int] = typer.Option([1, 1_000, 100_000], "--size"),
+    legacy_max_rows: int = 1_000,
+):
+    """
+    Compare rows/sec of `predict_lung_cancer_batch` against the old row loop.
+
+    The legacy loop is only run on the first `legacy_max_rows` rows of each
+    input since it scales linearly and takes minutes at 100k rows.
+    """
+    # Warm up both paths so one-off costs are not attributed to the first size.
+    warmup = lung_cancer_frame(2)
+    predict_lung_cancer_batch(warmup)
+    legacy_row_loop(warmup)
+
+    for n_rows in sizes:
+        df = lung_cancer_frame(n_rows)
+        batch_rate = rows_per_second(predict_lung_cancer_batch, df)
+        legacy_rate = rows_per_second(legacy_row_loop, df.head(legacy_max_rows))
+        logger.info(
+            f"{n_rows:>8} rows | batch {batch_rate:>12,.0f} rows/s | "
+            f"row loop {legacy_rate:>8,.1f} rows/s | speedup {batch_rate / legacy_rate:,.0f}x"
+        )
+    logger.success("Lung cancer batch benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
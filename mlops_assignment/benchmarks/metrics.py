@@ -0,0 +1,94 @@
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment import metrics, predict_alzheimer, predict_lung_cancer
+from mlops_assignment.benchmarks.synthetic import FRAMES
+
+app = typer.Typer()
+
+# The uncached model pass of each predictor.
+PASSES = {
+    "alzheimer": predict_alzheimer._predict_batch,
+    "lung_cancer": predict_lung_cancer._score,
+}
+
+
+def stage_means(model: str) -> dict[str, float]:
+    """Mean seconds per stage of `model` recorded so far."""
+    means = {}
+    for (name, labels), histogram in metrics._series.items():
+        labels = dict(labels)
+        if name == "prediction_stage_seconds" and labels["model"] == model:
+            counts, total = histogram.snapshot()
+            means[labels["stage"]] = total / sum(counts)
+    return means
+
+
+def observation_seconds(n: int = 100_000) -> float:
+    """Seconds one timed stage takes to record, measured over `n` empty stages."""
+    start = time.perf_counter()
+    for _ in range(n):
+        with metrics.timer("benchmark", "empty"):
+            pass
+    return (time.perf_counter() - start) / n
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(PASSES), "--model"),
+    rows: int = 10_000,
+    repeats: int = 15,
+    max_overhead: float = typer.Option(1.0, help="Fail if recording adds more than this %."),
+):
+    """
+    Measure what latency recording adds to a batch prediction.
+
+    Times a `rows`-row batch with recording off and on, alternating so
+    drift affects both alike, and reports the best time of each. That
+    end-to-end difference is within run-to-run noise, so the gate instead
+    counts the values one batch records and prices each at the measured
+    cost of recording an empty stage. Also prints the mean time per
+    recorded stage, which shows where a prediction spends its time.
+    """
+    per_observation = observation_seconds()
+    logger.info(f"One recorded stage costs {per_observation * 1e6:.2f} us")
+
+    failed = False
+    for name in models:
+        df = FRAMES[name](rows)
+        PASSES[name](df)  # Load the model and warm up.
+
+        seconds = {False: [], True: []}
+        for _ in range(repeats):
+            for enabled in seconds:
+                metrics.enabled = enabled
+                start = time.perf_counter()
+                PASSES[name](df)
+                seconds[enabled].append(time.perf_counter() - start)
+        metrics.enabled = True
+
+        metrics.reset()
+        PASSES[name](df)
+        observations = sum(sum(h.snapshot()[0]) for h in metrics._series.values())
+
+        batch, recorded = min(seconds[False]), min(seconds[True])
+        overhead = observations * per_observation / batch * 100
+        logger.info(
+            f"{name} x{rows:,}: {batch * 1e3:,.1f} ms off, {recorded * 1e3:,.1f} ms on "
+            f"({(recorded / batch - 1) * 100:+.2f}% end to end) | {observations} values "
+            f"recorded, priced at {overhead:.4f}%"
+        )
+        for stage, mean in stage_means(name).items():
+            logger.info(f"  {stage:<28}{mean * 1e3:>9.2f} ms")
+        failed |= overhead > max_overhead
+
+    if failed:
+        logger.error(f"Recording added more than {max_overhead}% to a batch.")
+        raise typer.Exit(code=1)
+    logger.success("Metrics overhead benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
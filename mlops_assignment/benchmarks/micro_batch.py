@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import predict_lung_cancer
+from mlops_assignment.batching import MicroBatcher
+from mlops_assignment.benchmarks.synthetic import lung_cancer_frame
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    requests: int = 2_000,
+    concurrency: int = 32,
+    max_batch_size: int = 64,
+    max_wait_ms: float = 2.0,
+):
+    """
+    Fire concurrent single-row lung cancer predictions with and without batching.
+
+    Reports throughput, latency and the rows per batch the batcher formed.
+    """
+    df = lung_cancer_frame(requests)
+    rows = [df.iloc[[i]] for i in range(requests)]
+    batcher = MicroBatcher(predict_lung_cancer._score, max_batch_size, max_wait_ms)
+
+    for label, call in [
+        ("unbatched", predict_lung_cancer._score),
+        ("micro-batched", batcher.submit),
+    ]:
+        latencies = []
+
+        def timed(row):
+            start = time.perf_counter()
+            result = call(row)
+            latencies.append(time.perf_counter() - start)
+            return result
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            list(pool.map(timed, rows))
+            elapsed = time.perf_counter() - start
+
+        latencies_ms = np.array(latencies) * 1e3
+        logger.info(
+            f"{label}: {requests / elapsed:,.0f} req/s | "
+            f"p50 {np.percentile(latencies_ms, 50):.1f} ms | "
+            f"p99 {np.percentile(latencies_ms, 99):.1f} ms"
+        )
+
+    logger.info(
+        f"Micro-batcher scored {batcher.rows} rows in {batcher.batches} batches "
+        f"(mean {batcher.rows / batcher.batches:.1f} rows/batch)."
+    )
+    logger.success("Micro-batch benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment.config import PROJ_ROOT
+
+app = typer.Typer()
+
+PAGES = {
+    "alzheimer": "1_🧠 Alzheimer's Disease.py",
+    "lung_cancer": "2_🫁 Lung_Cancer.py",
+}
+
+# Inputs a clinician changes before pressing Predict: (widget type, label, values to try).
+ADJUSTMENTS = {
+    "alzheimer": [
+        ("slider", "Age (years)", [70, 80]),
+        ("slider", "BMI", [22.0, 31.5]),
+        ("slider", "MMSE Score", [12, 27]),
+        ("slider", "Functional Assessment", [3, 8]),
+        ("slider", "ADL Score", [2, 9]),
+        ("selectbox", "Memory Complaints", ["Yes", "No"]),
+    ],
+    "lung_cancer": [
+        ("number_input", "Age", [45, 62]),
+        ("selectbox", "Air_Pollution", ["High", "Low"]),
+        ("selectbox", "Alcohol_use", ["Moderate", "Very High"]),
+        ("selectbox", "Passive_Smoker", ["Mild", "Extreme"]),
+        ("selectbox", "Smoking", ["Very Low", "High"]),
+    ],
+}
+
+
+def _widget(at, kind: str, label: str):
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def session(page: Path, model: str, session_id: int) -> list[float]:
+    """
+    Replay one clinician's visit to `page` and return the seconds of every rerun.
+
+    The visitor changes each input in `ADJUSTMENTS` and presses Predict. A
+    change to a widget outside a form reruns the script, as the Streamlit
+    server would; a change inside a form does not, so it costs nothing
+    until Predict. Each rerun is timed as a whole-script run, an upper
+    bound for reruns the server limits to a fragment.
+    """
+    # Imported here so importing this module does not pull in Streamlit's test harness.
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(page), default_timeout=300)
+    seconds = []
+
+    def rerun():
+        start = time.perf_counter()
+        at.run()
+        seconds.append(time.perf_counter() - start)
+
+    # AppTest runs the page as `__main__`; this module's functions must stay picklable.
+    main_module = sys.modules["__main__"]
+    try:
+        rerun()
+        for kind, label, values in ADJUSTMENTS[model]:
+            widget = _widget(at, kind, label)
+            widget.set_value(values[session_id % len(values)])
+            if not widget.form_id:
+                rerun()
+        next(b for b in at.button if b.label == "Predict").click()
+        rerun()
+    finally:
+        sys.modules["__main__"] = main_module
+    if at.exception:
+        raise RuntimeError(f"{page.name} failed: {at.exception[0].message}")
+    return seconds
+
+
+def _warm_up(page: Path, model: str) -> None:
+    session(page, model, 0)
+
+
+def _timed_session(page: Path, model: str, session_id: int) -> tuple[list[float], float]:
+    cpu = time.process_time()
+    seconds = session(page, model, session_id)
+    return seconds, time.process_time() - cpu
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(PAGES), "--model"),
+    pages_dir: Path = typer.Option(PROJ_ROOT / "pages", help="Page scripts to measure."),
+    sessions: int = typer.Option(8, help="Simulated concurrent sessions."),
+):
+    """
+    Rerun count, rerun time and server CPU of each page's single-patient flow.
+
+    Runs one visit alone to measure rerun times, then `sessions` visits at
+    once, each in its own process since the Streamlit test harness is not
+    thread-safe, and sums the CPU time their reruns take. Point
+    `--pages-dir` at an older checkout of `pages/` to compare versions.
+    """
+    for model in models:
+        page = pages_dir / PAGES[model]
+        _warm_up(page, model)  # Load the model.
+        seconds = session(page, model, 1)
+
+        with ProcessPoolExecutor(sessions, initializer=_warm_up, initargs=(page, model)) as pool:
+            runs = list(
+                pool.map(_timed_session, [page] * sessions, [model] * sessions, range(sessions))
+            )
+        cpu = sum(session_cpu for _, session_cpu in runs)
+        visit = np.median([sum(reruns) for reruns, _ in runs])
+
+        logger.info(
+            f"{model}: {len(seconds)} reruns per visit, median {np.median(seconds) * 1e3:.0f} ms, "
+            f"total {sum(seconds) * 1e3:.0f} ms | {sessions} concurrent sessions: "
+            f"{sum(len(reruns) for reruns, _ in runs)} reruns, {cpu:.2f} s CPU, "
+            f"median visit {visit:.2f} s"
+        )
+    logger.success("Page rerun benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
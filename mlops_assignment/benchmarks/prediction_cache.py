@@ -0,0 +1,50 @@
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import predict_lung_cancer
+from mlops_assignment.benchmarks.synthetic import lung_cancer_frame
+from mlops_assignment.cache import PredictionCache
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    requests: int = 5_000,
+    distinct_patients: int = 2_000,
+    zipf_exponent: float = 1.2,
+    max_entries: int = 1_000,
+):
+    """
+    Replay a skewed single-patient workload with and without the prediction cache.
+
+    Patients are drawn from a Zipf distribution over `distinct_patients`
+    feature vectors, mimicking a few common form selections that recur
+    constantly and a long tail of rare ones.
+    """
+    pool = lung_cancer_frame(distinct_patients)
+    rng = np.random.default_rng(123)
+    picks = (rng.zipf(zipf_exponent, size=requests) - 1) % distinct_patients
+    rows = [pool.iloc[[i]] for i in picks]
+
+    for label, size in [("uncached", 0), ("cached", max_entries)]:
+        cache = PredictionCache("lung_cancer", predict_lung_cancer.FEATURE_COLUMNS, size)
+        start = time.perf_counter()
+        for row in rows:
+            cache.predict(row, predict_lung_cancer._predict_uncached)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.stats()
+        hit_rate = stats["hits"] / max(stats["hits"] + stats["misses"], 1)
+        logger.info(
+            f"{label}: {requests / elapsed:,.0f} req/s | hit rate {hit_rate:.1%} | "
+            f"{stats['evictions']} evictions"
+        )
+    logger.success("Prediction cache benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,121 @@
+from collections import Counter
+import subprocess
+import sys
+import threading
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment import predict_alzheimer, predict_lung_cancer, profiling
+from mlops_assignment.benchmarks.synthetic import FRAMES
+from mlops_assignment.config import PROJ_ROOT
+
+app = typer.Typer()
+
+PREDICTORS = {"alzheimer": predict_alzheimer, "lung_cancer": predict_lung_cancer}
+
+# Imports the profiler in a fresh interpreter after the config every caller already
+# imports, and prints the seconds taken and the modules it added besides itself.
+IMPORT_PROBE = """
+import sys, time
+import mlops_assignment.config
+before = set(sys.modules)
+start = time.perf_counter()
+import mlops_assignment.profiling
+elapsed = time.perf_counter() - start
+print(elapsed, *sorted(set(sys.modules) - before - {"mlops_assignment.profiling"}))
+"""
+
+
+def disabled_call_seconds(n: int = 1_000_000) -> float:
+    """Seconds an unsampled `profiling.profile` block costs, measured over `n` empty blocks."""
+    start = time.perf_counter()
+    for _ in range(n):
+        with profiling.profile("benchmark"):
+            pass
+    return (time.perf_counter() - start) / n
+
+
+def predict_uncached(name: str, df) -> None:
+    module = PREDICTORS[name]
+    module._cache.clear()
+    if name == "alzheimer":
+        module.predict(df)
+    else:
+        module.predict_lung_cancer_batch(df)
+
+
+def best_of(name: str, df, repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_uncached(name, df)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(PREDICTORS), "--model"),
+    rows: int = 10_000,
+    repeats: int = 10,
+):
+    """
+    Measure what profiling costs while disabled and show what a profile holds.
+
+    Reports the modules and time importing `profiling` adds, prices an
+    unsampled call against a `rows`-row batch, and profiles one batch
+    per model to compare its time and list its hottest frames. The
+    prediction cache is cleared before every batch.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=PROJ_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_seconds, *added = result.stdout.split()
+    logger.info(
+        f"Importing profiling: {float(import_seconds) * 1e3:.2f} ms, "
+        f"modules added: {', '.join(added) or 'none'}"
+    )
+
+    profiling.every = 0
+    per_call = disabled_call_seconds()
+    logger.info(f"Unsampled call: {per_call * 1e9:.0f} ns")
+
+    for name in models:
+        df = FRAMES[name](rows)
+        predict_uncached(name, df)  # Load the model and warm up.
+        off = best_of(name, df, repeats)
+
+        profiling.every = 1
+        on = best_of(name, df, repeats)
+        profiling.every = 0
+
+        sampler = profiling.Sampler(f"{name}_benchmark", threading.get_ident()).start()
+        predict_uncached(name, df)
+        path = sampler.stop()
+
+        logger.info(
+            f"{name} x{rows:,}: {off * 1e3:,.1f} ms, disabled overhead "
+            f"{per_call / off * 100:.5f}% | profiled {on * 1e3:,.1f} ms "
+            f"({(on - off) / off * 100:+.1f}%)"
+        )
+        leaves = Counter()
+        for line in path.read_text().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            _, thread, *frames = stack.split(";")
+            # The batch is scored on this thread; the others are idle.
+            if thread == threading.current_thread().name:
+                leaves[frames[-1]] += int(count)
+        logger.info(f"  {path.relative_to(PROJ_ROOT)}, {sum(leaves.values())} samples")
+        for frame, count in leaves.most_common(5):
+            logger.info(f"  {count:>5}  {frame}")
+    logger.success("Profiling benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
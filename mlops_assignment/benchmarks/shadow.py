@@ -0,0 +1,96 @@
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_assignment import audit, predict_alzheimer, predict_lung_cancer, schema, shadow
+from mlops_assignment.benchmarks.synthetic import domain_frame
+from mlops_assignment.config import PROJ_ROOT
+from mlops_assignment.registry import MODEL_PATHS
+from mlops_assignment.streaming import PREDICTORS
+
+app = typer.Typer()
+
+
+def latencies_ms(model: str, frames: list[pd.DataFrame]) -> np.ndarray:
+    """Time of each served predictor call, scoring every frame from scratch."""
+    seconds = []
+    for frame in frames:
+        predict_alzheimer._cache.clear()
+        predict_lung_cancer._cache.clear()
+        start = time.perf_counter()
+        PREDICTORS[model](frame)
+        seconds.append(time.perf_counter() - start)
+    return np.array(seconds) * 1e3
+
+
+def summary(latencies: np.ndarray) -> str:
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return f"p50 {p50:8.2f} ms, p95 {p95:8.2f} ms"
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    candidates: list[str] = typer.Option(
+        None, "--candidate", help="`<model>=<source>` pairs. Defaults to the served pickles."
+    ),
+    calls: int = 300,
+    batch_rows: int = 1_000,
+    workers: int = 1,
+):
+    """
+    Compare served predictor latency with shadow scoring off and on.
+
+    Times `calls` single-row calls and `calls // 10` `batch_rows`-row
+    calls of each predictor, on new rows so no call is a cache hit, first
+    with no shadows and then with every candidate shadow scoring every
+    call in `workers` background processes. By default each model's
+    served pickle is its own candidate, so agreement should be 1. Then
+    prints the shadow report.
+    """
+    audit.enabled = False  # Keep the benchmark's calls out of the real log.
+    if candidates:
+        sources = shadow.parse(",".join(candidates))
+    else:
+        sources = {model: [str(MODEL_PATHS[model].relative_to(PROJ_ROOT))] for model in models}
+    workloads = {
+        model: {
+            "single row": [domain_frame(model, 1, seed=i) for i in range(calls)],
+            f"{batch_rows:,} rows": [
+                domain_frame(model, batch_rows, seed=i) for i in range(calls // 10)
+            ],
+        }
+        for model in models
+    }
+
+    for model in models:
+        PREDICTORS[model](domain_frame(model, 10))  # Load the model and warm up.
+    results = {}
+    for mode in ["shadows off", "shadows on"]:
+        if mode == "shadows on":
+            # Generous queue, so no call goes unshadowed in the comparison.
+            shadow.configure(sources, workers=workers, max_pending=10 * calls)
+            for model in models:
+                # Start the workers and let them load every pipeline first.
+                PREDICTORS[model](domain_frame(model, 10, seed=calls))
+            shadow.flush()
+        for model in models:
+            for workload, frames in workloads[model].items():
+                results[model, workload, mode] = latencies_ms(model, frames)
+
+    for (model, workload, mode), latencies in results.items():
+        logger.info(f"{model} {workload:<11} {mode:<11}: {summary(latencies)}")
+    start = time.perf_counter()
+    shadow.flush()
+    logger.info(f"Shadow scoring finished {time.perf_counter() - start:.1f}s after the last call")
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        logger.info(f"Shadow report:\n{shadow.report().drop(columns='last_error')}")
+    shadow.close()
+    logger.success("Shadow scoring benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
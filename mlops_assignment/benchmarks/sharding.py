@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment.benchmarks.synthetic import write_csv
+from mlops_assignment.config import PROJ_ROOT
+
+app = typer.Typer()
+
+
+def _worker_counts(max_workers: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+@app.command()
+def main(
+    model: str = "lung_cancer",
+    rows: int = 5_000_000,
+    chunk_size: int = 50_000,
+    max_workers: int = os.cpu_count() or 1,
+):
+    """Time the sharded batch CLI on a synthetic file from 1 to `max_workers` processes."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = write_csv(model, rows, Path(tmp_dir) / "input.csv")
+        baseline = None
+
+        for workers in _worker_counts(max_workers):
+            options = {
+                "--input-path": input_path,
+                "--model": model,
+                "--predictions-path": Path(tmp_dir) / "output.csv",
+                "--workers": workers,
+                "--chunk-size": chunk_size,
+            }
+            command = [sys.executable, "-m", "mlops_assignment.modeling.predict"]
+            for flag, value in options.items():
+                command += [flag, str(value)]
+
+            start = time.perf_counter()
+            subprocess.run(command, cwd=PROJ_ROOT, capture_output=True, check=True)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            logger.info(
+                f"{workers:>3} workers: {elapsed:7.1f}s | {rows / elapsed:>10,.0f} rows/s | "
+                f"speedup {baseline / elapsed:.2f}x"
+            )
+    logger.success("Sharding benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,50 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+from loguru import logger
+import typer
+
+from mlops_assignment.benchmarks.synthetic import write_csv
+from mlops_assignment.config import PROJ_ROOT
+
+app = typer.Typer()
+
+# Scores a file in a fresh interpreter and prints its peak RSS in MiB.
+PROBE = """
+import resource
+from mlops_assignment.streaming import score_csv
+score_csv({input!r}, {output!r}, {model!r}, {chunk_size})
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def peak_rss_mib(input_path: Path, output_path: Path, model: str, chunk_size: int) -> float:
+    code = PROBE.format(
+        input=str(input_path), output=str(output_path), model=model, chunk_size=chunk_size
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJ_ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+@app.command()
+def main(
+    model: str = "lung_cancer",
+    sizes: list[int] = typer.Option([10_000, 1_000_000, 10_000_000], "--size"),
+    chunk_size: int = 50_000,
+):
+    """Report peak RSS of chunked CSV scoring for synthetic inputs of each size."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            input_path = write_csv(model, n_rows, Path(tmp_dir) / "input.csv")
+            size_mib = input_path.stat().st_size / 2**20
+            rss = peak_rss_mib(input_path, Path(tmp_dir) / "output.csv", model, chunk_size)
+            logger.info(f"{n_rows:>10,} rows ({size_mib:,.0f} MiB CSV): peak RSS {rss:,.0f} MiB")
+    logger.success("Streaming benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,263 @@
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import tempfile
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_assignment import audit, compiled, predict_alzheimer, predict_lung_cancer, schema
+from mlops_assignment.benchmarks.cold_start import PREDICTORS as MODULES
+from mlops_assignment.benchmarks.cold_start import probe
+from mlops_assignment.benchmarks.streaming import peak_rss_mib
+from mlops_assignment.benchmarks.synthetic import domain_frame, write_csv
+from mlops_assignment.config import BENCHMARK_RESULTS_PATH, PROJ_ROOT
+from mlops_assignment.streaming import DEFAULT_CHUNK_SIZE, PREDICTORS
+
+app = typer.Typer()
+
+# Regression gates, matched on the end of a metric's name in order: (suffix,
+# higher is better, allowed relative change). Timings vary more between runs
+# than memory does.
+GATES = [
+    ("_rows_per_s", True, 0.20),
+    ("_mib", False, 0.10),
+    ("_ms", False, 0.25),
+    ("_s", False, 0.25),
+]
+
+
+def clear_caches() -> None:
+    """Score from scratch, not from rows the prediction caches kept from an earlier call."""
+    predict_alzheimer._cache.clear()
+    predict_lung_cancer._cache.clear()
+
+
+# Files that running the benchmarks writes to, which do not make the code dirty.
+WRITTEN_BY_RUNS = [BENCHMARK_RESULTS_PATH]
+
+
+def commit_key() -> str:
+    """The checked-out commit, marked `+dirty` when tracked files have uncommitted changes."""
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=PROJ_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    sha = git("rev-parse", "HEAD")
+    excluded = [
+        f":(exclude){path.resolve().relative_to(PROJ_ROOT.resolve()).as_posix()}"
+        for path in WRITTEN_BY_RUNS
+        if path.resolve().is_relative_to(PROJ_ROOT.resolve())
+    ]
+    changes = git("status", "--porcelain", "--untracked-files=no", "--", ".", *excluded)
+    return f"{sha}+dirty" if changes else sha
+
+
+def short(key: str) -> str:
+    return key[:12] + key[40:]
+
+
+def environment() -> dict:
+    """What results depend on besides the code; only results from the same one are compared."""
+    return {
+        "machine": f"{platform.node()} {platform.machine()} {os.cpu_count()} CPUs",
+        "python": platform.python_version(),
+        "backend": compiled.backend,
+    }
+
+
+def single_row_ms(model: str, repeats: int) -> float:
+    """Median latency of the model's predictor on one new patient, in milliseconds."""
+    rows = domain_frame(model, repeats, seed=1)
+    seconds = []
+    for i in range(repeats):
+        clear_caches()
+        start = time.perf_counter()
+        PREDICTORS[model](rows.iloc[[i]])
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds)) * 1e3
+
+
+def rows_per_s(model: str, rows: int, repeats: int) -> float:
+    """Best throughput of the model's predictor on a batch of `rows` new patients."""
+    batch = domain_frame(model, rows, seed=2)
+    seconds = []
+    for _ in range(repeats):
+        clear_caches()
+        start = time.perf_counter()
+        PREDICTORS[model](batch)
+        seconds.append(time.perf_counter() - start)
+    return rows / min(seconds)
+
+
+def ingest_rows_per_s(path: Path, model: str, repeats: int) -> float:
+    """Best rate of reading `path` in chunks and validating it, as batch scoring does."""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = 0
+        for chunk in pd.read_csv(path, chunksize=DEFAULT_CHUNK_SIZE):
+            schema.validate(chunk, model, rows)
+            rows += len(chunk)
+        seconds.append(time.perf_counter() - start)
+    return rows / min(seconds)
+
+
+def cold_metrics(model: str, csv_path: Path, cold_repeats: int) -> dict:
+    """Metrics of `model` measured in fresh interpreters: imports and loads are cold."""
+    cold = [probe(MODULES[model], model) for _ in range(cold_repeats)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        peak = peak_rss_mib(csv_path, Path(tmp_dir) / "output.csv", model, DEFAULT_CHUNK_SIZE)
+    return {
+        "import_s": min(run["import_s"] for run in cold),
+        "cold_load_s": min(run["first_load_s"] for run in cold),
+        "loaded_rss_mib": min(run["loaded_rss_mib"] for run in cold),
+        "csv_score_peak_rss_mib": peak,
+    }
+
+
+def warm_metrics(model: str, csv_path: Path, batch_sizes: list[int], repeats: int) -> dict:
+    """Metrics of `model` measured in this process, once its model is loaded."""
+    PREDICTORS[model](domain_frame(model, 10))  # Load the model and warm up.
+    results = {"single_row_ms": single_row_ms(model, repeats * 10)}
+    for rows in batch_sizes:
+        results[f"batch_{rows}_rows_per_s"] = rows_per_s(model, rows, repeats)
+    results["csv_ingest_rows_per_s"] = ingest_rows_per_s(csv_path, model, repeats)
+    return results
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def gate(metric: str) -> tuple[bool, float]:
+    """`(higher is better, allowed relative change)` of `metric`."""
+    for suffix, higher, tolerance in GATES:
+        if metric.endswith(suffix):
+            return higher, tolerance
+    raise ValueError(f"No regression gate matches the metric '{metric}'.")
+
+
+def regressions(current: dict, baseline: dict) -> list[str]:
+    """One message per metric of `current` that regressed past its gate from `baseline`."""
+    failed = []
+    for metric, value in current.items():
+        if metric not in baseline:
+            continue
+        higher, tolerance = gate(metric)
+        change = value / baseline[metric] - 1
+        if (-change if higher else change) > tolerance:
+            failed.append(
+                f"{metric}: {baseline[metric]:,.3f} -> {value:,.3f} "
+                f"({change:+.0%}, allowed {tolerance:.0%})"
+            )
+    return failed
+
+
+@app.command()
+def run(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    batch_sizes: list[int] = typer.Option([1_000, 10_000, 100_000], "--batch-size"),
+    csv_rows: int = 200_000,
+    repeats: int = 5,
+    cold_repeats: int = 3,
+    results_path: Path = BENCHMARK_RESULTS_PATH,
+):
+    """
+    Measure both predictors and record the results under the current commit.
+
+    For each model: import time of its predictor module, cold model load
+    time and the RSS after it, single-row latency, batch throughput at each
+    of `batch_sizes`, the rate of reading and validating a `csv_rows`-row
+    CSV of the real data resampled, and the peak RSS of scoring that CSV.
+    Latency and throughput are measured on rows drawn across each column's
+    domain, with the prediction caches cleared, so no call is a cache hit.
+    Results replace any earlier ones of the same commit in `results_path`.
+    """
+    audit.enabled = False  # Keep the benchmark's calls out of the real log.
+    key = commit_key()
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The real patients, resampled up to `csv_rows`.
+        csv_paths = {
+            model: write_csv(model, csv_rows, Path(tmp_dir) / f"{model}.csv", chunk_size=50_000)
+            for model in models
+        }
+        # A child process's peak RSS starts at its parent's, so every process is
+        # started before this one loads a model or scores a batch.
+        for model in models:
+            cold = cold_metrics(model, csv_paths[model], cold_repeats)
+            metrics.update({f"{model}.{metric}": value for metric, value in cold.items()})
+        for model in models:
+            warm = warm_metrics(model, csv_paths[model], batch_sizes, repeats)
+            metrics.update({f"{model}.{metric}": value for metric, value in warm.items()})
+    for metric, value in metrics.items():
+        logger.info(f"{metric:<45} {value:>14,.3f}")
+
+    results = load_results(results_path)
+    results[key] = {
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "metrics": metrics,
+    }
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = results_path.with_name(f".{results_path.name}.tmp")
+    scratch.write_text(json.dumps(results, indent=2) + "\n")
+    scratch.replace(results_path)
+    logger.success(f"Benchmark results of {short(key)} written to {results_path}.")
+
+
+@app.command()
+def check(
+    baseline: str = typer.Option(None, help="Commit to compare against."),
+    results_path: Path = BENCHMARK_RESULTS_PATH,
+):
+    """
+    Fail when a metric of the current commit regressed past its gate.
+
+    Compares against `baseline`, or by default the most recently recorded
+    clean commit measured in the same environment (machine, Python version
+    and inference backend). Passes when there is nothing to compare against.
+    """
+    results = load_results(results_path)
+    key = commit_key()
+    if key not in results:
+        logger.error(f"No results for {short(key)}; run the suite first.")
+        raise typer.Exit(code=1)
+    current = results[key]
+
+    if baseline is None:
+        candidates = [
+            (entry["recorded"], commit)
+            for commit, entry in results.items()
+            if commit != key
+            and not commit.endswith("+dirty")
+            and entry["environment"] == current["environment"]
+        ]
+        if not candidates:
+            logger.warning("No earlier results from this environment to compare against.")
+            return
+        baseline = max(candidates)[1]
+    matches = [baseline] if baseline in results else [c for c in results if c.startswith(baseline)]
+    if len(matches) != 1:
+        logger.error(f"Expected one recorded commit matching '{baseline}', found {len(matches)}.")
+        raise typer.Exit(code=1)
+
+    failed = regressions(current["metrics"], results[matches[0]]["metrics"])
+    for message in failed:
+        logger.error(message)
+    if failed:
+        raise typer.Exit(code=1)
+    logger.success(f"No regressions against {short(matches[0])}.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mlops_assignment.config import ALZHEIMER_RAW_PATH, LUNG_CANCER_PROCESSED_PATH
+from mlops_assignment.dataset import load_dataset
+from mlops_assignment.schema import SCHEMAS
+
+
+def _resample(df: pd.DataFrame, n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(df), size=n_rows)
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def alzheimer_frame(n_rows: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Build an `n_rows` Alzheimer's feature frame by resampling real patients.
+
+    Rows are drawn with replacement from the raw dataset, so every column
+    keeps its value domain and joint distribution. Identifier and target
+    columns are dropped.
+    """
+    df = load_dataset(ALZHEIMER_RAW_PATH).drop(
+        columns=["PatientID", "Diagnosis", "DoctorInCharge"]
+    )
+    return _resample(df, n_rows, seed)
+
+
+def lung_cancer_frame(n_rows: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Build an `n_rows` lung cancer feature frame by resampling real patients.
+
+    Rows are drawn with replacement from `Lung_Patient_Cleaned.csv`, so every
+    column keeps the value domain and joint distribution of the real data.
+    The target column `Level` and the saved index column are dropped.
+    """
+    df = load_dataset(LUNG_CANCER_PROCESSED_PATH).drop(columns=["Level"])
+    return _resample(df, n_rows, seed)
+
+
+FRAMES = {
+    "alzheimer": alzheimer_frame,
+    "lung_cancer": lung_cancer_frame,
+}
+
+
+def domain_frame(model: str, n_rows: int, seed: int = 123) -> pd.DataFrame:
+    """
+    Build an `n_rows` feature frame for `model` with values drawn across each column's domain.
+
+    Every schema column is drawn independently and uniformly from its
+    allowed codes or range, so the rows are valid inputs but almost never
+    repeat. Unlike the resampled `FRAMES`, whose rows repeat the real
+    patients, they are not answered from the prediction caches.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, rule in SCHEMAS[model].items():
+        if "values" in rule:
+            columns[name] = rng.choice(rule["values"], size=n_rows)
+        elif rule["dtype"] == "int":
+            low, high = rule["range"]
+            columns[name] = rng.integers(low, high, size=n_rows, endpoint=True)
+        else:
+            columns[name] = rng.uniform(*rule["range"], size=n_rows)
+    return pd.DataFrame(columns)
+
+
+def write_csv(model: str, n_rows: int, path: Path, chunk_size: int = 500_000) -> Path:
+    """Write an `n_rows` synthetic CSV for `model` in chunks, keeping memory flat."""
+    with open(path, "w", newline="") as handle:
+        for i, start in enumerate(range(0, n_rows, chunk_size)):
+            chunk = FRAMES[model](min(chunk_size, n_rows - start), seed=i)
+            chunk.to_csv(handle, header=i == 0, index=False)
+    return path
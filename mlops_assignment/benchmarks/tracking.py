@@ -0,0 +1,74 @@
+from pathlib import Path
+import tempfile
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment.modeling import train
+
+app = typer.Typer()
+
+
+def pycaret_flow(name: str, include: list[str], log_experiment) -> float:
+    """Run setup, compare, tune and finalize with `log_experiment`; return the seconds taken."""
+    from pycaret.classification import ClassificationExperiment
+
+    spec = train.TRAINING_SPECS[name]
+    data, _ = train.load_training_data(name)
+    start = time.perf_counter()
+    experiment = ClassificationExperiment()
+    experiment.setup(
+        data,
+        **spec["setup"],
+        log_experiment=log_experiment,
+        experiment_name=spec["experiment"],
+        html=False,
+        verbose=False,
+    )
+    best = experiment.compare_models(include=include, sort=spec["sort"], verbose=False)
+    tuned = experiment.tune_model(best, verbose=False, **spec["tune"])
+    experiment.finalize_model(tuned)
+    return time.perf_counter() - start
+
+
+@app.command()
+def main(
+    model: str = "alzheimer",
+    include: list[str] = typer.Option(["lr", "dt", "knn", "lightgbm"], "--include"),
+    repeat: int = typer.Option(3, help="Runs per mode; the fastest is reported."),
+):
+    """
+    Measure the wall-clock cost of MLflow tracking during a PyCaret training run.
+
+    Times the same compare/tune/finalize flow without logging, with
+    PyCaret's synchronous `MlflowLogger`, and with `tracking.AsyncMlflowLogger`,
+    each writing to its own temporary tracking store. The modes take turns
+    so that machine load affects them alike.
+    """
+    import mlflow
+
+    from mlops_assignment.tracking import AsyncMlflowLogger, AsyncTracker
+
+    seconds = {"none": [], "mlflow": [], "async": []}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mlflow.set_tracking_uri(Path(tmp_dir, "sync").as_uri())
+        for _ in range(repeat):
+            seconds["none"].append(pycaret_flow(model, include, False))
+            seconds["mlflow"].append(pycaret_flow(model, include, True))
+
+            tracker = AsyncMlflowLogger(AsyncTracker(Path(tmp_dir, "async").as_uri()))
+            start = time.perf_counter()
+            pycaret_flow(model, include, [tracker])
+            tracker.close()
+            seconds["async"].append(time.perf_counter() - start)
+
+    seconds = {label: min(values) for label, values in seconds.items()}
+    for label, value in seconds.items():
+        overhead = value - seconds["none"]
+        logger.info(f"{label:<8}{value:>8.1f}s  tracking overhead {overhead:>+6.1f}s")
+    logger.success("Tracking benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,71 @@
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment.config import TRAINING_CACHE_DIR
+from mlops_assignment.modeling import train
+from mlops_assignment.registry import MODEL_PATHS
+
+app = typer.Typer()
+
+
+def notebook_flow(name: str, models_dir: Path) -> float:
+    """Run the notebook's sequential compare/tune/compare/finalize flow and return its seconds."""
+    from pycaret.classification import ClassificationExperiment
+
+    spec = train.TRAINING_SPECS[name]
+    start = time.perf_counter()
+    data, _ = train.load_training_data(name)
+    experiment = ClassificationExperiment()
+    experiment.setup(data, **spec["setup"], html=False, verbose=False)
+
+    selected = experiment.compare_models(
+        sort=spec["sort"], n_select=spec["n_select"], verbose=False
+    )
+    selected = selected if isinstance(selected, list) else [selected]
+    tuned = [experiment.tune_model(m, verbose=False, **spec["tune"]) for m in selected]
+    if len(tuned) > 1:
+        tuned = [experiment.compare_models(include=tuned, sort=spec["sort"], verbose=False)]
+
+    final = experiment.finalize_model(tuned[0])
+    experiment.save_model(final, str(models_dir / MODEL_PATHS[name].stem))
+    return time.perf_counter() - start
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(train.TRAINING_SPECS), "--model"),
+    workers: int = typer.Option(4, help="Training processes for modeling/train.py."),
+    cold: bool = typer.Option(True, help="Clear the preprocessing cache before training."),
+):
+    """
+    Time the notebook training flow against `modeling/train.py` on this machine.
+
+    Both write their pipelines to a temporary directory, leaving `models/`
+    untouched. With `--cold` the training cache is cleared first, so the
+    comparison includes fitting every fold's preprocessing once.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in models:
+            notebook_seconds = notebook_flow(name, Path(tmp_dir))
+
+            if cold:
+                shutil.rmtree(TRAINING_CACHE_DIR / name, ignore_errors=True)
+            start = time.perf_counter()
+            train.train(name, workers, Path(tmp_dir))
+            train_seconds = time.perf_counter() - start
+
+            logger.info(
+                f"{name}: notebook flow {notebook_seconds:,.1f}s | train.py "
+                f"{train_seconds:,.1f}s with {workers} workers "
+                f"({notebook_seconds / train_seconds:.1f}x)"
+            )
+    logger.success("Training benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
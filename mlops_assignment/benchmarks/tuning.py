@@ -0,0 +1,65 @@
+import time
+
+from loguru import logger
+from sklearn.base import clone
+import typer
+
+from mlops_assignment.modeling import train, tune
+from mlops_assignment.registry import get_model
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    model: str = "lung_cancer",
+    budget_minutes: float = 10,
+    pycaret_trials: int = 10,
+):
+    """
+    Compare tuning throughput and best score for a fixed time budget.
+
+    Tunes the saved pipeline's estimator three ways:
+
+    - PyCaret's `tune_model`, as in the notebooks, for `pycaret_trials` trials.
+    - Every trial scored on all folds (no pruning, early stopping or warm
+      start) within the budget.
+    - `modeling.tune` with median pruning, early stopping and a warm start
+      within the same budget.
+    """
+    spec = train.TRAINING_SPECS[model]
+    optimize = spec["sort"]
+    data, _ = train.load_training_data(model)
+    experiment = train.setup_experiment(model, data)
+    candidate = clone(get_model(model).steps[-1][1])
+
+    start = time.perf_counter()
+    tune_args = {**spec["tune"], "n_iter": pycaret_trials}
+    experiment.tune_model(candidate, choose_better=False, verbose=False, **tune_args)
+    elapsed = time.perf_counter() - start
+    best = experiment.pull().loc["Mean", optimize]
+    logger.info(
+        f"tune_model: {pycaret_trials} trials in {elapsed:.0f}s, "
+        f"{pycaret_trials / elapsed * 3600:,.0f} trials/hour, best {optimize} {best:.4f}"
+    )
+
+    folds = tune.prepare_folds(experiment)
+    for label, options in [
+        ("exhaustive", {"pruner": "none", "early_stopping": False}),
+        ("pruned", {"pruner": "median", "warm_start_from": spec["experiment"]}),
+    ]:
+        _, summary = tune.tune(
+            experiment,
+            candidate,
+            optimize,
+            folds,
+            timeout=budget_minutes * 60,
+            seed=spec["setup"]["session_id"],
+            **options,
+        )
+        logger.info(f"{label}: {tune.format_summary(summary, optimize)}")
+    logger.success("Tuning benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
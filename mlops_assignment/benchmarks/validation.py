@@ -0,0 +1,77 @@
+import time
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import schema
+from mlops_assignment.benchmarks.synthetic import FRAMES
+
+app = typer.Typer()
+
+
+def corrupt(df, fraction: float, n_columns: int, seed: int = 0):
+    """
+    Break one of `n_columns` random features in a `fraction` of the rows.
+
+    Half the broken values are out of range and half are not numbers.
+    Broken columns are turned to text, as `read_csv` reads a column holding
+    any value that is not a number.
+    """
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    rows = rng.choice(len(df), size=int(len(df) * fraction), replace=False)
+    columns = rng.choice(rng.choice(df.columns, n_columns, replace=False), size=len(rows))
+    for column in np.unique(columns):
+        picked = rows[columns == column]
+        text = df[column].astype(str).to_numpy(dtype=object)
+        text[picked[::2]] = "-1"
+        text[picked[1::2]] = "unknown"
+        df[column] = text
+    return df
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    rows: int = 1_000_000,
+    invalid: float = typer.Option(0.01, help="Fraction of rows corrupted after the clean run."),
+    broken_columns: list[int] = typer.Option([2, 0], "--broken-columns", help="0 means all."),
+    repeats: int = 3,
+    max_seconds: float = typer.Option(1.0, help="Fail if validating a clean frame takes longer."),
+):
+    """
+    Time `schema.validate` on `rows`-row frames, clean and with invalid rows.
+
+    After the clean run, an `invalid` fraction of rows is broken in each
+    `--broken-columns` count of columns. Broken columns hold text, so
+    those runs also pay for converting them to numbers.
+    """
+    failed = False
+    for name in models:
+        clean = FRAMES[name](rows)
+        runs = [("clean", clean)]
+        for n_columns in broken_columns:
+            n_columns = n_columns or len(clean.columns)
+            runs.append((f"{n_columns} broken", corrupt(clean, invalid, n_columns)))
+        for label, df in runs:
+            seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                errors = schema.validate(df, name)
+                seconds.append(time.perf_counter() - start)
+            logger.info(
+                f"{name} x{rows:,} {label:<11}{min(seconds) * 1e3:>8.1f} ms, "
+                f"{len(errors):,} rows rejected"
+            )
+            if label == "clean":
+                failed |= min(seconds) > max_seconds
+
+    if failed:
+        logger.error(f"Validating a clean frame took more than {max_seconds}s.")
+        raise typer.Exit(code=1)
+    logger.success("Validation benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
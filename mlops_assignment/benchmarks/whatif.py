@@ -0,0 +1,67 @@
+import time
+
+from loguru import logger
+import typer
+
+from mlops_assignment import predict_alzheimer, predict_lung_cancer, schema, whatif
+from mlops_assignment.benchmarks.synthetic import FRAMES
+
+app = typer.Typer()
+
+
+def predict_one(name: str, patient) -> None:
+    """Score one patient as the page's Predict button does, bypassing the prediction cache."""
+    if name == "alzheimer":
+        predict_alzheimer._cache.clear()
+        predict_alzheimer.predict(patient)
+    else:
+        predict_lung_cancer._cache.clear()
+        predict_lung_cancer.predict_lung_cancer(patient)
+
+
+def best_of(run, repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+@app.command()
+def main(
+    models: list[str] = typer.Option(list(schema.SCHEMAS), "--model"),
+    points: int = whatif.DEFAULT_POINTS,
+    repeats: int = 20,
+    max_ratio: float = typer.Option(2.0, help="Fail if a sweep takes this many predictions."),
+):
+    """
+    Time a full what-if sweep of one patient against one single-patient prediction.
+
+    The sweep changes every feature across its whole domain and scores all
+    the resulting rows in one batch.
+    """
+    failed = False
+    for name in models:
+        patient = FRAMES[name](1)
+        predict_one(name, patient)  # Load the model and warm up.
+
+        single = best_of(lambda: predict_one(name, patient), repeats)
+        _, curves = whatif.sweep(patient, name, points=points)
+        full = best_of(lambda: whatif.sweep(patient, name, points=points), repeats)
+
+        ratio = full / single
+        logger.info(
+            f"{name}: one prediction {single * 1e3:.1f} ms | sweep of {len(curves)} rows "
+            f"over {curves['Feature'].nunique()} features {full * 1e3:.1f} ms ({ratio:.2f}x)"
+        )
+        failed |= ratio > max_ratio
+
+    if failed:
+        logger.error(f"A sweep took more than {max_ratio}x one prediction.")
+        raise typer.Exit(code=1)
+    logger.success("What-if benchmark complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mlops_assignment.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from mlops_assignment.registry import identity
+
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache of per-row predictions for one served model.
+
+    Entries are keyed by the model file's identity (path and mtime) plus a
+    64-bit hash of the row's feature values cast to float64, so equal
+    patients hit the same entry however their values were typed, and every
+    entry is invalidated as soon as the `.pkl` changes. Batch calls only
+    send the rows that miss to the model.
+
+    Parameters
+    ----------
+    model : str
+        Registry name of the model, used to look up its file identity.
+    feature_columns : list[str]
+        Columns that make up the cache key, in canonical order.
+    max_entries : int
+        Maximum number of cached rows; 0 disables the cache.
+    ttl : float
+        Seconds an entry stays valid after it is stored.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        feature_columns: list[str],
+        max_entries: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+    ):
+        self.model = model
+        self.feature_columns = feature_columns
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _row_keys(self, input_df: pd.DataFrame) -> list | None:
+        columns = [c for c in self.feature_columns if c in input_df.columns]
+        try:
+            canonical = input_df[columns].astype(np.float64)
+        except (TypeError, ValueError):
+            return None
+        prefix = (identity(self.model), tuple(columns))
+        hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+        return [(prefix, h) for h in hashes.tolist()]
+
+    def predict(self, input_df: pd.DataFrame, predict_batch) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return `(predictions, probabilities)` for `input_df`, scoring only cache misses.
+
+        Batches larger than the cache, and rows that cannot be cast to
+        numbers, are passed straight to `predict_batch`.
+        """
+        if not 0 < len(input_df) <= self.max_entries:
+            return predict_batch(input_df)
+        keys = self._row_keys(input_df)
+        if keys is None:
+            return predict_batch(input_df)
+
+        now = time.monotonic()
+        cached = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    cached[i] = entry[1]
+            hits = sum(entry is not None for entry in cached)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        if missing:
+            preds, probs = predict_batch(input_df.iloc[missing])
+            expires = time.monotonic() + self.ttl
+            with self._lock:
+                for i, pred, prob in zip(missing, preds, probs):
+                    cached[i] = (pred, prob)
+                    self._entries[keys[i]] = (expires, cached[i])
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        preds, probs = zip(*cached)
+        return np.asarray(preds), np.asarray(probs, dtype=np.float64)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
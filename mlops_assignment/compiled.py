@@ -0,0 +1,172 @@
+from pathlib import Path
+import threading
+
+import joblib
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from mlops_assignment import metrics
+from mlops_assignment.config import COMPILED_MODELS_DIR, INFERENCE_BACKEND
+from mlops_assignment.fast_inference import LeanPipeline
+from mlops_assignment.registry import MODEL_PATHS
+
+BACKENDS = ("native", "onnx", "treelite")
+
+# Backend used by the predictors; can be changed at runtime, e.g. by benchmarks.
+backend = INFERENCE_BACKEND
+
+# Compiled model file suffix of each backend; metadata is in `<name>.<backend>.joblib`.
+SUFFIXES = {"onnx": ".onnx", "treelite": ".treelite.so"}
+
+# Loaded pipelines: {(name, backend): (stamp, pipeline or None)}. None records
+# a backend that could not be loaded, so the failure is logged once.
+_pipelines = {}
+_lock = threading.Lock()
+
+
+def paths(name: str, backend: str, directory: Path = COMPILED_MODELS_DIR) -> tuple[Path, Path]:
+    """`(model, metadata)` paths of the compiled pipeline `name` for `backend`."""
+    return directory / f"{name}{SUFFIXES[backend]}", directory / f"{name}.{backend}.joblib"
+
+
+def source_stamp(name: str) -> tuple[int, int]:
+    """`(size, mtime_ns)` of the pickle a compiled pipeline was built from."""
+    stat = MODEL_PATHS[name].stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class OnnxPipeline(LeanPipeline):
+    """
+    A pipeline compiled, preprocessing included, to one ONNX graph.
+
+    The graph takes the `feature_names` columns as a float64 matrix and
+    returns the class probabilities, run by an ONNX Runtime CPU session.
+    """
+
+    def __init__(self, model_path: Path, metadata: dict):
+        # Imported here so the native backend never loads ONNX Runtime.
+        import onnxruntime
+
+        super().__init__({**metadata, "steps": [], "estimator": None})
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"]
+        )
+        self._input = self.session.get_inputs()[0].name
+        self._output = metadata["output"]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.session.run([self._output], {self._input: X})[0]
+
+
+class TreelitePipeline(LeanPipeline):
+    """
+    Lean preprocessing followed by an estimator compiled to a shared library.
+
+    The estimator is compiled to C by treelite and tl2cgen; the fitted
+    transformers run as in `LeanPipeline`.
+    """
+
+    def __init__(self, model_path: Path, metadata: dict):
+        import tl2cgen
+
+        super().__init__({**metadata, "estimator": None})
+        self._dmatrix = tl2cgen.DMatrix
+        self.predictor = tl2cgen.Predictor(str(model_path), nthread=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # Tree estimators compare float32 features, as scikit-learn's trees do.
+        Xt = self.transform(X).astype(np.float32).astype(np.float64)
+        proba = self.predictor.predict(self._dmatrix(Xt, dtype="float64"))
+        return proba.reshape(len(Xt), -1)
+
+
+LOADERS = {"onnx": OnnxPipeline, "treelite": TreelitePipeline}
+
+
+def _load(name: str, backend: str, stamp: tuple):
+    model_path, metadata_path = paths(name, backend)
+    if not model_path.exists() or not metadata_path.exists():
+        logger.warning(
+            f"No {backend} build of {name} in {model_path.parent}; using the native pipeline. "
+            f"Build it with `python -m mlops_assignment.modeling.compile build`."
+        )
+        return None
+    metadata = joblib.load(metadata_path)
+    if tuple(metadata["source"]) != stamp[1]:
+        logger.warning(
+            f"The {backend} build of {name} is older than {MODEL_PATHS[name].name}; "
+            f"using the native pipeline until it is rebuilt."
+        )
+        return None
+    try:
+        pipeline = LOADERS[backend](model_path, metadata)
+    except Exception as e:
+        # A missing runtime, or a build it rejects, e.g. one compiled on another platform.
+        logger.warning(f"Cannot load the {backend} build of {name}, using the native one: {e}")
+        return None
+    logger.info(f"Serving {name} with the {backend} backend")
+    return pipeline
+
+
+def get(name: str, backend_name: str = None):
+    """
+    Return the compiled pipeline of `name` for `backend_name`, or None to use the native one.
+
+    Defaults to the module's `backend`. A pipeline is loaded once per process
+    and reloaded when its artifact or the pickle it was built from changes.
+    """
+    if backend_name is None:
+        backend_name = backend
+    if backend_name == "native":
+        return None
+    if backend_name not in LOADERS:
+        raise ValueError(f"Unknown inference backend '{backend_name}', expected one of {BACKENDS}")
+
+    model_path = paths(name, backend_name)[0]
+    stamp = (model_path.stat().st_mtime_ns if model_path.exists() else None, source_stamp(name))
+    key = (name, backend_name)
+    cached = _pipelines.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _lock:
+        cached = _pipelines.get(key)
+        if cached is None or cached[0] != stamp:
+            _pipelines[key] = (stamp, _load(name, backend_name, stamp))
+        return _pipelines[key][1]
+
+
+def predict(name: str, input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Score `input_df` with the compiled pipeline of `name`, if one is in use.
+
+    Returns `(labels, scores)` as `LeanPipeline.predict` does, or None when
+    the native pipeline should score the rows instead: the backend is
+    `"native"`, its build is unavailable, or it failed on these rows. A
+    failing build is not used again until its artifact changes.
+
+    Raises
+    ------
+    KeyError, ValueError
+        If `input_df` lacks a feature column or holds a non-numeric value.
+        Bad input is the caller's error and leaves the build in use.
+    """
+    pipeline = get(name)
+    if pipeline is None:
+        return None
+    X = pipeline.to_matrix(input_df)
+    try:
+        with metrics.timer(name, backend):
+            return pipeline.predict(X)
+    except Exception as e:
+        logger.warning(f"The {backend} build of {name} failed, using the native one: {e}")
+        with _lock:
+            stamp = _pipelines[name, backend][0]
+            _pipelines[name, backend] = (stamp, None)
+        return None
+
+
+def clear() -> None:
+    """Drop every loaded compiled pipeline, forcing the next call to reload it."""
+    with _lock:
+        _pipelines.clear()
@@ -1,4 +1,6 @@
+import os
 from pathlib import Path
+import tempfile
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -16,10 +18,105 @@ INTERIM_DATA_DIR = DATA_DIR / "interim"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
 EXTERNAL_DATA_DIR = DATA_DIR / "external"
 
+ALZHEIMER_RAW_PATH = RAW_DATA_DIR / "alzheimers_disease_data.csv"
+ALZHEIMER_INTERIM_PATH = INTERIM_DATA_DIR / "alzheimers_disease_data_clean.csv"
+ALZHEIMER_PROCESSED_PATH = PROCESSED_DATA_DIR / "alzheimers_disease_data_cleaned.csv"
+
+LUNG_CANCER_RAW_PATH = RAW_DATA_DIR / "lung _cancer_patient _dataset.csv"
+LUNG_CANCER_PROCESSED_PATH = PROCESSED_DATA_DIR / "Lung_Patient_Cleaned.csv"
+
+# Typed Parquet copies written by dataset.py, keyed by the CSV they mirror.
+PARQUET_PATHS = {
+    ALZHEIMER_RAW_PATH: RAW_DATA_DIR / "alzheimers_disease_data.parquet",
+    ALZHEIMER_PROCESSED_PATH: PROCESSED_DATA_DIR / "alzheimers_disease_data_cleaned.parquet",
+    LUNG_CANCER_RAW_PATH: RAW_DATA_DIR / "lung_cancer_patient_dataset.parquet",
+    LUNG_CANCER_PROCESSED_PATH: PROCESSED_DATA_DIR / "Lung_Patient_Cleaned.parquet",
+}
+
 MODELS_DIR = PROJ_ROOT / "models"
+# Content-addressed store of pipeline steps written by artifact_store.py.
+ARTIFACT_STORE_DIR = MODELS_DIR / "store"
+# Pipelines compiled for the ONNX Runtime and treelite backends by modeling/compile.py.
+COMPILED_MODELS_DIR = MODELS_DIR / "compiled"
+
+# Fitted preprocessing shared by every fold, candidate and tuning trial of
+# modeling/train.py, keyed by transformer parameters and input data.
+TRAINING_CACHE_DIR = INTERIM_DATA_DIR / "training_cache"
+
+# MLflow tracking store holding the notebooks' experiment runs.
+MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", (PROJ_ROOT / "mlruns").as_uri())
+# Where `mlflow server` run from the project root stores `mlflow-artifacts:/` URIs.
+MLFLOW_ARTIFACTS_DIR = PROJ_ROOT / "mlartifacts"
+# Buffered params and metrics are written at least this often, in seconds.
+TRACKING_FLUSH_SECONDS = float(os.getenv("TRACKING_FLUSH_SECONDS", 1))
 
 REPORTS_DIR = PROJ_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
+# Collapsed-stack profiles written by profiling.py.
+PROFILES_DIR = REPORTS_DIR / "profiles"
+# Benchmark suite results, keyed by commit, that `make bench` checks for regressions.
+BENCHMARK_RESULTS_PATH = Path(
+    os.getenv("BENCHMARK_RESULTS_PATH", REPORTS_DIR / "benchmarks.json")
+)
+
+# Predictor inference backend: "native" runs the PyCaret pipeline, "onnx" and "treelite" the
+# pipelines in COMPILED_MODELS_DIR. A compiled backend falls back to the native pipeline when
+# its runtime is not installed or its artifact is missing or older than the pipeline.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "native")
+
+# Prediction service
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", os.cpu_count() or 1))
+
+# Single-row predictions are coalesced for up to MICRO_BATCH_WAIT_MS
+# (0 disables micro-batching) or until MICRO_BATCH_MAX_SIZE rows are queued.
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", 2))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", 64))
+
+# Per-row prediction cache: maximum entries (0 disables it) and entry lifetime in seconds.
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 100_000))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+
+# Prediction latency histograms, served at /metrics by the prediction service and
+# written to METRICS_DUMP_PATH, if set, when a process exits.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH") or None
+
+# Sampling profiler for page runs and predictor calls: one in PROFILE_EVERY of each is
+# profiled (0 disables it), sampling the stack every PROFILE_INTERVAL_MS. A page opened
+# with `?profile=1` is profiled regardless.
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", 0))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+
+# Prediction audit log: every predictor call is queued and written by a background thread
+# to AUDIT_DIR at least every AUDIT_FLUSH_SECONDS. Single predictions go to gzipped JSONL or
+# Parquet segments (AUDIT_FORMAT), rotated at AUDIT_SEGMENT_BYTES or AUDIT_SEGMENT_SECONDS;
+# each batch goes to its own Parquet segment. Calls made while AUDIT_MAX_PENDING calls are
+# still queued are counted as dropped rather than held in memory. Set AUDIT_ENABLED=0 to
+# turn it off.
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "1") != "0"
+AUDIT_DIR = Path(os.getenv("AUDIT_DIR", PROJ_ROOT / "logs" / "audit"))
+AUDIT_FORMAT = os.getenv("AUDIT_FORMAT", "jsonl")
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 1))
+AUDIT_SEGMENT_BYTES = int(os.getenv("AUDIT_SEGMENT_BYTES", 64 * 1024 * 1024))
+AUDIT_SEGMENT_SECONDS = float(os.getenv("AUDIT_SEGMENT_SECONDS", 3600))
+AUDIT_MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", 1000))
+
+# Shadow scoring: candidate models score the same inputs as the served ones in SHADOW_WORKERS
+# background processes, and their agreement and latency are reported at /shadow. SHADOW_MODELS
+# lists comma-separated `<model>=<source>` pairs, where a source is a `.pkl` path or
+# `models:/<registered model>/<version>`; empty disables shadowing. Calls made while
+# SHADOW_MAX_PENDING calls are still being shadowed are not shadowed.
+SHADOW_MODELS = os.getenv("SHADOW_MODELS", "")
+SHADOW_WORKERS = int(os.getenv("SHADOW_WORKERS", 1))
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", 100))
+
+# Scored batch uploads: results, downloads and summary of each run are written once to
+# BATCH_RESULTS_DIR, keyed by upload content, model version and options, and reused until
+# the input changes. The BATCH_RESULTS_KEEP most recently used runs are kept.
+BATCH_RESULTS_DIR = Path(
+    os.getenv("BATCH_RESULTS_DIR", Path(tempfile.gettempdir()) / "mlops_assignment_batches")
+)
+BATCH_RESULTS_KEEP = int(os.getenv("BATCH_RESULTS_KEEP", 16))
 
 # If tqdm is installed, configure loguru with tqdm.write
 # https://github.com/Delgan/loguru/issues/135
@@ -1,28 +1,187 @@
 from pathlib import Path
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
 import typer
 
-from mlops_assignment.config import PROCESSED_DATA_DIR, RAW_DATA_DIR
+from mlops_assignment import features
+from mlops_assignment.config import (
+    ALZHEIMER_INTERIM_PATH,
+    ALZHEIMER_PROCESSED_PATH,
+    ALZHEIMER_RAW_PATH,
+    LUNG_CANCER_PROCESSED_PATH,
+    LUNG_CANCER_RAW_PATH,
+    PARQUET_PATHS,
+)
+from mlops_assignment.stages import log_report, run_stage
 
 app = typer.Typer()
 
+ALZHEIMER_DROP_COLUMNS = ["PatientID", "DoctorInCharge"]
+
+LUNG_CANCER_DROP_COLUMNS = ["index", "Patient Id"]
+LUNG_CANCER_RENAMES = {
+    "OccuPational_Hazards": "Occupational_Hazards",
+    "chronic_Lung_Disease": "Chronic_Lung_Disease",
+}
+
+# `pd.read_csv` arguments for CSVs that were saved with their index.
+CSV_READ_OPTIONS = {LUNG_CANCER_PROCESSED_PATH: {"index_col": 0}}
+
+
+def clean_alzheimer(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop the identifier columns that the models ignore."""
+    return df.drop(columns=ALZHEIMER_DROP_COLUMNS)
+
+
+def clean_lung_cancer(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop identifier columns and normalise column names to `Snake_Case`."""
+    df = df.drop(columns=LUNG_CANCER_DROP_COLUMNS)
+    df.columns = df.columns.str.replace(" ", "_")
+    return df.rename(columns=LUNG_CANCER_RENAMES)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of `df` with the smallest dtypes that hold its values.
+
+    Integer columns are downcast (int8 for the 1-9 lung cancer scales and the
+    binary flags), floats become float32 and repetitive text columns such as
+    `Level` become categoricals.
+    """
+    out = df.copy()
+    for column in out.columns:
+        values = out[column]
+        if pd.api.types.is_integer_dtype(values):
+            out[column] = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_float_dtype(values):
+            out[column] = values.astype(np.float32)
+        elif values.nunique() <= len(values) // 2:
+            out[column] = values.astype("category")
+    return out
+
+
+def fresh_parquet_copy(csv_path: Path) -> Path | None:
+    """Return the Parquet copy of `csv_path` if it exists and is at least as new as the CSV."""
+    parquet_path = PARQUET_PATHS.get(csv_path)
+    if (
+        parquet_path is not None
+        and parquet_path.exists()
+        and parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns
+    ):
+        return parquet_path
+    return None
+
+
+def load_dataset(csv_path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Load one of the datasets in `config.PARQUET_PATHS`, preferring its Parquet copy.
+
+    The Parquet copy is memory-mapped and only `columns` are decoded. It is
+    used only when it is at least as new as the CSV; otherwise the CSV is
+    parsed as before, so a stale copy is never read. Note that the copy
+    stores floats as float32.
+
+    Parameters
+    ----------
+    csv_path : Path
+        The CSV the dataset is stored as.
+    columns : list of str, optional
+        Columns to load. Defaults to every column.
+    """
+    parquet_path = fresh_parquet_copy(csv_path)
+    if parquet_path is not None:
+        return pq.read_pandas(parquet_path, columns=columns, memory_map=True).to_pandas()
+
+    df = pd.read_csv(csv_path, **CSV_READ_OPTIONS.get(csv_path, {}))
+    return df if columns is None else df[columns]
+
+
+def write_parquet(force: bool = False) -> list[dict]:
+    """
+    Write a typed Parquet copy of every CSV in `config.PARQUET_PATHS`.
+
+    A copy older than its CSV is rewritten even if the CSV's content is
+    unchanged, since `load_dataset` would otherwise keep ignoring it.
+    """
+    return [
+        run_stage(
+            f"{parquet_path.stem}_parquet",
+            csv_path,
+            parquet_path,
+            compact_dtypes,
+            params={"dtypes": "compact"},
+            write_index="index_col" in CSV_READ_OPTIONS.get(csv_path, {}),
+            read_options=CSV_READ_OPTIONS.get(csv_path),
+            force=force or fresh_parquet_copy(csv_path) is None,
+        )
+        for csv_path, parquet_path in PARQUET_PATHS.items()
+    ]
+
+
+def run(force: bool = False) -> list[dict]:
+    """Run the cleaning stages from `data/raw`, the feature stages, then the Parquet copies."""
+    results = [
+        run_stage(
+            "lung_cancer_clean",
+            LUNG_CANCER_RAW_PATH,
+            LUNG_CANCER_PROCESSED_PATH,
+            clean_lung_cancer,
+            params={"drop": LUNG_CANCER_DROP_COLUMNS, "rename": LUNG_CANCER_RENAMES},
+            row_wise=True,
+            write_index=True,
+            force=force,
+        ),
+        run_stage(
+            "alzheimer_clean",
+            ALZHEIMER_RAW_PATH,
+            ALZHEIMER_INTERIM_PATH,
+            clean_alzheimer,
+            params={"drop": ALZHEIMER_DROP_COLUMNS},
+            row_wise=True,
+            force=force,
+        ),
+    ]
+    results += features.run(force)
+    return results + write_parquet(force)
+
+
+def check() -> bool:
+    """Rebuild both processed datasets in memory and compare them with the files on disk."""
+    lung_cancer = clean_lung_cancer(pd.read_csv(LUNG_CANCER_RAW_PATH))
+    lung_cancer_ok = lung_cancer.equals(pd.read_csv(LUNG_CANCER_PROCESSED_PATH, index_col=0))
+
+    alzheimer = features.build_alzheimer_features(
+        clean_alzheimer(pd.read_csv(ALZHEIMER_RAW_PATH)), **features.ALZHEIMER_FEATURE_PARAMS
+    )
+    expected = pd.read_csv(ALZHEIMER_PROCESSED_PATH)
+    alzheimer_ok = list(alzheimer.columns) == list(expected.columns) and np.allclose(
+        alzheimer.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12
+    )
+
+    for name, ok in [("lung_cancer", lung_cancer_ok), ("alzheimer", alzheimer_ok)]:
+        if ok:
+            logger.info(f"{name}: matches the processed CSV")
+        else:
+            logger.error(f"{name}: differs from the processed CSV")
+    return lung_cancer_ok and alzheimer_ok
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = RAW_DATA_DIR / "dataset.csv",
-    output_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    # ----------------------------------------------
+    force: bool = typer.Option(False, help="Rebuild every stage even if inputs are unchanged."),
+    verify: bool = typer.Option(False, help="Only compare rebuilt outputs with data/processed."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Processing dataset...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
+    if verify:
+        if not check():
+            raise typer.Exit(code=1)
+        return
+
+    logger.info("Processing datasets...")
+    log_report(run(force))
     logger.success("Processing dataset complete.")
-    # -----------------------------------------
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from mlops_assignment import metrics
+from mlops_assignment.cache import PredictionCache
+from mlops_assignment.registry import get_model
+from mlops_assignment.schema import SCHEMAS
+
+# `shap.TreeExplainer` per estimator without a native tree-SHAP routine.
+_tree_explainers = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _tree_explainer(estimator):
+    with _lock:
+        explainer = _tree_explainers.get(estimator)
+        if explainer is None:
+            # Imported here so importing this module stays cheap.
+            import shap
+
+            explainer = _tree_explainers[estimator] = shap.TreeExplainer(estimator)
+    return explainer
+
+
+def _margins(estimator, Xt: pd.DataFrame) -> np.ndarray:
+    """
+    Tree-SHAP values of `Xt` per class, with the expected value last.
+
+    Returns an `(N, K, F + 1)` array whose last axis sums to the class's
+    raw score: log-odds for CatBoost and LightGBM, probability for
+    estimators explained by `shap.TreeExplainer`. Binary models score
+    class 1 only, so `K` is 1 for them.
+    """
+    module = type(estimator).__module__
+    if module.startswith("catboost"):
+        from catboost import Pool
+
+        values = estimator.get_feature_importance(Pool(Xt), type="ShapValues", thread_count=-1)
+    elif module.startswith("lightgbm"):
+        values = estimator.predict(Xt, pred_contrib=True)
+        values = values.reshape(len(Xt), -1, Xt.shape[1] + 1)
+    else:
+        explainer = _tree_explainer(estimator)
+        per_class = explainer.shap_values(Xt, check_additivity=False)
+        if not isinstance(per_class, list):
+            per_class = [per_class]
+        expected = np.atleast_1d(explainer.expected_value)
+        values = np.stack(
+            [np.column_stack([v, np.full(len(Xt), e)]) for v, e in zip(per_class, expected)],
+            axis=1,
+        )
+    return values.reshape(len(Xt), -1, Xt.shape[1] + 1)
+
+
+def _column_weights(transformed: list[str], features: list[str]) -> np.ndarray:
+    """
+    `(len(transformed), len(features))` 0/1 matrix mapping model inputs to input columns.
+
+    A transformed column keeps its input column's name, or extends it with
+    `_<category>` when one-hot encoded. Input columns the pipeline drops
+    get no weight.
+    """
+    weights = np.zeros((len(transformed), len(features)))
+    for i, name in enumerate(transformed):
+        if name in features:
+            weights[i, features.index(name)] = 1
+            continue
+        owners = [f for f in features if name.startswith(f"{f}_")]
+        if owners:
+            weights[i, features.index(max(owners, key=len))] = 1
+    return weights
+
+
+def _explain_batch(model: str, input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Predicted class index and `[contributions..., base value]` per row of `input_df`."""
+    pipeline = get_model(model)
+    features = list(SCHEMAS[model])
+    # The pipeline's own training columns, which may be fewer than FEATURE_COLUMNS.
+    X = input_df[list(pipeline.feature_names_in_[:-1])]
+    Xt, _ = pipeline._memory_full_transform(pipeline, X, None, with_final=False)
+
+    # Equal transformed rows have equal explanations; scale-valued inputs repeat a lot.
+    distinct, inverse = np.unique(Xt.to_numpy(dtype=float), axis=0, return_inverse=True)
+    with metrics.timer(model, "explain"):
+        values = _margins(
+            pipeline.steps[-1][1], pd.DataFrame(distinct, columns=Xt.columns)
+        )[inverse.ravel()]
+    if values.shape[1] == 1:
+        # Binary log-odds: class 0's explanation is class 1's negated.
+        values = np.concatenate([-values, values], axis=1)
+
+    classes = values.sum(axis=2).argmax(axis=1)
+    chosen = values[np.arange(len(values)), classes]
+    contributions = chosen[:, :-1] @ _column_weights(list(Xt.columns), features)
+    return classes, np.column_stack([contributions, chosen[:, -1]])
+
+
+def _estimator_columns(estimator) -> list[str]:
+    for attribute in ("feature_names_in_", "feature_names_", "feature_name_"):
+        names = getattr(estimator, attribute, None)
+        if names is not None:
+            return list(names)
+    raise ValueError(f"{type(estimator).__name__} does not record its input column names")
+
+
+def used_columns(model: str) -> list[str]:
+    """Input columns of `model` that reach its estimator, in `FEATURE_COLUMNS` order."""
+    features = list(SCHEMAS[model])
+    estimator = get_model(model).steps[-1][1]
+    used = _column_weights(_estimator_columns(estimator), features).any(axis=0)
+    return [feature for feature, keep in zip(features, used) if keep]
+
+
+_caches = {model: PredictionCache(model, list(columns)) for model, columns in SCHEMAS.items()}
+
+
+def explain(input_df: pd.DataFrame, model: str) -> pd.DataFrame:
+    """
+    Per-feature tree-SHAP contributions to each row's predicted class.
+
+    The whole frame is explained in one batched call of the estimator's own
+    tree-SHAP routine (CatBoost `ShapValues`, LightGBM `pred_contrib`) or of
+    `shap.TreeExplainer` for other tree ensembles, such as the lung cancer
+    random forest. Contributions to the pipeline's transformed inputs are
+    summed back onto the input columns. Rows already explained for the
+    same model file are answered from a `PredictionCache`.
+
+    Parameters
+    ----------
+    input_df : pd.DataFrame
+        Rows with at least the model's `FEATURE_COLUMNS`.
+    model : str
+        `"alzheimer"` or `"lung_cancer"`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed like `input_df`, with a contribution column for each of
+        `used_columns(model)` and `BaseValue`. Each row sums to the raw
+        score of its predicted class: log-odds for the Alzheimer CatBoost
+        model, probability for the lung cancer random forest.
+    """
+    features = list(SCHEMAS[model])
+    used = used_columns(model)
+    if len(input_df) == 0:
+        return pd.DataFrame(columns=used + ["BaseValue"], dtype=float)
+    _, values = _caches[model].predict(input_df, lambda df: _explain_batch(model, df))
+    contributions = pd.DataFrame(values, index=input_df.index, columns=features + ["BaseValue"])
+    return contributions[used + ["BaseValue"]]
+
+
+def top_factors(contributions: pd.DataFrame, n: int = 3) -> pd.Series:
+    """Name each row's `n` largest contributions, e.g. `"MMSE (+1.204), ADL (+0.310)"`."""
+    values = contributions.drop(columns="BaseValue")
+    order = np.argsort(-values.to_numpy(), axis=1)[:, :n]
+    names = values.columns.to_numpy(dtype=object)[order]
+    signed = np.take_along_axis(values.to_numpy(), order, axis=1)
+    text = names[:, 0] + np.char.mod(" (%+.3f)", signed[:, 0]).astype(object)
+    for i in range(1, order.shape[1]):
+        text = text + ", " + names[:, i] + np.char.mod(" (%+.3f)", signed[:, i]).astype(object)
+    return pd.Series(text, index=values.index, name="TopFactors")
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from mlops_assignment.config import MODELS_DIR
+
+# Lean artifacts written by `mlops_assignment.modeling.export`.
+LEAN_MODEL_PATHS = {
+    "alzheimer": MODELS_DIR / "alzheimer_pred_model.lean.joblib",
+    "lung_cancer": MODELS_DIR / "lung_cancer_pipeline.lean.joblib",
+}
+
+
+class LeanPipeline:
+    """
+    PyCaret-free replacement for a saved classification pipeline.
+
+    Holds only the fitted transformers and the final estimator, and applies
+    them to a NumPy feature matrix whose columns follow `feature_names`.
+    The steps are plain tuples produced by the exporter:
+
+    - `("transform", columns, transformer)` replaces `columns` with the
+      output of the fitted sklearn transformer.
+    - `("map", columns, keys, codes)` ordinal-encodes each column in
+      `columns`, mapping unseen values to -1.
+    - `("keep", columns)` keeps only `columns`, in that order.
+    """
+
+    def __init__(self, artifact: dict):
+        self.feature_names = list(artifact["feature_names"])
+        self.classes = np.asarray(artifact["classes"])
+        self.steps = artifact["steps"]
+        self.estimator = artifact["estimator"]
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        Xt = np.array(X, dtype=np.float64)
+        for step in self.steps:
+            kind, columns = step[0], step[1]
+            if kind == "transform":
+                Xt[:, columns] = step[2].transform(Xt[:, columns])
+            elif kind == "map":
+                for column, keys, codes in zip(columns, step[2], step[3]):
+                    values = Xt[:, column]
+                    encoded = np.full(len(values), -1.0)
+                    for key, code in zip(keys, codes):
+                        encoded[values == key] = code
+                    Xt[:, column] = encoded
+            elif kind == "keep":
+                Xt = Xt[:, columns]
+            else:
+                raise ValueError(f"Unknown lean pipeline step '{kind}'.")
+        return Xt
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.estimator.predict_proba(self.transform(X))
+
+    def predict(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return `(labels, scores)` where `scores` is the predicted class probability."""
+        proba = self.predict_proba(X)
+        codes = proba.argmax(axis=1)
+        return self.classes[codes], proba[np.arange(len(proba)), codes]
+
+    def to_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """Select and order the feature columns of `df` as the pipeline expects."""
+        return df[self.feature_names].to_numpy(dtype=np.float64)
+
+
+def load(path: Path) -> LeanPipeline:
+    return LeanPipeline(joblib.load(path))
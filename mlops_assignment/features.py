@@ -1,28 +1,90 @@
-from pathlib import Path
-
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
 import typer
 
-from mlops_assignment.config import PROCESSED_DATA_DIR
+from mlops_assignment.config import ALZHEIMER_INTERIM_PATH, ALZHEIMER_PROCESSED_PATH
+from mlops_assignment.stages import log_report, run_stage
 
 app = typer.Typer()
 
+# Matches the notebook's `exp.setup(..., session_id=45)` on the Alzheimer's data.
+ALZHEIMER_FEATURE_PARAMS = {
+    "target": "Diagnosis",
+    "one_hot_columns": ["Ethnicity"],
+    "test_size": 0.3,
+    "random_state": 45,
+}
+
+
+def one_hot(df: pd.DataFrame, column: str, categories) -> pd.DataFrame:
+    """Replace `column` with float indicator columns named `<column>_<category>`, in place."""
+    values = df[column].astype(np.float64).to_numpy()
+    categories = np.asarray(categories, dtype=np.float64)
+    indicators = pd.DataFrame(
+        (values[:, None] == categories[None, :]).astype(np.float64),
+        columns=[f"{column}_{c}" for c in categories],
+        index=df.index,
+    )
+    position = df.columns.get_loc(column)
+    return pd.concat([df.iloc[:, :position], indicators, df.iloc[:, position + 1 :]], axis=1)
+
+
+def build_alzheimer_features(
+    df: pd.DataFrame,
+    target: str = "Diagnosis",
+    one_hot_columns: list[str] = ("Ethnicity",),
+    test_size: float = 0.3,
+    random_state: int = 45,
+) -> pd.DataFrame:
+    """
+    Reproduce PyCaret's `dataset_transformed` for the cleaned Alzheimer's data.
+
+    Rows are split into a stratified train/test split and stacked train
+    first. Continuous features are stored as float32, nominal columns with
+    more than two values are one-hot encoded in order of first appearance in
+    the train split, and every feature is z-scored with train statistics.
+    """
+    X = df.drop(columns=[target])
+    y = df[target]
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, stratify=y, random_state=random_state, shuffle=True
+    )
+    X = pd.concat([X_train, X_test])
+
+    continuous = X.select_dtypes("float64").columns
+    X[continuous] = X[continuous].astype(np.float32)
+    for column in one_hot_columns:
+        X = one_hot(X, column, X_train[column].unique())
+
+    X = X.astype(np.float64)
+    scaler = StandardScaler().fit(X.iloc[: len(X_train)])
+    out = pd.DataFrame(scaler.transform(X), columns=X.columns)
+    out[target] = pd.concat([y_train, y_test]).to_numpy()
+    return out
+
+
+def run(force: bool = False) -> list[dict]:
+    """Run the feature stages that turn interim data into `data/processed`."""
+    return [
+        run_stage(
+            "alzheimer_features",
+            ALZHEIMER_INTERIM_PATH,
+            ALZHEIMER_PROCESSED_PATH,
+            lambda df: build_alzheimer_features(df, **ALZHEIMER_FEATURE_PARAMS),
+            params=ALZHEIMER_FEATURE_PARAMS,
+            force=force,
+        ),
+    ]
+
 
 @app.command()
-def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    output_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    # -----------------------------------------
-):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Generating features from dataset...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
+def main(force: bool = typer.Option(False, help="Rebuild even if inputs are unchanged.")):
+    logger.info("Generating features from interim datasets...")
+    log_report(run(force))
     logger.success("Features generation complete.")
-    # -----------------------------------------
 
 
 if __name__ == "__main__":
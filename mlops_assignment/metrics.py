@@ -0,0 +1,182 @@
+import atexit
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+import time
+
+from mlops_assignment.config import METRICS_DUMP_PATH, METRICS_ENABLED
+
+# Recording can be switched off at runtime, e.g. by benchmarks measuring its cost.
+enabled = METRICS_ENABLED
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+ROW_BUCKETS = (1, 2, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 1_000_000)
+
+# Histogram families: {name: (help text, bucket upper bounds)}.
+HISTOGRAMS = {
+    "prediction_stage_seconds": (
+        "Time spent in each stage of a prediction, including every pipeline step.",
+        LATENCY_BUCKETS,
+    ),
+    "prediction_rows": ("Rows per call to a predictor.", ROW_BUCKETS),
+    "prediction_batch_rows": (
+        "Rows per model pass, after the prediction cache and micro-batching.",
+        ROW_BUCKETS,
+    ),
+    "model_load_seconds": ("Time taken to load a saved pipeline.", LATENCY_BUCKETS),
+    "shadow_seconds": (
+        "Time a shadow worker took to score a call, with the served or a candidate model.",
+        LATENCY_BUCKETS,
+    ),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Bucketed counts, sum and count of observed values, safe to update from any thread."""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+# One histogram per family and label set: {(name, ((label, value), ...)): Histogram}.
+_series: dict[tuple, Histogram] = {}
+_lock = threading.Lock()
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record `value` in the `name` histogram for `labels`."""
+    if not enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    histogram = _series.get(key)
+    if histogram is None:
+        with _lock:
+            histogram = _series.setdefault(key, Histogram(HISTOGRAMS[name][1]))
+    histogram.observe(value)
+
+
+@contextmanager
+def timer(model: str, stage: str):
+    """Time the block as `stage` of a `model` prediction."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("prediction_stage_seconds", time.perf_counter() - start, model=model, stage=stage)
+
+
+class _TimedMethod:
+    """
+    Stand-in for one pipeline step's `transform` that times each call.
+
+    It is set on the step itself rather than on the pipeline, because
+    `predict_model` works on a shallow copy of the pipeline, and copying
+    rebuilds the pipeline's own transform helpers but keeps its steps.
+    `__wrapped__` lets PyCaret read the original method's signature.
+    """
+
+    def __init__(self, method, model: str, stage: str):
+        self.__wrapped__ = method
+        self.model = model
+        self.stage = stage
+
+    def __call__(self, *args, **kwargs):
+        if not enabled:
+            return self.__wrapped__(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return self.__wrapped__(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            observe("prediction_stage_seconds", elapsed, model=self.model, stage=self.stage)
+
+
+def instrument(pipeline, model: str):
+    """Time each step of a loaded PyCaret `pipeline` as a stage of `model` predictions."""
+    for stage, step in getattr(pipeline, "steps", [])[:-1]:
+        if hasattr(step, "transform") and not isinstance(step.transform, _TimedMethod):
+            step.transform = _TimedMethod(step.transform, model, stage)
+    return pipeline
+
+
+def _format_labels(labels: tuple, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render() -> str:
+    """Return every histogram in the Prometheus text exposition format."""
+    with _lock:
+        series = sorted(_series.items())
+    lines = []
+    for name, (help_text, _) in HISTOGRAMS.items():
+        family = [(labels, h) for (n, labels), h in series if n == name]
+        if not family:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, histogram in family:
+            counts, total = histogram.snapshot()
+            cumulative = 0
+            for bound, count in zip([*histogram.bounds, "+Inf"], counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: Path | None = METRICS_DUMP_PATH) -> None:
+    """Write `render()` to `path`, replacing the previous dump."""
+    if path is None:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(render())
+    tmp_path.replace(path)
+
+
+def reset() -> None:
+    """Drop every recorded value."""
+    with _lock:
+        _series.clear()
+
+
+# Processes without the HTTP endpoint, such as the batch CLI, leave their metrics here.
+atexit.register(dump)
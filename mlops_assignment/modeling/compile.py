@@ -0,0 +1,337 @@
+import itertools
+from pathlib import Path
+import tempfile
+import time
+
+import joblib
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_assignment import audit, compiled
+from mlops_assignment.config import COMPILED_MODELS_DIR
+from mlops_assignment.dataset import load_dataset
+from mlops_assignment.fast_inference import LeanPipeline
+from mlops_assignment.modeling.export import PARITY_DATA_PATHS, build_artifact
+from mlops_assignment.registry import MODEL_PATHS, get_model
+
+app = typer.Typer()
+
+# Largest score difference `check` accepts. `predict_model` rounds scores to 4 decimals,
+# and a float32 score may round to the neighbouring step.
+SCORE_TOLERANCE = 2e-4
+
+# Default-domain opset of the preprocessing graph when the estimator graph has none.
+ONNX_OPSET = 17
+
+
+class _GraphBuilder:
+    """Collect the nodes and constants of an ONNX graph, naming tensors as it goes."""
+
+    def __init__(self):
+        self.nodes = []
+        self.initializers = []
+        self._names = itertools.count()
+
+    def const(self, value) -> str:
+        from onnx import numpy_helper
+
+        name = f"const_{next(self._names)}"
+        self.initializers.append(numpy_helper.from_array(np.asarray(value), name))
+        return name
+
+    def node(self, op_type: str, *inputs: str, **attributes) -> str:
+        from onnx import helper
+
+        output = f"{op_type.lower()}_{next(self._names)}"
+        self.nodes.append(helper.make_node(op_type, list(inputs), [output], **attributes))
+        return output
+
+
+def _onnx_scale(graph: _GraphBuilder, X: str, scaler, columns: list, width: int) -> str:
+    def full(values, fill):
+        vector = np.full((1, width), fill, dtype=np.float64)
+        vector[0, columns] = values
+        return graph.const(vector)
+
+    if scaler.with_mean:
+        X = graph.node("Sub", X, full(scaler.mean_, 0.0))
+    if scaler.with_std:
+        X = graph.node("Div", X, full(scaler.scale_, 1.0))
+    return X
+
+
+def _onnx_transform(graph: _GraphBuilder, X: str, transformer, columns: list, width: int) -> str:
+    """Apply a fitted transformer to `columns` of `X`, leaving the other columns unchanged."""
+    kind = type(transformer).__name__
+    if kind == "SimpleImputer":
+        if transformer.add_indicator or not np.isnan(transformer.missing_values):
+            raise ValueError("Only SimpleImputers of NaN without indicators can be compiled.")
+        # Columns outside `columns` are "filled" with NaN, which leaves them as they were.
+        fill = np.full((1, width), np.nan)
+        fill[0, columns] = transformer.statistics_
+        return graph.node("Where", graph.node("IsNaN", X), graph.const(fill), X)
+    if kind == "StandardScaler":
+        return _onnx_scale(graph, X, transformer, columns, width)
+    if kind == "PowerTransformer" and transformer.method == "yeo-johnson":
+        # Yeo-Johnson as scikit-learn computes it; a lambda of 1 leaves a column unchanged.
+        lambdas = np.ones((1, width))
+        lambdas[0, columns] = transformer.lambdas_
+        log_positive = np.abs(lambdas) < np.spacing(1.0)
+        log_negative = np.abs(lambdas - 2) <= np.spacing(1.0)
+        positive_power = np.where(log_positive, 1.0, lambdas)
+        negative_power = np.where(log_negative, 1.0, 2 - lambdas)
+        one = graph.const(np.float64(1.0))
+
+        def power(base, exponent, use_log):
+            # ((base ** exponent) - 1) / exponent, or log(base) where `use_log`.
+            exponent = graph.const(exponent)
+            raised = graph.node("Sub", graph.node("Pow", base, exponent), one)
+            return graph.node(
+                "Where",
+                graph.const(use_log),
+                graph.node("Log", base),
+                graph.node("Div", raised, exponent),
+            )
+
+        positive = power(graph.node("Add", X, one), positive_power, log_positive)
+        mirrored = power(graph.node("Sub", one, X), negative_power, log_negative)
+        negative = graph.node("Neg", mirrored)
+        is_negative = graph.node("Less", X, graph.const(np.float64(0.0)))
+        X = graph.node("Where", is_negative, negative, positive)
+        if transformer.standardize:
+            X = _onnx_scale(graph, X, transformer._scaler, columns, width)
+        return X
+    raise ValueError(f"Cannot compile a {kind} to ONNX.")
+
+
+def _onnx_preprocessing(artifact: dict, opset: int):
+    """One graph applying the lean artifact's steps, from raw features to estimator input."""
+    from onnx import TensorProto, helper
+
+    graph = _GraphBuilder()
+    X = "features"
+    width = len(artifact["feature_names"])
+    for step in artifact["steps"]:
+        kind, columns = step[0], step[1]
+        if kind == "keep":
+            X = graph.node("Gather", X, graph.const(np.asarray(columns, dtype=np.int64)), axis=1)
+            width = len(columns)
+        elif kind == "map":
+            # Split into columns, ordinal-encode the mapped ones and put them back together.
+            split = [
+                graph.node("Gather", X, graph.const(np.array([j], dtype=np.int64)), axis=1)
+                for j in range(width)
+            ]
+            for column, keys, codes in zip(columns, step[2], step[3]):
+                matches = graph.node(
+                    "Cast",
+                    graph.node("Equal", split[column], graph.const(keys.reshape(1, -1))),
+                    to=TensorProto.DOUBLE,
+                )
+                # A value matching no key is encoded as -1.
+                matched = graph.node("MatMul", matches, graph.const(np.ones((len(keys), 1))))
+                split[column] = graph.node(
+                    "Sub",
+                    graph.node("MatMul", matches, graph.const(codes.reshape(-1, 1))),
+                    graph.node("Sub", graph.const(np.ones((1, 1))), matched),
+                )
+            X = graph.node("Concat", *split, axis=1)
+        else:
+            X = _onnx_transform(graph, X, step[2], columns, width)
+    # Tree estimators compare float32 features, as scikit-learn's trees do.
+    graph.nodes.append(helper.make_node("Cast", [X], ["preprocessed"], to=TensorProto.FLOAT))
+
+    features = len(artifact["feature_names"])
+    model = helper.make_model(
+        helper.make_graph(
+            graph.nodes,
+            "preprocessing",
+            [helper.make_tensor_value_info("features", TensorProto.DOUBLE, [None, features])],
+            [helper.make_tensor_value_info("preprocessed", TensorProto.FLOAT, [None, width])],
+            graph.initializers,
+        ),
+        opset_imports=[helper.make_opsetid("", opset)],
+    )
+    return model
+
+
+def _onnx_estimator(estimator, n_features: int):
+    """Convert a fitted tree estimator to ONNX, with its class probabilities as a tensor."""
+    import onnx
+
+    module = type(estimator).__module__
+    if module.startswith("catboost"):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "estimator.onnx"
+            estimator.save_model(str(path), format="onnx")
+            model = onnx.load(str(path))
+    elif module.startswith("lightgbm"):
+        from onnxmltools import convert_lightgbm
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        model = convert_lightgbm(
+            estimator, initial_types=[("input", FloatTensorType([None, n_features]))], zipmap=False
+        )
+    else:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+
+        model = convert_sklearn(
+            estimator,
+            initial_types=[("input", FloatTensorType([None, n_features]))],
+            options={id(estimator): {"zipmap": False}},
+        )
+
+    # Replace a ZipMap, which turns the probabilities into a list of dicts, by its input.
+    for node in list(model.graph.node):
+        if node.op_type == "ZipMap":
+            model.graph.node.remove(node)
+            output = next(o for o in model.graph.output if o.name == node.output[0])
+            model.graph.output.remove(output)
+            model.graph.output.append(
+                onnx.helper.make_tensor_value_info(
+                    node.input[0], onnx.TensorProto.FLOAT, [None, len(estimator.classes_)]
+                )
+            )
+    return model
+
+
+def build_onnx(artifact: dict):
+    """
+    Compile a lean artifact, preprocessing included, into one ONNX model.
+
+    Returns the model and the name of its class probability output.
+    """
+    import onnx
+
+    lean = LeanPipeline({**artifact, "classes": []})
+    width = lean.transform(np.zeros((1, len(lean.feature_names)))).shape[1]
+    estimator = _onnx_estimator(artifact["estimator"], width)
+
+    # Both graphs must declare the same default opset and IR version to be merged.
+    opset = next((o.version for o in estimator.opset_import if o.domain == ""), None)
+    if opset is None:
+        opset = ONNX_OPSET
+        estimator.opset_import.append(onnx.helper.make_opsetid("", opset))
+    preprocessing = _onnx_preprocessing(artifact, opset)
+    estimator.ir_version = preprocessing.ir_version = max(
+        estimator.ir_version, preprocessing.ir_version
+    )
+
+    # Only the probabilities are kept; the predictors pick the label from them.
+    probabilities = estimator.graph.output[-1]
+    del estimator.graph.output[:]
+    estimator.graph.output.append(probabilities)
+    model = onnx.compose.merge_models(
+        preprocessing, estimator, io_map=[("preprocessed", estimator.graph.input[0].name)]
+    )
+    onnx.checker.check_model(model)
+    return model, probabilities.name
+
+
+def build_treelite(artifact: dict, library_path: Path) -> None:
+    """Compile the lean artifact's estimator to a shared library with treelite and tl2cgen."""
+    import tl2cgen
+    import treelite
+
+    estimator = artifact["estimator"]
+    module = type(estimator).__module__
+    if module.startswith("lightgbm"):
+        model = treelite.frontend.from_lightgbm(estimator.booster_)
+    elif module.startswith("sklearn"):
+        model = treelite.sklearn.import_model(estimator)
+    else:
+        raise ValueError(f"treelite cannot import a {type(estimator).__name__}.")
+    tl2cgen.export_lib(model, toolchain="gcc", libpath=library_path, params={"parallel_comp": 8})
+
+
+@app.command()
+def build(
+    names: list[str] = typer.Option(list(MODEL_PATHS), "--name"),
+    backends: list[str] = typer.Option(list(compiled.SUFFIXES), "--backend"),
+):
+    """
+    Compile each named pipeline for each backend into `models/compiled/`.
+
+    A pipeline a backend cannot compile, or whose converter is not
+    installed, is skipped with a warning; the predictors then use the
+    native pipeline for it.
+    """
+    COMPILED_MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        artifact = build_artifact(get_model(name))
+        metadata = {
+            "feature_names": artifact["feature_names"],
+            "classes": artifact["classes"],
+            "source": compiled.source_stamp(name),
+        }
+        for backend in backends:
+            model_path, metadata_path = compiled.paths(name, backend)
+            start = time.perf_counter()
+            try:
+                if backend == "onnx":
+                    model, output = build_onnx(artifact)
+                    model_path.write_bytes(model.SerializeToString())
+                    joblib.dump({**metadata, "output": output}, metadata_path)
+                else:
+                    build_treelite(artifact, model_path)
+                    # The transformers run in Python; the compiled library replaces the estimator.
+                    joblib.dump({**metadata, "steps": artifact["steps"]}, metadata_path)
+            except (ImportError, ValueError) as e:
+                logger.warning(f"Skipped the {backend} build of {name}: {e}")
+                continue
+            logger.info(
+                f"Compiled {name} for {backend} in {time.perf_counter() - start:.1f}s: "
+                f"{model_path.name}, {model_path.stat().st_size / 1e6:.1f} MB"
+            )
+    logger.success("Compiled model build complete.")
+
+
+@app.command()
+def check(
+    names: list[str] = typer.Option(list(MODEL_PATHS), "--name"),
+    backends: list[str] = typer.Option(list(compiled.SUFFIXES), "--backend"),
+):
+    """
+    Compare each compiled pipeline against the native predictor on its dataset.
+
+    Scores every row of the dataset in `export.PARITY_DATA_PATHS` with the
+    native pipeline and with each backend's build. Fails if any label
+    differs or a score differs by more than `SCORE_TOLERANCE`, or if a
+    build cannot be loaded. Pipelines without a build are skipped.
+    """
+    from mlops_assignment.streaming import PREDICTORS
+
+    audit.enabled = False  # Parity scoring is not a prediction to audit.
+    failed = False
+    for name in names:
+        compiled.backend = "native"
+        df = load_dataset(PARITY_DATA_PATHS[name])
+        labels, scores = PREDICTORS[name](df)
+        for backend in backends:
+            if not all(path.exists() for path in compiled.paths(name, backend)):
+                logger.warning(f"{name}: no {backend} build to check")
+                continue
+            pipeline = compiled.get(name, backend)
+            if pipeline is None:
+                logger.error(f"{name}: the {backend} build cannot be used")
+                failed = True
+                continue
+            compiled_labels, compiled_scores = pipeline.predict(pipeline.to_matrix(df))
+            mismatched = int((np.asarray(labels) != compiled_labels).sum())
+            max_score_diff = float(np.abs(np.asarray(scores) - compiled_scores).max())
+            logger.info(
+                f"{name} {backend}: {len(df)} rows, {mismatched} label mismatches, "
+                f"max score diff {max_score_diff:.1e}"
+            )
+            failed |= mismatched > 0 or max_score_diff > SCORE_TOLERANCE
+
+    if failed:
+        logger.error("A compiled pipeline does not match the native one.")
+        raise typer.Exit(code=1)
+    logger.success("Compiled model check complete.")
+
+
+if __name__ == "__main__":
+    app()
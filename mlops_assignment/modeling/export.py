@@ -0,0 +1,204 @@
+import copy
+import subprocess
+import sys
+import time
+
+import joblib
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_assignment import fast_inference
+from mlops_assignment.config import ALZHEIMER_RAW_PATH, LUNG_CANCER_PROCESSED_PATH, PROJ_ROOT
+from mlops_assignment.dataset import load_dataset
+from mlops_assignment.registry import MODEL_PATHS, get_model
+
+app = typer.Typer()
+
+# Data each exported pipeline is checked against. The Alzheimer model takes
+# raw feature values, so it is checked on the raw file rather than the
+# z-scored processed copy.
+PARITY_DATA_PATHS = {
+    "alzheimer": ALZHEIMER_RAW_PATH,
+    "lung_cancer": LUNG_CANCER_PROCESSED_PATH,
+}
+
+
+def _without_feature_names(estimator):
+    """Copy a fitted estimator so it accepts plain arrays without warnings."""
+    estimator = copy.deepcopy(estimator)
+    if "feature_names_in_" in vars(estimator):
+        del estimator.feature_names_in_
+    return estimator
+
+
+def _ordinal_mapping(encoder, columns: list[str]) -> tuple[list, list]:
+    """Read a fitted `category_encoders.OrdinalEncoder` mapping as key/code arrays."""
+    mappings = {m["col"]: m["mapping"] for m in encoder.mapping}
+    keys, codes = [], []
+    for column in columns:
+        mapping = mappings[column]
+        mapping = mapping[mapping.index.notna()]
+        keys.append(np.asarray(mapping.index, dtype=np.float64))
+        codes.append(mapping.to_numpy(dtype=np.float64))
+    return keys, codes
+
+
+def _keep(columns: list[str], kept: list[str]) -> tuple:
+    return ("keep", [columns.index(c) for c in kept])
+
+
+def build_artifact(model) -> dict:
+    """
+    Convert a fitted PyCaret pipeline into a lean `fast_inference` artifact.
+
+    Each PyCaret `TransformerWrapper` is unwrapped into the fitted transformer
+    it holds plus the column positions it applies to. The current column
+    order is tracked as steps drop features, and a final `keep` step puts
+    the columns in the order the estimator was trained on.
+    """
+    *steps, (_, estimator) = model.steps
+    first = steps[0][1]
+    feature_names = [c for c in first._feature_names_in if c != first.target_name_]
+    columns = list(feature_names)
+    lean_steps = []
+    classes = estimator.classes_
+
+    for name, wrapper in steps:
+        inner = getattr(wrapper, "transformer", wrapper)
+        # An include list of None means every column; an empty one means none.
+        include = getattr(wrapper, "_include", None)
+        include = [c for c in (columns if include is None else include) if c in columns]
+        positions = [columns.index(c) for c in include]
+
+        if name == "label_encoding":
+            classes = inner.inverse_transform(estimator.classes_)
+        elif not include:
+            continue
+        elif type(inner).__name__ == "RemoveMulticollinearity":
+            kept = [c for c in columns if c not in set(inner.drop_)]
+            lean_steps.append(_keep(columns, kept))
+            columns = kept
+        elif hasattr(inner, "get_support"):
+            dropped = {c for c, selected in zip(include, inner.get_support()) if not selected}
+            kept = [c for c in columns if c not in dropped]
+            lean_steps.append(_keep(columns, kept))
+            columns = kept
+        elif type(inner).__module__.startswith("category_encoders"):
+            keys, codes = _ordinal_mapping(inner, include)
+            lean_steps.append(("map", positions, keys, codes))
+        elif hasattr(inner, "transform"):
+            lean_steps.append(("transform", positions, _without_feature_names(inner)))
+        else:
+            raise ValueError(f"Cannot export pipeline step '{name}' ({type(inner).__name__}).")
+
+    trained_on = getattr(estimator, "feature_names_in_", None)
+    if trained_on is None:
+        trained_on = getattr(estimator, "feature_names_", None)
+    if trained_on is not None and list(trained_on) != columns:
+        lean_steps.append(_keep(columns, list(trained_on)))
+
+    return {
+        "feature_names": feature_names,
+        "classes": np.asarray(classes),
+        "steps": lean_steps,
+        "estimator": _without_feature_names(estimator),
+    }
+
+
+def _parity_frame(name: str, feature_names: list[str]) -> pd.DataFrame:
+    return load_dataset(PARITY_DATA_PATHS[name], columns=feature_names)
+
+
+def _median_seconds(func, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def _import_seconds(statement: str) -> float:
+    code = f"import time; s = time.perf_counter(); {statement}; print(time.perf_counter() - s)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJ_ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+@app.command()
+def export(names: list[str] = typer.Option(list(MODEL_PATHS), "--name")):
+    """Export each named PyCaret pipeline to its lean artifact in `models/`."""
+    for name in names:
+        artifact = build_artifact(get_model(name))
+        joblib.dump(artifact, fast_inference.LEAN_MODEL_PATHS[name])
+        logger.info(
+            f"Exported {name}: {len(artifact['steps'])} steps, "
+            f"{type(artifact['estimator']).__name__} estimator"
+        )
+    logger.success("Lean model export complete.")
+
+
+@app.command()
+def check(names: list[str] = typer.Option(list(MODEL_PATHS), "--name")):
+    """
+    Compare each lean artifact against `predict_model` on its dataset.
+
+    Fails if any label differs or a score differs by more than PyCaret's
+    4-decimal rounding, then reports batch and single-row latency of both
+    paths and the import time of each runtime.
+    """
+    from pycaret.classification import predict_model
+
+    for name in names:
+        model = get_model(name)
+        lean = fast_inference.load(fast_inference.LEAN_MODEL_PATHS[name])
+        df = _parity_frame(name, lean.feature_names)
+        X = lean.to_matrix(df)
+
+        reference = predict_model(model, data=df, verbose=False)
+        labels, scores = lean.predict(X)
+
+        mismatched = int((reference["prediction_label"].to_numpy() != labels).sum())
+        max_score_diff = float(np.abs(reference["prediction_score"].to_numpy() - scores).max())
+        if mismatched or max_score_diff > 1e-4:
+            logger.error(
+                f"{name}: {mismatched} label mismatches, max score diff {max_score_diff:.2e}"
+            )
+            raise typer.Exit(code=1)
+        logger.info(f"{name}: {len(df)} rows match predict_model")
+
+        single = df.iloc[:1]
+        for label, rows, pycaret_call, lean_call in [
+            (
+                "batch",
+                len(df),
+                lambda: predict_model(model, data=df, verbose=False),
+                lambda: lean.predict(lean.to_matrix(df)),
+            ),
+            (
+                "single row",
+                1,
+                lambda: predict_model(model, data=single, verbose=False),
+                lambda: lean.predict(lean.to_matrix(single)),
+            ),
+        ]:
+            pycaret_s = _median_seconds(pycaret_call)
+            lean_s = _median_seconds(lean_call)
+            logger.info(
+                f"{name} {label} ({rows} rows): predict_model {pycaret_s * 1e3:.2f} ms, "
+                f"lean {lean_s * 1e3:.2f} ms ({pycaret_s / lean_s:.1f}x)"
+            )
+
+    logger.info(
+        f"Import time: pycaret.classification "
+        f"{_import_seconds('import pycaret.classification'):.2f}s, "
+        f"fast_inference {_import_seconds('import mlops_assignment.fast_inference'):.2f}s"
+    )
+    logger.success("Lean model check complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,29 +1,123 @@
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
+import time
 
 from loguru import logger
-from tqdm import tqdm
+import pandas as pd
+import pyarrow.parquet as pq
 import typer
 
-from mlops_assignment.config import MODELS_DIR, PROCESSED_DATA_DIR
+from mlops_assignment.config import PROCESSED_DATA_DIR, RAW_DATA_DIR
+from mlops_assignment.registry import get_model
+from mlops_assignment.streaming import DEFAULT_CHUNK_SIZE, PREDICTORS, ShardWriter, score_chunk
 
 app = typer.Typer()
 
 
+def read_shards(input_path: Path, chunk_size: int):
+    """Yield `chunk_size`-row DataFrames from a CSV or Parquet file, in order."""
+    if input_path.suffix == ".parquet":
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+
+def _init_worker(model: str) -> None:
+    # Each worker process loads the model once, before scoring its first shard.
+    get_model(model)
+
+
+def score_shards(shards, model: str, workers: int, explain: bool = False):
+    """
+    Score shards across `workers` processes and yield them in input order.
+
+    Yields the `(scored, rejected)` pair of `score_chunk` for each shard.
+
+    At most two shards per worker are in flight, so memory stays bounded
+    no matter how large the input is.
+    """
+    if workers <= 1:
+        first_row = 0
+        for shard in shards:
+            yield score_chunk(shard, model, first_row, explain)
+            first_row += len(shard)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model,)) as pool:
+        pending = deque()
+        first_row = 0
+        for shard in shards:
+            pending.append(pool.submit(score_chunk, shard, model, first_row, explain))
+            first_row += len(shard)
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "test_features.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    predictions_path: Path = PROCESSED_DATA_DIR / "test_predictions.csv",
-    # -----------------------------------------
+    input_path: Path = RAW_DATA_DIR / "alzheimers_disease_data.csv",
+    model: str = typer.Option("alzheimer", help=" or ".join(PREDICTORS)),
+    predictions_path: Path = PROCESSED_DATA_DIR / "alzheimers_predictions.csv",
+    workers: int = typer.Option(os.cpu_count() or 1, help="Scoring processes."),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, help="Rows per shard."),
+    rejected_path: Path = typer.Option(None, help="Write rows failing validation here."),
+    explain: bool = typer.Option(False, help="Append per-feature SHAP contributions."),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Performing inference for model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Inference complete.")
-    # -----------------------------------------
+    """
+    Score a CSV or Parquet file of patient records across a process pool.
+
+    Writes the input columns plus `PredictionLabel` and `Confidence` to a CSV,
+    gzipped CSV or Parquet file (chosen by the output suffix, `.csv`, `.csv.gz`
+    or `.parquet`), keeping the input row order.
+    With `--explain`, each row's feature contributions and top factors are
+    appended as well.
+    Rows that fail the model's schema are not scored. They are written to
+    `rejected_path` with their errors if it is given, and counted otherwise.
+    """
+    if model not in PREDICTORS:
+        raise typer.BadParameter(f"Unknown model '{model}', expected one of {list(PREDICTORS)}")
+
+    logger.info(f"Performing {model} inference on {input_path} with {workers} workers...")
+    start = time.perf_counter()
+
+    label_counts = Counter()
+    rejected_rows = 0
+    writer = ShardWriter(predictions_path)
+    rejected_writer = None if rejected_path is None else ShardWriter(rejected_path)
+    try:
+        for shard, rejected in score_shards(
+            read_shards(input_path, chunk_size), model, workers, explain
+        ):
+            writer.write(shard)
+            label_counts.update(shard["PredictionLabel"].value_counts().to_dict())
+            if len(rejected):
+                if rejected_rows == 0:
+                    logger.warning(f"Row {rejected['Row'].iat[0]}: {rejected['Errors'].iat[0]}")
+                if rejected_writer is not None:
+                    rejected_writer.write(rejected)
+                rejected_rows += len(rejected)
+    finally:
+        writer.close()
+        if rejected_writer is not None:
+            rejected_writer.close()
+
+    elapsed = time.perf_counter() - start
+    rows = sum(label_counts.values())
+    logger.info(
+        f"Predicted {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s): "
+        f"{dict(label_counts)}"
+    )
+    if rejected_rows:
+        logger.warning(
+            f"Rejected {rejected_rows:,} invalid rows"
+            + (f", written to {rejected_path}" if rejected_path else "")
+        )
+    logger.success(f"Inference complete. Predictions saved to {predictions_path}")
 
 
 if __name__ == "__main__":
@@ -1,29 +1,361 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
+import time
 
 from loguru import logger
-from tqdm import tqdm
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
 import typer
 
-from mlops_assignment.config import MODELS_DIR, PROCESSED_DATA_DIR
+from mlops_assignment import artifact_store
+from mlops_assignment.config import (
+    ALZHEIMER_RAW_PATH,
+    LUNG_CANCER_PROCESSED_PATH,
+    MODELS_DIR,
+    TRAINING_CACHE_DIR,
+)
+from mlops_assignment.registry import MODEL_PATHS
 
 app = typer.Typer()
 
+# The notebook experiments behind each saved pipeline in `models/`.
+TRAINING_SPECS = {
+    # notebooks/rui_hong/230684L_ChewRuiHong_Modelling.ipynb
+    "lung_cancer": {
+        "setup": {
+            "target": "Level",
+            "session_id": 123,
+            "normalize": True,
+            "transformation": True,
+            "remove_multicollinearity": True,
+            "feature_selection": True,
+            "fold": 10,
+            "fold_strategy": "stratifiedkfold",
+        },
+        "experiment": "lung_cancer_prediction_v1",
+        "holdout_size": 0.1,
+        "sort": "F1",
+        "n_select": 3,
+        "tune": {"n_iter": 50, "optimize": "F1"},
+    },
+    # notebooks/winston/231763R_WinstonPawitraLystanto_Notebook.ipynb, second
+    # experiment on the five features selected by the first.
+    "alzheimer": {
+        "setup": {
+            "target": "Diagnosis",
+            "categorical_features": ["MemoryComplaints", "BehavioralProblems"],
+            "numeric_features": ["ADL", "FunctionalAssessment", "MMSE"],
+            "normalize": True,
+            "normalize_method": "zscore",
+            "session_id": 45,
+        },
+        "experiment": "alzheimer_top5_exp",
+        "holdout_size": None,
+        "sort": "Recall",
+        "n_select": 1,
+        "tune": {"n_iter": 5, "optimize": "Recall", "search_library": "optuna"},
+    },
+}
+
+ALZHEIMER_FEATURES = [
+    "ADL",
+    "FunctionalAssessment",
+    "MemoryComplaints",
+    "BehavioralProblems",
+    "MMSE",
+]
+
+# Set in each worker process by `_init_worker`.
+_experiment = None
+_spec = None
+_tune_minutes = None
+_folds = None
+
+
+def load_training_data(name: str) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """
+    Return the data the notebook passed to `setup`, and the unseen hold-out if it kept one.
+
+    The CSVs are parsed rather than read through `dataset.load_dataset` so
+    the models see the same float64 values as in the notebooks.
+    """
+    spec = TRAINING_SPECS[name]
+    if name == "lung_cancer":
+        df = pd.read_csv(LUNG_CANCER_PROCESSED_PATH, index_col=0)
+    else:
+        df = pd.read_csv(ALZHEIMER_RAW_PATH)[ALZHEIMER_FEATURES + ["Diagnosis"]]
+
+    if spec["holdout_size"] is None:
+        return df, None
+    target = spec["setup"]["target"]
+    data, unseen = train_test_split(
+        df,
+        test_size=spec["holdout_size"],
+        random_state=spec["setup"]["session_id"],
+        stratify=df[target],
+    )
+    return data.reset_index(drop=True), unseen.reset_index(drop=True)
+
+
+def setup_experiment(name: str, data: pd.DataFrame, n_jobs: int = -1, tracker=None):
+    """
+    Run the notebook's PyCaret `setup` for `name`.
+
+    Fitted transformers are cached under `config.TRAINING_CACHE_DIR`, so
+    each fold's preprocessing is fitted once and then reused by every
+    candidate, tuning trial and process that sees the same fold.
+
+    Experiment logging is off unless `tracker`, a `tracking.AsyncMlflowLogger`,
+    is given; it then records the setup and finalize runs in the notebook's
+    MLflow experiment.
+    """
+    # Imported here so the rest of the package does not pay PyCaret's import time.
+    from pycaret.classification import ClassificationExperiment
+
+    logging = {"log_experiment": False}
+    if tracker is not None:
+        logging = {
+            "log_experiment": [tracker],
+            "experiment_name": TRAINING_SPECS[name]["experiment"],
+        }
+
+    experiment = ClassificationExperiment()
+    experiment.setup(
+        data,
+        **TRAINING_SPECS[name]["setup"],
+        n_jobs=n_jobs,
+        memory=str(TRAINING_CACHE_DIR / name),
+        **logging,
+        html=False,
+        verbose=False,
+    )
+    return experiment
+
+
+def _init_worker(name: str, tune_minutes: float | None = None) -> None:
+    global _experiment, _spec, _tune_minutes
+    _spec = TRAINING_SPECS[name]
+    _tune_minutes = tune_minutes
+    _experiment = setup_experiment(name, load_training_data(name)[0], n_jobs=1)
+
+
+def _cross_validate(estimator):
+    """
+    Cross-validate a model ID or estimator.
+
+    Returns the fitted model and its mean scores, with the seconds taken
+    under `TT` as in PyCaret's logged metrics.
+    """
+    start = time.perf_counter()
+    try:
+        model = _experiment.create_model(estimator, verbose=False)
+    except Exception as e:
+        # `compare_models` skips candidates that fail to train in the same way.
+        logger.warning(f"Skipping {estimator}: {e}")
+        return None, None
+    scores = _experiment.pull().loc["Mean"].to_dict()
+    return model, {**scores, "TT": time.perf_counter() - start}
+
+
+def _tune(model):
+    """Tune `model`; return the tuned model and its cross-validated scores."""
+    start = time.perf_counter()
+    if _tune_minutes is None:
+        tuned = _experiment.tune_model(model, verbose=False, **_spec["tune"])
+        scores = _experiment.pull().loc["Mean"].to_dict()
+        return tuned, {**scores, "TT": time.perf_counter() - start}
+
+    # Imported here because `tune` imports this module.
+    from mlops_assignment.modeling import tune
+
+    global _folds
+    if _folds is None:
+        _folds = tune.prepare_folds(_experiment)
+    tuned, summary = tune.tune(
+        _experiment,
+        model,
+        _spec["sort"],
+        _folds,
+        timeout=_tune_minutes * 60,
+        warm_start_from=_spec["experiment"],
+        seed=_spec["setup"]["session_id"],
+    )
+    logger.info(f"  {type(model).__name__}: {tune.format_summary(summary, _spec['sort'])}")
+    return tuned, {_spec["sort"]: summary["best_score"], "TT": summary["seconds"]}
+
+
+def _restore_n_jobs(model, n_jobs: int):
+    """
+    Return an unfitted copy of a model built in a single-threaded worker, using `n_jobs`.
+
+    Only for refitting, as `finalize_model` does; score the fitted model itself.
+    """
+    model = clone(model)
+    params = model.get_params()
+    for key in ("n_jobs", "thread_count"):
+        if key in params:
+            model.set_params(**{key: n_jobs})
+    return model
+
+
+def score_holdout(experiment, model, unseen: pd.DataFrame, sort: str) -> float:
+    """Score the fitted `model` on the unseen hold-out by `sort` and log the result."""
+    experiment.predict_model(model, data=unseen, verbose=False)
+    score = float(experiment.pull().iloc[0][sort])
+    logger.info(f"Unseen hold-out {sort}: {score:.4f}")
+    return score
+
+
+def rank(pool, candidates: list, sort: str, n_select: int) -> list[tuple]:
+    """
+    Cross-validate `candidates` across `pool` and log the best `n_select` by `sort`.
+
+    Returns
+    -------
+    list of tuple
+        `(model, scores)` for every candidate that trained, best first.
+    """
+    results = [r for r in pool.map(_cross_validate, candidates) if r[0] is not None]
+    results.sort(key=lambda r: r[1][sort], reverse=True)
+    for model, scores in results[:n_select]:
+        logger.info(f"  {type(model).__name__}: {sort} {scores[sort]:.4f}")
+    return results
+
+
+def log_results(experiment, tracker, results: list[tuple], source: str) -> None:
+    """
+    Record cross-validated models as child runs of the experiment's setup run.
+
+    The runs carry the same name, params, metrics and tags that PyCaret
+    gives `compare_models` and `tune_model` runs, so the MLflow UI and
+    `tune.previous_best_params` treat them alike.
+    """
+    for model, scores in results:
+        tracker.init_experiment(
+            experiment.exp_name_log, experiment._get_model_name(model), setup=False
+        )
+        tracker.log_params(model.get_params())
+        tracker.log_metrics({k: v for k, v in scores.items() if v is not None})
+        tracker.set_tags(source, None, round(scores["TT"], 2), USI=experiment.USI)
+        tracker.finish_experiment()
+
+
+def train(
+    name: str,
+    workers: int,
+    models_dir: Path = MODELS_DIR,
+    tune_minutes: float | None = None,
+    log_experiment: bool = False,
+) -> dict[str, float]:
+    """
+    Reproduce the notebook training flow for `name` and save its pipeline.
+
+    Candidate models are cross-validated in parallel, one per worker
+    process, and the selected models are tuned in parallel. The rest of the
+    flow matches the notebook: compare the default candidates, tune the top
+    `n_select`, compare the tuned models again, then finalize on all of the
+    setup data and save the pipeline under its `registry.MODEL_PATHS` name.
+
+    With `tune_minutes`, each selected model is tuned by `modeling.tune`
+    within that budget, with fold-level pruning, early stopping and a warm
+    start from MLflow, instead of PyCaret's `tune_model`.
+
+    With `log_experiment`, the setup, every candidate, every tuned model
+    and the finalized pipeline are logged to the notebook's MLflow
+    experiment through a `tracking.AsyncMlflowLogger`. Writes happen in the
+    background; waiting for the last of them is timed as the `tracking` phase.
+
+    Returns
+    -------
+    dict
+        Seconds spent in each phase.
+    """
+    spec = TRAINING_SPECS[name]
+    timings = {}
+    start = time.perf_counter()
+    tracker = None
+    if log_experiment:
+        # Imported here so training without logging does not import MLflow.
+        from mlops_assignment.tracking import AsyncMlflowLogger
+
+        tracker = AsyncMlflowLogger()
+    data, unseen = load_training_data(name)
+    experiment = setup_experiment(name, data, tracker=tracker)
+    library = experiment.models()
+    candidates = list(library.index[library["Turbo"]])
+    timings["setup"] = time.perf_counter() - start
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(name, tune_minutes))
+    with pool:
+        start = time.perf_counter()
+        logger.info(f"Comparing {len(candidates)} candidates...")
+        results = rank(pool, candidates, spec["sort"], spec["n_select"])
+        selected = [model for model, _ in results[: spec["n_select"]]]
+        if tracker is not None:
+            log_results(experiment, tracker, results, "compare_models")
+        timings["compare"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        logger.info(f"Tuning {len(selected)} models...")
+        results = list(pool.map(_tune, selected))
+        if tracker is not None:
+            log_results(experiment, tracker, results, "tune_model")
+        tuned = [model for model, _ in results]
+        timings["tune"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if len(tuned) > 1:
+            logger.info("Comparing tuned models...")
+            tuned = [model for model, _ in rank(pool, tuned, spec["sort"], 1)]
+        timings["compare tuned"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if unseen is not None:
+        score_holdout(experiment, tuned[0], unseen, spec["sort"])
+
+    model_path = models_dir / MODEL_PATHS[name].name
+    best = _restore_n_jobs(tuned[0], experiment.n_jobs_param)
+    experiment.save_model(experiment.finalize_model(best), str(model_path.with_suffix("")))
+    if model_path == MODEL_PATHS[name]:
+        # The served pipeline: keep the artifact store in step so `registry` reads from it.
+        artifact_store.ingest([model_path])
+    timings["finalize"] = time.perf_counter() - start
+    logger.info(f"Saved {model_path}")
+
+    if tracker is not None:
+        start = time.perf_counter()
+        tracker.close()
+        timings["tracking"] = time.perf_counter() - start
+    return timings
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    labels_path: Path = PROCESSED_DATA_DIR / "labels.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    # -----------------------------------------
+    models: list[str] = typer.Option(list(TRAINING_SPECS), "--model"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Training processes."),
+    models_dir: Path = MODELS_DIR,
+    tune_minutes: float = typer.Option(
+        None, help="Tune with pruning and early stopping for this many minutes per model."
+    ),
+    log_experiment: bool = typer.Option(
+        False, help="Log runs to the notebook's MLflow experiment in the background."
+    ),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Training some model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
+    """Retrain the saved PyCaret pipelines from the processed data."""
+    for name in models:
+        if name not in TRAINING_SPECS:
+            raise typer.BadParameter(
+                f"Unknown model '{name}', expected one of {list(TRAINING_SPECS)}"
+            )
+
+        logger.info(f"Training {name} with {workers} workers...")
+        timings = train(name, workers, models_dir, tune_minutes, log_experiment)
+        for phase, seconds in timings.items():
+            logger.info(f"  {phase:<16}{seconds:>10.1f}s")
+        logger.info(f"  {'total':<16}{sum(timings.values()):>10.1f}s")
     logger.success("Modeling training complete.")
-    # -----------------------------------------
 
 
 if __name__ == "__main__":
@@ -0,0 +1,323 @@
+import time
+
+from loguru import logger
+import numpy as np
+import optuna
+from optuna.distributions import CategoricalDistribution, IntDistribution
+from optuna.trial import TrialState
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import train_test_split
+import typer
+
+from mlops_assignment.config import MLFLOW_TRACKING_URI
+from mlops_assignment.modeling import train
+from mlops_assignment.registry import get_model
+
+app = typer.Typer()
+
+# Boosting rounds without improvement on the early-stopping split before fitting stops.
+EARLY_STOPPING_ROUNDS = 50
+# Share of each training fold held out to decide when boosting stops, so the fold's
+# validation split only scores the trial.
+EARLY_STOPPING_FRACTION = 0.2
+
+PRUNERS = {
+    "median": lambda: optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=2),
+    "halving": lambda: optuna.pruners.SuccessiveHalvingPruner(),
+    "none": lambda: optuna.pruners.NopPruner(),
+}
+
+
+def prepare_folds(experiment) -> list[tuple]:
+    """
+    Fit the experiment's preprocessing on each CV fold once.
+
+    Returns
+    -------
+    list of tuple
+        `(X_train, y_train, X_valid, y_valid)` per fold, already transformed,
+        so trials only fit the estimator.
+    """
+    X = experiment.get_config("X_train")
+    y = experiment.get_config("y_train")
+    folds = []
+    for train_rows, valid_rows in experiment.get_config("fold_generator").split(X, y):
+        X_train, y_train = X.iloc[train_rows], y.iloc[train_rows]
+        X_valid, y_valid = X.iloc[valid_rows], y.iloc[valid_rows]
+        pipeline = clone(experiment.get_config("pipeline")).fit(X_train, y_train)
+        folds.append(
+            (*pipeline.transform(X_train, y_train), *pipeline.transform(X_valid, y_valid))
+        )
+    return folds
+
+
+def search_space(experiment, model) -> tuple[str, dict]:
+    """Return PyCaret's display name and optuna search space for `model`'s estimator class."""
+    # Imported here so the module can be imported without PyCaret.
+    from pycaret.internal.distributions import get_optuna_distributions
+
+    library = experiment.models(internal=True)
+    model_id = library.index[library["Class"] == type(model)][0]
+    distributions = get_optuna_distributions(library.loc[model_id, "Tune Distributions"])
+    return library.loc[model_id, "Name"], distributions
+
+
+def _boosted(estimator) -> bool:
+    """Whether `estimator` is a LightGBM or CatBoost model that can stop adding rounds early."""
+    return type(estimator).__module__.startswith(("lightgbm", "catboost"))
+
+
+def _fit_fold(estimator, X_train, y_train, early_stopping: bool, seed: int | None = None):
+    """
+    Fit one fold's training split, returning the fitted estimator and the boosting rounds it kept.
+
+    Boosted estimators that early-stop are fitted on all but
+    `EARLY_STOPPING_FRACTION` of the rows, a stratified sample, and stop
+    once their score on the rows held out stops improving.
+    """
+    if not early_stopping or not _boosted(estimator):
+        return estimator.fit(X_train, y_train), None
+
+    # Stratified unless a class is too rare to appear on both sides.
+    stratify = y_train if np.unique(y_train, return_counts=True)[1].min() >= 2 else None
+    X_train, X_valid, y_train, y_valid = train_test_split(
+        X_train, y_train, test_size=EARLY_STOPPING_FRACTION, stratify=stratify, random_state=seed
+    )
+    if type(estimator).__module__.startswith("lightgbm"):
+        import lightgbm
+
+        estimator.fit(
+            X_train,
+            y_train,
+            eval_set=[(X_valid, y_valid)],
+            callbacks=[lightgbm.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)],
+        )
+        return estimator, estimator.best_iteration_
+
+    estimator.fit(
+        X_train,
+        y_train,
+        eval_set=(X_valid, y_valid),
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        verbose=False,
+    )
+    return estimator, estimator.get_best_iteration() + 1
+
+
+def _parse_param(value: str, distribution):
+    """Convert a parameter logged to MLflow as text back to the search space's type."""
+    if isinstance(distribution, CategoricalDistribution):
+        matches = [c for c in distribution.choices if str(c) == value]
+        return matches[0] if matches else None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return int(number) if isinstance(distribution, IntDistribution) else number
+
+
+def _in_space(params: dict, distributions: dict) -> dict:
+    """Keep the parameters whose values lie inside their search distribution."""
+    kept = {}
+    for name, value in params.items():
+        distribution = distributions.get(name)
+        if distribution is None:
+            inside = False
+        elif isinstance(distribution, CategoricalDistribution):
+            inside = value in distribution.choices
+        else:
+            inside = isinstance(value, (int, float)) and (
+                distribution.low <= value <= distribution.high
+            )
+        if inside:
+            kept[name] = value
+    return kept
+
+
+def previous_best_params(
+    experiment_name: str, run_name: str, optimize: str, distributions: dict
+) -> dict:
+    """
+    Read the best tuned parameters for `run_name` from the MLflow tracking store.
+
+    Looks for `tune_model` runs logged by PyCaret under `experiment_name`,
+    keeps the one with the highest `optimize` metric and returns the
+    parameters that are part of the search space. Returns an empty dict if
+    there is no such run.
+    """
+    import mlflow
+
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+    try:
+        runs = mlflow.search_runs(
+            experiment_names=[experiment_name],
+            filter_string=f"tags.mlflow.runName = '{run_name}' AND tags.Source = 'tune_model'",
+            order_by=[f"metrics.{optimize} DESC"],
+            max_results=1,
+        )
+    except mlflow.exceptions.MlflowException as e:
+        logger.warning(f"Cannot read previous runs of {experiment_name}: {e}")
+        return {}
+    if runs.empty:
+        return {}
+
+    best = runs.iloc[0]
+    params = {}
+    for name, distribution in distributions.items():
+        value = best.get(f"params.{name}")
+        if isinstance(value, str):
+            params[name] = _parse_param(value, distribution)
+    return _in_space(params, distributions)
+
+
+def tune(
+    experiment,
+    model,
+    optimize: str,
+    folds: list[tuple],
+    n_trials: int | None = None,
+    timeout: float | None = None,
+    pruner: str = "median",
+    early_stopping: bool = True,
+    warm_start_from: str | None = None,
+    seed: int | None = None,
+) -> tuple[object, dict]:
+    """
+    Tune `model` with an optuna search that prunes trials fold by fold.
+
+    Every trial fits the prepared folds in order and reports the running
+    mean score after each one, so the pruner can stop trials that fall
+    behind earlier ones after only a few folds. LightGBM and CatBoost
+    candidates stop adding boosting rounds once their score on a split held
+    out from the fold's training rows stops improving, and the median
+    number of rounds they kept becomes the tuned `n_estimators`. The first
+    trials are the parameters of the best `tune_model` run in MLflow
+    experiment `warm_start_from`, if given, and `model`'s own parameters.
+
+    Parameters
+    ----------
+    optimize : str
+        Display name of a PyCaret metric, such as `F1` or `Recall`.
+    folds : list of tuple
+        Output of `prepare_folds`.
+    n_trials, timeout : optional
+        Stop after this many trials or seconds, whichever comes first.
+    pruner : str
+        Key of `PRUNERS`.
+
+    Returns
+    -------
+    tuple
+        An unfitted copy of `model` with the best parameters, and a summary
+        with the best score, trial counts, elapsed seconds and trials per hour.
+    """
+    metrics = experiment.get_metrics().set_index("Display Name")
+    scorer = get_scorer(metrics.loc[optimize, "Scorer"])
+    run_name, distributions = search_space(experiment, model)
+
+    study = optuna.create_study(
+        direction="maximize",
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=PRUNERS[pruner](),
+    )
+    if warm_start_from:
+        warm = previous_best_params(warm_start_from, run_name, optimize, distributions)
+        if warm:
+            logger.info(f"Warm-starting {run_name} from {warm_start_from}")
+            study.enqueue_trial(warm, skip_if_exists=True)
+    study.enqueue_trial(_in_space(model.get_params(), distributions), skip_if_exists=True)
+
+    start = time.perf_counter()
+    while n_trials is None or len(study.trials) < n_trials:
+        if timeout is not None and time.perf_counter() - start >= timeout:
+            break
+        trial = study.ask(distributions)
+        estimator = clone(model).set_params(**trial.params)
+        scores, rounds = [], []
+        try:
+            for step, fold in enumerate(folds):
+                fitted, kept = _fit_fold(clone(estimator), *fold[:2], early_stopping, seed)
+                scores.append(scorer(fitted, fold[2], fold[3]))
+                if kept is not None:
+                    rounds.append(kept)
+                trial.report(float(np.mean(scores)), step)
+                if trial.should_prune():
+                    break
+        except Exception as e:
+            logger.warning(f"Trial {trial.number} failed: {e}")
+            study.tell(trial, state=TrialState.FAIL)
+            continue
+
+        if rounds:
+            trial.set_user_attr("n_estimators", int(np.median(rounds)))
+        if len(scores) < len(folds):
+            study.tell(trial, state=TrialState.PRUNED)
+        else:
+            study.tell(trial, float(np.mean(scores)))
+    elapsed = time.perf_counter() - start
+
+    states = [t.state for t in study.trials]
+    summary = {
+        "trials": len(study.trials),
+        "complete": states.count(TrialState.COMPLETE),
+        "pruned": states.count(TrialState.PRUNED),
+        "seconds": elapsed,
+        "trials_per_hour": len(study.trials) / elapsed * 3600,
+        "best_score": None,
+    }
+    if summary["complete"] == 0:
+        return clone(model), summary
+
+    best = study.best_trial
+    params = {**best.params, **best.user_attrs}
+    summary["best_score"] = best.value
+    return clone(model).set_params(**params), summary
+
+
+def format_summary(summary: dict, optimize: str) -> str:
+    best = "n/a" if summary["best_score"] is None else f"{summary['best_score']:.4f}"
+    return (
+        f"{summary['trials']} trials ({summary['pruned']} pruned) in {summary['seconds']:.0f}s, "
+        f"{summary['trials_per_hour']:,.0f} trials/hour, best {optimize} {best}"
+    )
+
+
+@app.command()
+def main(
+    model: str = typer.Option("lung_cancer", help=" or ".join(train.TRAINING_SPECS)),
+    estimator: str = typer.Option(
+        None, help="PyCaret model ID to tune. Defaults to the saved pipeline's estimator."
+    ),
+    budget_minutes: float = typer.Option(10, help="Wall-clock budget for the search."),
+    pruner: str = typer.Option("median", help=" or ".join(PRUNERS)),
+    early_stopping: bool = typer.Option(True, help="Early-stop LightGBM/CatBoost rounds."),
+    warm_start: bool = typer.Option(True, help="Start from the best run logged in MLflow."),
+):
+    """Tune one candidate of a training experiment within a fixed time budget."""
+    spec = train.TRAINING_SPECS[model]
+    data, _ = train.load_training_data(model)
+    experiment = train.setup_experiment(model, data)
+    if estimator is None:
+        candidate = clone(get_model(model).steps[-1][1])
+    else:
+        candidate = experiment.create_model(estimator, cross_validation=False, verbose=False)
+
+    folds = prepare_folds(experiment)
+    _, summary = tune(
+        experiment,
+        candidate,
+        spec["sort"],
+        folds,
+        timeout=budget_minutes * 60,
+        pruner=pruner,
+        early_stopping=early_stopping,
+        warm_start_from=spec["experiment"] if warm_start else None,
+        seed=spec["setup"]["session_id"],
+    )
+    logger.info(f"{type(candidate).__name__}: {format_summary(summary, spec['sort'])}")
+    logger.success("Tuning complete.")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,17 +1,98 @@
+import time
+
+import numpy as np
 import pandas as pd
-from pycaret.classification import load_model, predict_model
 
+from mlops_assignment import audit, compiled, metrics, profiling, shadow
+from mlops_assignment.batching import MicroBatcher
+from mlops_assignment.cache import PredictionCache
+from mlops_assignment.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS
+from mlops_assignment.registry import get_model
 
-# Load the saved model
-MODEL_PATH = "models/alzheimer_pred_model"
-model = load_model(MODEL_PATH)
+# Patient record columns collected by the Alzheimer's page and present in the raw dataset.
+FEATURE_COLUMNS = [
+    "Age",
+    "Gender",
+    "Ethnicity",
+    "EducationLevel",
+    "BMI",
+    "Smoking",
+    "AlcoholConsumption",
+    "PhysicalActivity",
+    "DietQuality",
+    "SleepQuality",
+    "FamilyHistoryAlzheimers",
+    "CardiovascularDisease",
+    "Diabetes",
+    "Depression",
+    "HeadInjury",
+    "Hypertension",
+    "SystolicBP",
+    "DiastolicBP",
+    "CholesterolTotal",
+    "CholesterolLDL",
+    "CholesterolHDL",
+    "CholesterolTriglycerides",
+    "MMSE",
+    "FunctionalAssessment",
+    "MemoryComplaints",
+    "BehavioralProblems",
+    "ADL",
+    "Confusion",
+    "Disorientation",
+    "PersonalityChanges",
+    "DifficultyCompletingTasks",
+    "Forgetfulness",
+]
 
 
-def predict(input_df: pd.DataFrame):
+def _predict_batch(input_df: pd.DataFrame):
+    metrics.observe("prediction_batch_rows", len(input_df), model="alzheimer")
+    # A compiled backend, if configured, scores without PyCaret.
+    result = compiled.predict("alzheimer", input_df)
+    if result is not None:
+        labels, scores = result
+        # Rounded as `predict_model` rounds its scores, so every backend agrees.
+        return (
+            pd.Series(labels, index=input_df.index, name='prediction_label'),
+            pd.Series(np.round(scores, 4), index=input_df.index, name='prediction_score'),
+        )
 
-    prediction_df = predict_model(model, data=input_df)
+    from pycaret.classification import predict_model
+
+    model = get_model("alzheimer")
+    with metrics.timer("alzheimer", "predict_model"):
+        prediction_df = predict_model(model, data=input_df)
 
     predicted_class = prediction_df['prediction_label']
     predicted_prob = prediction_df['prediction_score']
 
-    return predicted_class, predicted_prob
\ No newline at end of file
+    return predicted_class, predicted_prob
+
+
+_batcher = MicroBatcher(_predict_batch, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS)
+_cache = PredictionCache("alzheimer", FEATURE_COLUMNS)
+
+
+def _predict_uncached(input_df: pd.DataFrame):
+    # Single patients from concurrent sessions are scored together.
+    if len(input_df) == 1 and MICRO_BATCH_WAIT_MS > 0:
+        return _batcher.submit(input_df)
+
+    preds, probs = _predict_batch(input_df)
+    return preds.to_numpy(), probs.to_numpy()
+
+
+def predict(input_df: pd.DataFrame):
+    metrics.observe("prediction_rows", len(input_df), model="alzheimer")
+    start = time.perf_counter()
+    with profiling.profile("alzheimer_predict"), metrics.timer("alzheimer", "call"):
+        preds, probs = _cache.predict(input_df, _predict_uncached)
+    seconds = time.perf_counter() - start
+    audit.record("alzheimer", input_df, preds, probs, seconds)
+    shadow.record("alzheimer", input_df, preds, probs, seconds)
+
+    predicted_class = pd.Series(preds, index=input_df.index, name='prediction_label')
+    predicted_prob = pd.Series(probs, index=input_df.index, name='prediction_score')
+
+    return predicted_class, predicted_prob
@@ -1,15 +1,120 @@
-from pathlib import Path
+import time
 
+import numpy as np
 import pandas as pd
-from pycaret.classification import load_model, predict_model
+
+from mlops_assignment import audit, compiled, metrics, profiling, shadow
+from mlops_assignment.batching import MicroBatcher
+from mlops_assignment.cache import PredictionCache
+from mlops_assignment.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS
+from mlops_assignment.registry import get_model
+
+# Feature names inferred from the original cleaned dataset `Lung_Patient_Cleaned.csv`
+FEATURE_COLUMNS = [
+    "Age",
+    "Gender",
+    "Air_Pollution",
+    "Alcohol_use",
+    "Dust_Allergy",
+    "Occupational_Hazards",
+    "Genetic_Risk",
+    "Chronic_Lung_Disease",
+    "Balanced_Diet",
+    "Obesity",
+    "Smoking",
+    "Passive_Smoker",
+    "Chest_Pain",
+    "Coughing_of_Blood",
+    "Fatigue",
+    "Weight_Loss",
+    "Shortness_of_Breath",
+    "Wheezing",
+    "Swallowing_Difficulty",
+    "Clubbing_of_Finger_Nails",
+    "Frequent_Cold",
+    "Dry_Cough",
+    "Snoring",
+]
+
+
+def _decode_labels(model, codes: np.ndarray) -> np.ndarray:
+    """Map encoded class indices back to the original `Level` labels."""
+    label_encoder = dict(model.steps).get("label_encoding")
+    if label_encoder is None:
+        return codes
+    return label_encoder.transformer.inverse_transform(codes)
+
+
+def predict_lung_cancer_batch(input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run lung cancer predictions for every row of `input_df` in a single pass.
+
+    The pipeline transforms the whole frame once and the estimator's class
+    probabilities are used for both the label and the confidence, so no row
+    goes through the pipeline more than once. Rows already seen with the
+    same model file are answered from a `PredictionCache`, and single-row
+    misses are routed through a `MicroBatcher`, so concurrent
+    single-patient calls share one pipeline pass. With a compiled
+    `INFERENCE_BACKEND`, misses are scored by the compiled pipeline
+    instead. Every call is recorded in the prediction audit log and, if
+    `SHADOW_MODELS` names candidates, handed to them for shadow scoring.
+
+    Parameters
+    ----------
+    input_df : pd.DataFrame
+        A DataFrame with N rows containing at least `FEATURE_COLUMNS`.
+        Extra columns are ignored.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        `(predictions, probabilities)`, each of length N and aligned with
+        the rows of `input_df`. `probabilities` holds the probability of
+        the predicted class.
+    """
+    metrics.observe("prediction_rows", len(input_df), model="lung_cancer")
+    if len(input_df) == 0:
+        return np.empty(0, dtype=object), np.empty(0, dtype=float)
+
+    start = time.perf_counter()
+    with profiling.profile("lung_cancer_predict"), metrics.timer("lung_cancer", "call"):
+        predictions, probabilities = _cache.predict(input_df, _predict_uncached)
+    seconds = time.perf_counter() - start
+    audit.record("lung_cancer", input_df, predictions, probabilities, seconds)
+    shadow.record("lung_cancer", input_df, predictions, probabilities, seconds)
+    return predictions, probabilities
 
 
-BASE_DIR = Path(__file__).resolve().parents[1]
+def _predict_uncached(input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    # Single patients from concurrent sessions are scored together.
+    if len(input_df) == 1 and MICRO_BATCH_WAIT_MS > 0:
+        return _batcher.submit(input_df[FEATURE_COLUMNS])
 
-# This corresponds to `models/lung_cancer_pipeline.pkl` in the repo root.
-MODEL_NAME = BASE_DIR / "models" / "lung_cancer_pipeline"
+    return _score(input_df)
 
-model = load_model(str(MODEL_NAME))
+
+def _score(input_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    metrics.observe("prediction_batch_rows", len(input_df), model="lung_cancer")
+    # A compiled backend, if configured, scores without the pipeline.
+    result = compiled.predict("lung_cancer", input_df)
+    if result is not None:
+        return result
+
+    model = get_model("lung_cancer")
+    # `model.predict_proba` split in two, so the estimator is timed apart from the steps.
+    Xt, _ = model._memory_full_transform(model, input_df[FEATURE_COLUMNS], None, with_final=False)
+    with metrics.timer("lung_cancer", "estimator"):
+        proba = model.steps[-1][1].predict_proba(Xt)
+    codes = proba.argmax(axis=1)
+
+    predictions = _decode_labels(model, model.classes_[codes])
+    probabilities = proba[np.arange(len(proba)), codes]
+
+    return predictions, probabilities
+
+
+_batcher = MicroBatcher(_score, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS)
+_cache = PredictionCache("lung_cancer", FEATURE_COLUMNS)
 
 
 def predict_lung_cancer(input_df: pd.DataFrame) -> dict:
@@ -25,38 +130,22 @@ def predict_lung_cancer(input_df: pd.DataFrame) -> dict:
     Returns
     -------
     dict
-        For a single-row input, returns:
+        For the first row of the input, returns:
         {
             "prediction": <predicted label or value>,
             "probability": <probability score if available, else None>
         }
     """
-    prediction_df = predict_model(model, data=input_df)
-
-    label_col = "prediction_label"
-    score_col = "prediction_score"
+    predictions, probabilities = predict_lung_cancer_batch(input_df.iloc[:1])
 
     prediction = None
     probability = None
 
-    if label_col in prediction_df.columns:
-        prediction = prediction_df[label_col].iloc[0]
-    elif "Label" in prediction_df.columns:
-        prediction = prediction_df["Label"].iloc[0]
-
-    try:
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(input_df)
-            if proba is not None and proba.size > 0:
-                probability = float(proba.max(axis=1)[0])
-    except Exception:
-        pass
-
-    if probability is None and score_col in prediction_df.columns:
-        probability = float(prediction_df[score_col].iloc[0])
+    if len(predictions) > 0:
+        prediction = predictions[0]
+        probability = float(probabilities[0])
 
     return {
         "prediction": prediction,
         "probability": probability,
     }
-
@@ -0,0 +1,160 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+import itertools
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+
+from mlops_assignment.config import PROFILE_EVERY, PROFILE_INTERVAL_MS, PROFILES_DIR
+
+# Profile one in `every` page runs and predictor calls of each name; 0 disables profiling.
+# Can be changed at runtime, e.g. by benchmarks.
+every = PROFILE_EVERY
+
+_calls = defaultdict(itertools.count)
+_files = itertools.count()
+# Threads currently being profiled, so nested calls are not profiled twice.
+_active = set()
+# Sampler threads, which are left out of every profile.
+_samplers = set()
+_disabled = nullcontext()
+
+
+def _sampled(name: str, force: bool) -> bool:
+    if threading.get_ident() in _active:
+        return False
+    if force:
+        return True
+    return every > 0 and next(_calls[name]) % every == 0
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """
+    Wall-clock sampling profiler for one thread and the threads it waits on.
+
+    A background thread records the stack of every thread in the process
+    every `interval_ms`, so work the profiled thread hands off, such as a
+    single prediction scored on the micro-batcher thread, shows up too.
+    The counts are written to `PROFILES_DIR` as collapsed stacks rooted at
+    the thread's name, one `name;thread;frame;... count` line per stack,
+    which `flamegraph.pl` and speedscope read directly.
+
+    Parameters
+    ----------
+    name : str
+        Used in the output file name.
+    thread_id : int
+        `threading.get_ident()` of the thread to profile.
+    until : frame, optional
+        Record the profiled thread's stacks from this frame up and stop once
+        it returns, for runs that cannot be wrapped in a `with` block, such
+        as a Streamlit page.
+    """
+
+    def __init__(self, name: str, thread_id: int, until=None, interval_ms: float = None):
+        self.name = name
+        self.thread_id = thread_id
+        self.until = until
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.path = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{name}", daemon=True)
+
+    def start(self) -> "Sampler":
+        _active.add(self.thread_id)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Path:
+        """Stop sampling and return the path of the written profile."""
+        self._stop.set()
+        self._thread.join()
+        return self.path
+
+    def _sample(self) -> list[tuple] | None:
+        """`(thread name, code, ...)` stacks of every thread, or None once `until` returned."""
+        frames = sys._current_frames()
+        if self.until is not None and self.thread_id not in frames:
+            return None
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        samples = []
+        for thread_id, frame in frames.items():
+            if thread_id in _samplers:
+                continue
+            until = self.until if thread_id == self.thread_id else None
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame is until:
+                    break
+                frame = frame.f_back
+            if frame is None and until is not None:
+                return None
+            if stack:
+                samples.append((names.get(thread_id, str(thread_id)), *reversed(stack)))
+        return samples
+
+    def _run(self) -> None:
+        _samplers.add(threading.get_ident())
+        try:
+            while not self._stop.wait(self.interval):
+                samples = self._sample()
+                if samples is None:
+                    break
+                self.stacks.update(samples)
+        finally:
+            _samplers.discard(threading.get_ident())
+            _active.discard(self.thread_id)
+            self.path = self._write()
+
+    def _write(self) -> Path:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = PROFILES_DIR / f"{stamp}-{self.name}-{os.getpid()}-{next(_files)}.folded"
+        labels = {}
+        lines = []
+        for (thread, *stack), count in self.stacks.items():
+            frames = [self.name, thread] + [labels.setdefault(c, _label(c)) for c in stack]
+            lines.append(f"{';'.join(frames)} {count}\n")
+        path.write_text("".join(lines))
+        return path
+
+
+@contextmanager
+def _profile(name: str):
+    sampler = Sampler(name, threading.get_ident()).start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+
+
+def profile(name: str, force: bool = False):
+    """
+    Profile the `with` block if this call is sampled or `force` is set.
+
+    Returns a shared no-op context manager otherwise, so an unsampled
+    call costs one comparison.
+    """
+    if (every <= 0 and not force) or not _sampled(name, force):
+        return _disabled
+    return _profile(name)
+
+
+def profile_page(name: str, force: bool = False) -> Sampler | None:
+    """
+    Profile the rest of the calling Streamlit page run if it is sampled or `force` is set.
+
+    Call it at the top of a page script. Sampling stops when the script
+    returns, including through `st.stop()` or an exception.
+    """
+    if (every <= 0 and not force) or not _sampled(name, force):
+        return None
+    return Sampler(name, threading.get_ident(), until=sys._getframe(1)).start()
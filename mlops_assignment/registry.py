@@ -0,0 +1,90 @@
+from pathlib import Path
+import threading
+import time
+
+from loguru import logger
+
+from mlops_assignment import metrics
+from mlops_assignment.config import MODELS_DIR
+
+# Saved PyCaret pipelines served by the app, keyed by the name used in code.
+MODEL_PATHS = {
+    "alzheimer": MODELS_DIR / "alzheimer_pred_model.pkl",
+    "lung_cancer": MODELS_DIR / "lung_cancer_pipeline.pkl",
+}
+
+# One loaded pipeline per pickle path: {path: (mtime_ns, model)}.
+# Streamlit imports this module once per server process, so every rerun and
+# every session reads from the same dictionary.
+_models: dict[Path, tuple[int, object]] = {}
+_lock = threading.Lock()
+
+
+def load(model_path: Path):
+    """
+    Return the PyCaret pipeline saved at `model_path`, loading it on first use.
+
+    The pipeline is held once per process and keyed by the pickle's path and
+    modification time, so it is reloaded only when the file on disk changes.
+    Pickles ingested into `artifact_store` are assembled from its shared
+    step blobs instead of being unpickled whole. Load times and the
+    pipeline's per-step prediction times are recorded in `metrics`.
+
+    Parameters
+    ----------
+    model_path : Path
+        Path to the `.pkl` file written by `save_model`.
+    """
+    model_path = Path(model_path).resolve()
+    mtime = model_path.stat().st_mtime_ns
+
+    cached = _models.get(model_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _models.get(model_path)
+        if cached is None or cached[0] != mtime:
+            # Imported here so importing a predictor module stays cheap.
+            from mlops_assignment import artifact_store
+
+            start = time.perf_counter()
+            model = artifact_store.load(model_path)
+            source = "the artifact store"
+            if model is None:
+                from pycaret.classification import load_model
+
+                model = load_model(str(model_path.with_suffix("")), verbose=False)
+                source = "its pickle"
+            elapsed = time.perf_counter() - start
+            logger.info(f"Loaded {model_path.name} from {source} in {elapsed:.2f}s")
+
+            # Served pipelines are labelled with their name in code, like their predictors.
+            label = next(
+                (name for name, path in MODEL_PATHS.items() if path.resolve() == model_path),
+                model_path.stem,
+            )
+            metrics.observe("model_load_seconds", elapsed, model=label)
+            model = metrics.instrument(model, label)
+
+            _models[model_path] = (mtime, model)
+            cached = _models[model_path]
+
+    return cached[1]
+
+
+def get_model(name: str):
+    """Return the served pipeline registered under `name` in `MODEL_PATHS`."""
+    return load(MODEL_PATHS[name])
+
+
+def identity(name: str) -> tuple[str, int]:
+    """Return `(path, mtime_ns)` of the pickle registered under `name`."""
+    model_path = MODEL_PATHS[name]
+    return str(model_path), model_path.stat().st_mtime_ns
+
+
+def clear() -> None:
+    """Drop every loaded pipeline, forcing the next call to reload from disk."""
+    with _lock:
+        _models.clear()
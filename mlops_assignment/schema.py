@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Rules shared by many columns. "int" columns must hold whole numbers; "range"
+# bounds are inclusive and "values" lists every allowed code.
+BINARY = {"dtype": "int", "values": (0, 1)}
+EXPOSURE = {"dtype": "int", "range": (1, 8)}
+SYMPTOM = {"dtype": "int", "range": (1, 9)}
+
+# Input schema of each model: {model: {column: rule}}. The Alzheimer bounds are
+# those of the page's sliders and the lung cancer scales those of its selectboxes.
+SCHEMAS = {
+    "alzheimer": {
+        "Age": {"dtype": "int", "range": (60, 90)},
+        "Gender": BINARY,
+        "Ethnicity": {"dtype": "int", "values": (0, 1, 2, 3)},
+        "EducationLevel": {"dtype": "int", "values": (0, 1, 2, 3)},
+        "BMI": {"dtype": "float", "range": (15, 40)},
+        "Smoking": BINARY,
+        "AlcoholConsumption": {"dtype": "float", "range": (0, 20)},
+        "PhysicalActivity": {"dtype": "float", "range": (0, 10)},
+        "DietQuality": {"dtype": "float", "range": (0, 10)},
+        "SleepQuality": {"dtype": "float", "range": (4, 10)},
+        "FamilyHistoryAlzheimers": BINARY,
+        "CardiovascularDisease": BINARY,
+        "Diabetes": BINARY,
+        "Depression": BINARY,
+        "HeadInjury": BINARY,
+        "Hypertension": BINARY,
+        "SystolicBP": {"dtype": "int", "range": (90, 180)},
+        "DiastolicBP": {"dtype": "int", "range": (60, 120)},
+        "CholesterolTotal": {"dtype": "float", "range": (150, 300)},
+        "CholesterolLDL": {"dtype": "float", "range": (50, 200)},
+        "CholesterolHDL": {"dtype": "float", "range": (20, 100)},
+        "CholesterolTriglycerides": {"dtype": "float", "range": (50, 400)},
+        "MMSE": {"dtype": "float", "range": (0, 30)},
+        "FunctionalAssessment": {"dtype": "float", "range": (0, 10)},
+        "MemoryComplaints": BINARY,
+        "BehavioralProblems": BINARY,
+        "ADL": {"dtype": "float", "range": (0, 10)},
+        "Confusion": BINARY,
+        "Disorientation": BINARY,
+        "PersonalityChanges": BINARY,
+        "DifficultyCompletingTasks": BINARY,
+        "Forgetfulness": BINARY,
+    },
+    "lung_cancer": {
+        "Age": {"dtype": "int", "range": (0, 120)},
+        "Gender": {"dtype": "int", "values": (1, 2)},
+        "Air_Pollution": EXPOSURE,
+        "Alcohol_use": EXPOSURE,
+        "Dust_Allergy": EXPOSURE,
+        "Occupational_Hazards": EXPOSURE,
+        "Genetic_Risk": EXPOSURE,
+        "Chronic_Lung_Disease": EXPOSURE,
+        "Balanced_Diet": {"dtype": "int", "range": (1, 8)},
+        "Obesity": EXPOSURE,
+        "Smoking": EXPOSURE,
+        "Passive_Smoker": EXPOSURE,
+        "Chest_Pain": SYMPTOM,
+        "Coughing_of_Blood": SYMPTOM,
+        "Fatigue": SYMPTOM,
+        "Weight_Loss": SYMPTOM,
+        "Shortness_of_Breath": SYMPTOM,
+        "Wheezing": SYMPTOM,
+        "Swallowing_Difficulty": SYMPTOM,
+        "Clubbing_of_Finger_Nails": SYMPTOM,
+        "Frequent_Cold": SYMPTOM,
+        "Dry_Cough": SYMPTOM,
+        "Snoring": SYMPTOM,
+    },
+}
+
+
+def _checks(column: pd.Series, rule: dict):
+    """Yield `(failing, reason)` per check of `rule`, each excluding cells failed earlier."""
+    if column.dtype.kind in "biuf":
+        values = column.to_numpy(dtype=float)
+        missing = np.isnan(values)
+        failed = missing
+        yield missing, "is missing"
+    else:
+        # A text column, as `read_csv` returns for a column with any non-number in it.
+        if rule["dtype"] == "int":
+            # Parse each distinct value once; whole-number columns have few.
+            codes, distinct = pd.factorize(column)
+            parsed = pd.to_numeric(pd.Series(distinct, dtype=object), errors="coerce")
+            values = np.append(parsed.to_numpy(dtype=float), np.nan)[codes]
+            missing = codes < 0
+        else:
+            values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+            missing = column.isna().to_numpy()
+        nan = np.isnan(values)
+        yield missing, "is missing"
+        yield nan & ~missing, "is not a number"
+        failed = nan
+
+    if rule["dtype"] == "int" and column.dtype.kind not in "biu":
+        fractional = ~failed & (values != np.floor(values))
+        yield fractional, "is not a whole number"
+        failed = failed | fractional
+
+    if "range" in rule:
+        low, high = rule["range"]
+        yield ~failed & ((values < low) | (values > high)), f"is outside {low}-{high}"
+    if "values" in rule:
+        allowed = ", ".join(map(str, rule["values"]))
+        yield ~failed & ~np.isin(values, rule["values"]), f"is not one of {allowed}"
+
+
+def validate(df: pd.DataFrame, model: str, first_row: int = 0) -> pd.DataFrame:
+    """
+    Check every feature column of `df` against the model's schema.
+
+    Each column is checked with whole-column NumPy operations, and messages
+    are built only for the cells that fail, so a clean frame costs a few
+    comparisons per cell.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows to check. Columns not in the schema are ignored.
+    model : str
+        A key of `SCHEMAS`.
+    first_row : int
+        Number of rows before `df` in its file, so reported rows are
+        numbered from the start of the file.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per invalid row of `df`, indexed by its position in `df`,
+        with `Row` (1-based row number in the file) and `Errors` (every
+        failed check of that row, separated by "; ").
+
+    Raises
+    ------
+    ValueError
+        If `df` lacks any schema column, since no row can then be scored.
+    """
+    schema = SCHEMAS[model]
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise ValueError("The uploaded CSV is missing required columns:\n" + ", ".join(missing))
+
+    messages = []
+    for name, rule in schema.items():
+        for failing, reason in _checks(df[name], rule):
+            positions = np.flatnonzero(failing)
+            if not len(positions):
+                continue
+            if reason == "is missing":
+                text = np.full(len(positions), f"{name} is missing", dtype=object)
+            else:
+                shown = df[name].iloc[positions].astype(str).to_numpy(dtype=object)
+                text = f"{name} " + shown + f" {reason}"
+            messages.append((positions, text))
+
+    rows = np.unique(np.concatenate([p for p, _ in messages] or [np.empty(0, dtype=int)]))
+    errors = np.full(len(rows), "", dtype=object)
+    for positions, text in messages:
+        at = np.searchsorted(rows, positions)
+        errors[at] = np.where(errors[at] == "", text, errors[at] + "; " + text)
+    return pd.DataFrame({"Row": rows + first_row + 1, "Errors": errors}, index=rows)
@@ -0,0 +1,135 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import io
+import json
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+import pandas as pd
+
+from mlops_assignment import metrics, schema, shadow
+from mlops_assignment.config import PREDICT_WORKERS
+from mlops_assignment.predict_alzheimer import predict
+from mlops_assignment.predict_lung_cancer import predict_lung_cancer_batch
+
+# Model calls run in this pool so the event loop keeps serving other requests.
+executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    executor.shutdown(wait=True)
+
+
+app = FastAPI(title="MLOps Assignment Prediction Service", lifespan=lifespan)
+
+
+def _predict_alzheimer(df: pd.DataFrame) -> tuple[list, list]:
+    preds, probs = predict(df)
+    return preds.tolist(), probs.tolist()
+
+
+def _predict_lung_cancer(df: pd.DataFrame) -> tuple[list, list]:
+    preds, probs = predict_lung_cancer_batch(df)
+    return preds.tolist(), probs.tolist()
+
+
+async def _read_records(request: Request) -> tuple[pd.DataFrame, bool]:
+    """
+    Parse the request body into a DataFrame.
+
+    Accepts a CSV body (`Content-Type: text/csv`), a JSON object for a single
+    patient, or a JSON list of objects for a batch. Returns the frame and
+    whether the caller sent a single record.
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("text/csv"):
+            return pd.read_csv(io.BytesIO(body)), False
+
+        payload = json.loads(body)
+        if isinstance(payload, dict):
+            return pd.DataFrame([payload]), True
+        if isinstance(payload, list):
+            return pd.DataFrame(payload), False
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse request body: {e}")
+
+    raise HTTPException(status_code=400, detail="Expected a JSON object, JSON list or CSV body.")
+
+
+def _validate(df: pd.DataFrame, model: str) -> pd.DataFrame:
+    """
+    Check `df` against the model's schema, as the pages and the batch CLI do.
+
+    Raises a 422 listing every failed check by row when any row is invalid,
+    and otherwise returns `df` with the schema columns as numbers.
+    """
+    try:
+        errors = schema.validate(df, model)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if len(errors):
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"{len(errors)} of {len(df)} records are invalid.",
+                "errors": [
+                    {"row": int(row), "errors": message}
+                    for row, message in zip(errors["Row"], errors["Errors"])
+                ],
+            },
+        )
+    # Columns sent as text, e.g. a JSON "70", hold only numbers now.
+    for name in schema.SCHEMAS[model]:
+        if df[name].dtype.kind not in "biuf":
+            df[name] = pd.to_numeric(df[name])
+    return df
+
+
+async def _respond(request: Request, model: str, predictor) -> dict:
+    df, single = await _read_records(request)
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No records to predict.")
+    df = _validate(df, model)
+
+    loop = asyncio.get_running_loop()
+    try:
+        preds, probs = await loop.run_in_executor(executor, predictor, df)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Could not score the records: {e}")
+
+    if single:
+        return {"prediction": preds[0], "probability": probs[0]}
+    return {"predictions": preds, "probabilities": probs}
+
+
+@app.get("/healthz")
+async def healthz() -> dict:
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> PlainTextResponse:
+    """Prediction latency, row count and model load histograms for Prometheus to scrape."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/shadow")
+async def shadow_endpoint() -> list[dict]:
+    """Agreement and latency of each shadow candidate with the served model so far."""
+    report = shadow.report()
+    # JSON has no NaN; candidates with no scored calls yet report null.
+    return report.astype(object).where(report.notna(), None).to_dict("records")
+
+
+@app.post("/predict/alzheimer")
+async def predict_alzheimer_endpoint(request: Request) -> dict:
+    return await _respond(request, "alzheimer", _predict_alzheimer)
+
+
+@app.post("/predict/lung-cancer")
+async def predict_lung_cancer_endpoint(request: Request) -> dict:
+    return await _respond(request, "lung_cancer", _predict_lung_cancer)
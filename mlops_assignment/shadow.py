@@ -0,0 +1,359 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+import time
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from mlops_assignment import metrics
+from mlops_assignment.config import PROJ_ROOT, SHADOW_MAX_PENDING, SHADOW_MODELS, SHADOW_WORKERS
+from mlops_assignment.schema import SCHEMAS
+
+# Source prefix of MLflow registered model versions, as in `models:/<name>/<version>`.
+REGISTERED_PREFIX = "models:/"
+
+
+def parse(spec: str) -> dict[str, list[str]]:
+    """Candidate sources of each model, from `SHADOW_MODELS`-style `<model>=<source>` pairs."""
+    candidates = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, source = pair.partition("=")
+        if model.strip() not in SCHEMAS or not source.strip():
+            raise ValueError(f"Expected '<model>=<source>' for a model in {list(SCHEMAS)}: {pair}")
+        candidates.setdefault(model.strip(), []).append(source.strip())
+    return candidates
+
+
+# Pipelines loaded by a shadow worker process: {source: pipeline}. The served
+# pipeline is loaded through `registry`, which reloads it when its pickle changes.
+_pipelines = {}
+
+
+def _pipeline(model: str, source: str | None):
+    if source is None:
+        from mlops_assignment.registry import get_model
+
+        return get_model(model)
+    if source not in _pipelines:
+        if source.startswith(REGISTERED_PREFIX):
+            from mlops_assignment.artifact_store import load_registered
+
+            name, _, version = source[len(REGISTERED_PREFIX) :].partition("/")
+            _pipelines[source] = load_registered(name, version or "latest")
+        else:
+            from mlops_assignment.registry import load
+
+            _pipelines[source] = load(PROJ_ROOT / source)
+    return _pipelines[source]
+
+
+def _init_worker(candidates: dict[str, list[str]]) -> None:
+    # Lowest CPU priority, so shadows only take CPU time served requests leave idle.
+    # Linux's idle policy also lets a served request preempt a shadow as soon as it wakes.
+    if hasattr(os, "SCHED_IDLE"):
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    elif hasattr(os, "nice"):
+        os.nice(19)
+    # Load every pipeline before the first call, so no call is timed with a load in it.
+    for model, sources in candidates.items():
+        for source in [None, *sources]:
+            try:
+                _pipeline(model, source)
+            except Exception as e:
+                # Reported with the calls that need this pipeline.
+                logger.warning(f"Cannot load shadow pipeline {source or model}: {e}")
+
+
+def _predict(model: str, source: str | None, frame: pd.DataFrame):
+    """`(labels, confidences, seconds)` of one pipeline on `frame`."""
+    pipeline = _pipeline(model, source)
+    start = time.perf_counter()
+    proba = pipeline.predict_proba(frame[list(SCHEMAS[model])])
+    codes = proba.argmax(axis=1)
+    labels = pipeline.classes_[codes]
+    label_encoder = dict(pipeline.steps).get("label_encoding")
+    if label_encoder is not None:
+        labels = label_encoder.transformer.inverse_transform(labels)
+    return labels, proba[np.arange(len(proba)), codes], time.perf_counter() - start
+
+
+def _score(
+    model: str, sources: list[str], frame: pd.DataFrame, predictions, probabilities
+) -> tuple[float, dict]:
+    """
+    Score one call with the served pipeline and every candidate, in a shadow worker.
+
+    Returns the served pipeline's time and, per candidate, `(agreed rows,
+    sum of absolute confidence differences, seconds)` against the served
+    response, or the error raised by the candidate.
+    """
+    served_seconds = _predict(model, None, frame)[2]
+    served = np.asarray(predictions).astype(str)
+    results = {}
+    for source in sources:
+        try:
+            labels, confidences, seconds = _predict(model, source, frame)
+        except Exception as e:
+            results[source] = f"{type(e).__name__}: {e}"
+            continue
+        results[source] = (
+            int((np.asarray(labels).astype(str) == served).sum()),
+            float(np.abs(confidences - np.asarray(probabilities, dtype=float)).sum()),
+            seconds,
+        )
+    return served_seconds, results
+
+
+class _Stats:
+    """Running totals of one candidate's shadowed calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.agreed = 0
+        self.confidence_difference = 0.0
+        self.primary_seconds = 0.0
+        self.served_seconds = 0.0
+        self.candidate_seconds = 0.0
+        self.errors = 0
+        self.last_error = None
+
+
+class ShadowScorer:
+    """
+    Scores predictor calls with candidate models in background processes.
+
+    `record` hands a call to a process pool and returns at once, so the
+    served response never waits for a candidate; the request path pays
+    for a shallow copy of the input frame and a queue put. The pool and its
+    workers are started by a background thread as soon as the scorer is
+    created, and calls recorded before they are up wait in a list. When
+    `max_pending` calls are already queued or being scored, the call is
+    counted as dropped instead. Each worker loads the served pipeline and
+    the candidates once, scores the call with all of them through
+    `predict_proba` and returns only counts and timings, which are added
+    to running totals per candidate. The served pipeline is timed the same
+    way, so latency deltas compare the models rather than the code paths.
+
+    Parameters
+    ----------
+    candidates : dict[str, list[str]]
+        Candidate sources of each model, as returned by `parse`.
+    workers : int
+        Shadow worker processes.
+    max_pending : int
+        Calls queued or being scored before further calls are dropped.
+    """
+
+    def __init__(
+        self,
+        candidates: dict[str, list[str]],
+        workers: int = SHADOW_WORKERS,
+        max_pending: int = SHADOW_MAX_PENDING,
+    ):
+        self.candidates = candidates
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Also called in forked children, which inherit the pool object but not its
+        # processes, nor the thread starting them.
+        self._pool = None
+        self._starting = None
+        self._waiting = []
+        self._pending = 0
+        self._idle = threading.Condition(threading.Lock())
+        self._stats = {}
+        self._dropped = {model: 0 for model in self.candidates}
+        if any(self.candidates.values()):
+            self._starting = threading.Thread(target=self._start, name="shadow-start", daemon=True)
+            self._starting.start()
+
+    def record(
+        self,
+        model: str,
+        input_df: pd.DataFrame,
+        predictions,
+        probabilities,
+        seconds: float,
+    ) -> None:
+        """Queue one served call for shadow scoring: its inputs, outputs and latency."""
+        sources = self.candidates.get(model)
+        if not sources:
+            return
+        call = (model, sources, input_df.copy(deep=False), predictions, probabilities, seconds)
+        with self._idle:
+            if self._pool is None and self._starting is None:
+                return  # Closed, as the process exits.
+            if self._pending >= self.max_pending:
+                self._dropped[model] += 1
+                return
+            self._pending += 1
+            pool = self._pool
+            if pool is None:
+                # The pool is still starting; it submits the call once its workers are up.
+                self._waiting.append(call)
+                return
+        self._submit(pool, *call)
+
+    def _submit(self, pool, model, sources, frame, predictions, probabilities, seconds) -> None:
+        try:
+            # Pickled for the worker by the pool's own thread, not this one. Callers
+            # add result columns to their frame afterwards, as `score_chunk` does.
+            future = pool.submit(_score, model, sources, frame, predictions, probabilities)
+        except RuntimeError:
+            # The pool was shut down, as the process exits.
+            self._done()
+            return
+        future.add_done_callback(lambda done: self._collect(model, len(frame), seconds, done))
+
+    def _start(self) -> None:
+        # Spawned, since forking a server with running threads can deadlock the child.
+        pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.candidates,),
+        )
+        # Spawned pools launch a worker per submit while none is idle, so one no-op per
+        # worker launches them all here rather than on a later request.
+        for future in [pool.submit(int) for _ in range(self.workers)]:
+            future.exception()
+        with self._idle:
+            self._pool = pool
+            waiting, self._waiting = self._waiting, []
+        for call in waiting:
+            self._submit(pool, *call)
+
+    def _done(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def _collect(self, model: str, rows: int, seconds: float, future) -> None:
+        if future.cancelled():
+            self._done()
+            return
+        try:
+            served_seconds, results = future.result()
+        except Exception as e:
+            # The worker process died, e.g. out of memory.
+            results = {source: f"{type(e).__name__}: {e}" for source in self.candidates[model]}
+            served_seconds = None
+        if served_seconds is not None:
+            metrics.observe("shadow_seconds", served_seconds, model=model, candidate="served")
+        with self._idle:
+            for source, result in results.items():
+                stats = self._stats.setdefault((model, source), _Stats())
+                if isinstance(result, str):
+                    if stats.errors == 0:
+                        logger.warning(f"Shadow candidate {source} of {model} failed: {result}")
+                    stats.errors += 1
+                    stats.last_error = result
+                    continue
+                agreed, difference, candidate_seconds = result
+                stats.calls += 1
+                stats.rows += rows
+                stats.agreed += agreed
+                stats.confidence_difference += difference
+                stats.primary_seconds += seconds
+                stats.served_seconds += served_seconds
+                stats.candidate_seconds += candidate_seconds
+                metrics.observe("shadow_seconds", candidate_seconds, model=model, candidate=source)
+        self._done()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued call has been scored; False if `timeout` ran out first."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def report(self) -> pd.DataFrame:
+        """
+        Agreement and latency of each candidate with the served model so far.
+
+        One row per model and candidate: `calls` and `rows` shadowed, `errors`,
+        `dropped` calls of the model, `agreement` (share of rows with the
+        served label), `mean_confidence_difference` (mean absolute
+        difference in the predicted class's probability), and the mean time
+        per call of the served predictor call (`primary_ms`), and of the
+        served and candidate pipelines in the shadow workers (`served_ms`,
+        `candidate_ms`, `latency_delta_ms`).
+        """
+        with self._idle:
+            rows = []
+            for model, sources in self.candidates.items():
+                for source in sources:
+                    stats = self._stats.get((model, source), _Stats())
+                    # NaN averages until the candidate has scored a call.
+                    calls, count = stats.calls or np.nan, stats.rows or np.nan
+                    served_ms = stats.served_seconds / calls * 1e3
+                    candidate_ms = stats.candidate_seconds / calls * 1e3
+                    rows.append(
+                        {
+                            "model": model,
+                            "candidate": source,
+                            "calls": stats.calls,
+                            "rows": stats.rows,
+                            "errors": stats.errors,
+                            "dropped": self._dropped[model],
+                            "agreement": stats.agreed / count,
+                            "mean_confidence_difference": stats.confidence_difference / count,
+                            "primary_ms": stats.primary_seconds / calls * 1e3,
+                            "served_ms": served_ms,
+                            "candidate_ms": candidate_ms,
+                            "latency_delta_ms": candidate_ms - served_ms,
+                            "last_error": stats.last_error,
+                        }
+                    )
+        return pd.DataFrame(rows)
+
+    def close(self) -> None:
+        """Stop the workers, dropping calls not yet scored."""
+        with self._lock:
+            starting, self._starting = self._starting, None
+        if starting is not None:
+            starting.join()
+        with self._idle:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_scorer = ShadowScorer(parse(SHADOW_MODELS))
+
+
+def configure(candidates: dict[str, list[str]], **options) -> None:
+    """Replace the candidates, e.g. from a benchmark; their totals start from zero."""
+    global _scorer
+    previous, _scorer = _scorer, ShadowScorer(candidates, **options)
+    previous.close()
+
+
+def record(model: str, input_df: pd.DataFrame, predictions, probabilities, seconds: float):
+    """Queue one predictor call for its model's shadow candidates, if it has any."""
+    if len(input_df):
+        _scorer.record(model, input_df, predictions, probabilities, seconds)
+
+
+def flush(timeout: float = None) -> bool:
+    """Wait until every call recorded so far has been shadow scored."""
+    return _scorer.flush(timeout)
+
+
+def report() -> pd.DataFrame:
+    """Agreement and latency of every shadow candidate so far; see `ShadowScorer.report`."""
+    return _scorer.report()
+
+
+def close() -> None:
+    _scorer.close()
+
+
+atexit.register(close)
+os.register_at_fork(after_in_child=lambda: _scorer._reset())
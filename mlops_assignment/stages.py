@@ -0,0 +1,165 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+import time
+
+from loguru import logger
+import pandas as pd
+
+from mlops_assignment.config import INTERIM_DATA_DIR
+
+# Fingerprints of the last successful run of every stage.
+MANIFEST_PATH = INTERIM_DATA_DIR / "pipeline_manifest.json"
+
+
+def fingerprint(path: Path, size: int | None = None) -> str:
+    """SHA-256 of the first `size` bytes of `path` (the whole file by default)."""
+    digest = hashlib.sha256()
+    remaining = path.stat().st_size if size is None else size
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def params_fingerprint(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text())
+    return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def _appended_rows(input_path: Path, state: dict) -> pd.DataFrame | None:
+    """
+    Return the rows appended to `input_path` since the recorded run, if that
+    is all that changed.
+
+    The file only counts as appended to when it grew, its first
+    `input_size` bytes still match the recorded fingerprint, and that prefix
+    ended on a line break.
+    """
+    size = state["input_size"]
+    if input_path.stat().st_size <= size or fingerprint(input_path, size) != state["input_hash"]:
+        return None
+
+    with open(input_path, "rb") as f:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return None
+        tail = f.read()
+
+    columns = pd.read_csv(input_path, nrows=0).columns
+    return pd.read_csv(io.BytesIO(tail), header=None, names=columns)
+
+
+def run_stage(
+    name: str,
+    input_path: Path,
+    output_path: Path,
+    transform,
+    params: dict | None = None,
+    row_wise: bool = False,
+    write_index: bool = False,
+    read_options: dict | None = None,
+    force: bool = False,
+) -> dict:
+    """
+    Run one pipeline stage from a CSV file unless its inputs are unchanged.
+
+    The stage is skipped when the output exists and both the input file's
+    content hash and the `params` fingerprint match the last run. Row-wise
+    stages, whose output rows depend only on their own input row, only
+    transform rows appended to the input since the last run and append them
+    to the output. Anything else rebuilds the output from the full input,
+    written as Parquet when `output_path` ends in `.parquet` and as CSV
+    otherwise.
+
+    Parameters
+    ----------
+    name : str
+        Key of the stage in the manifest.
+    transform : callable
+        Takes the input DataFrame (or just the appended rows, for row-wise
+        stages) and returns the output DataFrame.
+    params : dict, optional
+        JSON-serialisable parameters of `transform`; changing them forces a
+        rebuild.
+    write_index : bool
+        Write the DataFrame index as the first column, numbering appended
+        rows after the existing ones.
+    read_options : dict, optional
+        Extra keyword arguments for `pd.read_csv` when reading the input.
+
+    Returns
+    -------
+    dict
+        `{"stage", "status", "rows", "seconds"}` where status is `skipped`,
+        `incremental` or `rebuilt`.
+    """
+    start = time.perf_counter()
+    manifest = _load_manifest()
+    state = manifest.get(name)
+    params_hash = params_fingerprint(params or {})
+    input_hash = fingerprint(input_path)
+    reusable = (
+        not force
+        and state is not None
+        and output_path.exists()
+        and state["params_hash"] == params_hash
+    )
+
+    if reusable and state["input_hash"] == input_hash:
+        status, rows = "skipped", state["rows"]
+    else:
+        appended = _appended_rows(input_path, state) if reusable and row_wise else None
+        if appended is not None:
+            out = transform(appended)
+            if write_index:
+                out.index = pd.RangeIndex(state["rows"], state["rows"] + len(out))
+            out.to_csv(output_path, mode="a", header=False, index=write_index)
+            status, rows = "incremental", state["rows"] + len(out)
+        else:
+            out = transform(pd.read_csv(input_path, **(read_options or {})))
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if output_path.suffix == ".parquet":
+                out.to_parquet(output_path, index=write_index)
+            else:
+                out.to_csv(output_path, index=write_index)
+            status, rows = "rebuilt", len(out)
+
+        manifest[name] = {
+            "input_hash": input_hash,
+            "input_size": input_path.stat().st_size,
+            "params_hash": params_hash,
+            "rows": rows,
+        }
+        _save_manifest(manifest)
+
+    result = {
+        "stage": name,
+        "status": status,
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+    }
+    logger.info(f"{name}: {status} ({rows} rows) in {result['seconds']:.3f}s")
+    return result
+
+
+def log_report(results: list[dict]) -> None:
+    """Log a per-stage timing table for one pipeline run."""
+    width = max([len(r["stage"]) for r in results] + [len("stage")]) + 2
+    logger.info(f"{'stage':<{width}}{'status':<14}{'rows':>10}{'seconds':>10}")
+    for r in results:
+        logger.info(f"{r['stage']:<{width}}{r['status']:<14}{r['rows']:>10}{r['seconds']:>10.3f}")
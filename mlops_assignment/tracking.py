@@ -0,0 +1,425 @@
+from collections import defaultdict
+from pathlib import Path
+import queue
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+from loguru import logger
+from mlflow import MlflowClient
+from mlflow.entities import Metric, Param, RunTag, ViewType
+from pycaret.loggers.base_logger import BaseLogger
+import typer
+
+from mlops_assignment.artifact_store import local_artifact_dir
+from mlops_assignment.config import (
+    MLFLOW_ARTIFACTS_DIR,
+    MLFLOW_TRACKING_URI,
+    TRACKING_FLUSH_SECONDS,
+)
+
+app = typer.Typer()
+
+# `log_batch` accepts at most 1000 entities per call, and at most 100 params and 100 tags.
+MAX_BATCH_METRICS = 800
+MAX_BATCH_PARAMS = 100
+MAX_BATCH_TAGS = 100
+
+
+class AsyncTracker:
+    """
+    Buffer MLflow params, metrics and tags and write them from a background thread.
+
+    Calls return as soon as the values are queued. The writer thread
+    groups queued values per run and sends them with one `log_batch` call
+    per run at least every `flush_seconds`. Artifacts, models and run
+    terminations are queued too and handled in order, after the values
+    logged before them.
+
+    Only `create_run` talks to the tracking store directly, since callers
+    need the new run's ID.
+
+    Runs whose artifacts live on an `mlflow server` started from the project
+    root (`mlflow-artifacts:/` URIs, as in the notebook experiments) get
+    their artifacts written straight into `config.MLFLOW_ARTIFACTS_DIR`
+    when tracking goes to a local store, which MLflow itself refuses to do.
+    """
+
+    def __init__(
+        self,
+        tracking_uri: str = MLFLOW_TRACKING_URI,
+        flush_seconds: float = TRACKING_FLUSH_SECONDS,
+    ):
+        self.client = MlflowClient(tracking_uri)
+        self.flush_seconds = flush_seconds
+        self.batches = 0
+        self._experiment_ids = {}
+        self._local_store = urlparse(tracking_uri).scheme in ("", "file")
+        self._queue = queue.Queue()
+        self._staging = Path(tempfile.mkdtemp(prefix="mlflow-staging-"))
+        self._thread = threading.Thread(target=self._run, name="mlflow-tracker", daemon=True)
+        self._thread.start()
+
+    def create_run(self, experiment_name: str, run_name: str | None = None) -> str:
+        experiment_id = self._experiment_ids.get(experiment_name)
+        if experiment_id is None:
+            experiment = self.client.get_experiment_by_name(experiment_name)
+            if experiment is None:
+                experiment_id = self.client.create_experiment(experiment_name)
+            else:
+                experiment_id = experiment.experiment_id
+            self._experiment_ids[experiment_name] = experiment_id
+        return self.client.create_run(experiment_id, run_name=run_name).info.run_id
+
+    def log_params(self, run_id: str, params: dict) -> None:
+        self._queue.put(("params", run_id, {k: str(v) for k, v in params.items()}))
+
+    def log_metrics(self, run_id: str, metrics: dict, step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        values = [Metric(k, float(v), timestamp, step) for k, v in metrics.items()]
+        self._queue.put(("metrics", run_id, values))
+
+    def set_tags(self, run_id: str, tags: dict) -> None:
+        self._queue.put(("tags", run_id, {k: str(v) for k, v in tags.items()}))
+
+    def log_artifact(self, run_id: str, path: str, artifact_path: str | None = None) -> None:
+        """Queue the upload of a file, copying it first since callers often delete it."""
+        staged = Path(tempfile.mkdtemp(dir=self._staging)) / Path(path).name
+        shutil.copyfile(path, staged)
+
+        def upload():
+            try:
+                self._upload(run_id, staged, artifact_path)
+            finally:
+                shutil.rmtree(staged.parent, ignore_errors=True)
+
+        self._queue.put(("call", run_id, upload))
+
+    def log_model(self, run_id: str, model, artifact_path: str = "model", **kwargs) -> None:
+        """
+        Queue saving `model` in MLflow's sklearn format and uploading it to the run.
+
+        `kwargs` go to `mlflow.sklearn.save_model`. Pass `conda_env` or
+        `pip_requirements`; otherwise MLflow infers them by loading the model
+        in a subprocess, which takes seconds per model.
+        """
+        import mlflow.sklearn
+
+        def upload():
+            staged = Path(tempfile.mkdtemp(dir=self._staging)) / artifact_path
+            try:
+                mlflow.sklearn.save_model(model, str(staged), **kwargs)
+                self._upload(run_id, staged, artifact_path)
+            finally:
+                shutil.rmtree(staged.parent, ignore_errors=True)
+
+        self._queue.put(("call", run_id, upload))
+
+    def _upload(self, run_id: str, path: Path, artifact_path: str | None) -> None:
+        artifact_uri = self.client.get_run(run_id).info.artifact_uri
+        if not (self._local_store and artifact_uri.startswith("mlflow-artifacts:")):
+            log = self.client.log_artifacts if path.is_dir() else self.client.log_artifact
+            log(run_id, str(path), artifact_path)
+            return
+
+        target = local_artifact_dir(artifact_uri) / (artifact_path or "")
+        if path.is_dir():
+            shutil.copytree(path, target, dirs_exist_ok=True)
+        else:
+            target.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, target / path.name)
+
+    def end_run(self, run_id: str, status: str = "FINISHED") -> None:
+        self._queue.put(("call", run_id, lambda: self.client.set_terminated(run_id, status)))
+
+    def flush(self) -> None:
+        """Block until everything queued so far has been written."""
+        done = threading.Event()
+        self._queue.put(("call", None, done.set))
+        done.wait()
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        shutil.rmtree(self._staging, ignore_errors=True)
+
+    def _run(self) -> None:
+        pending = defaultdict(lambda: {"params": {}, "tags": {}, "metrics": []})
+        last_write = time.monotonic()
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, self.flush_seconds - (time.monotonic() - last_write))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ("flush", None, None)
+
+            if item is None:
+                self._write(pending)
+                return
+            kind, run_id, payload = item
+            try:
+                if kind in ("params", "tags"):
+                    pending[run_id][kind].update(payload)
+                elif kind == "metrics":
+                    pending[run_id][kind].extend(payload)
+                else:
+                    self._write(pending)
+                    last_write = time.monotonic()
+                    if payload is not None:
+                        payload()
+            except Exception as e:
+                # Tracking must never stop training, so failed writes are only reported.
+                logger.warning(f"MLflow tracking write failed: {e}")
+
+            if pending and time.monotonic() - last_write >= self.flush_seconds:
+                self._write(pending)
+                last_write = time.monotonic()
+
+    def _write(self, pending: dict) -> None:
+        for run_id, values in pending.items():
+            params = [Param(k, v) for k, v in values["params"].items()]
+            tags = [RunTag(k, v) for k, v in values["tags"].items()]
+            metrics = values["metrics"]
+            while params or tags or metrics:
+                try:
+                    self.client.log_batch(
+                        run_id,
+                        metrics=metrics[:MAX_BATCH_METRICS],
+                        params=params[:MAX_BATCH_PARAMS],
+                        tags=tags[:MAX_BATCH_TAGS],
+                    )
+                    self.batches += 1
+                except Exception as e:
+                    logger.warning(f"MLflow tracking write failed: {e}")
+                metrics = metrics[MAX_BATCH_METRICS:]
+                params = params[MAX_BATCH_PARAMS:]
+                tags = tags[MAX_BATCH_TAGS:]
+        pending.clear()
+
+
+class AsyncMlflowLogger(BaseLogger):
+    """
+    PyCaret experiment logger that records the runs of `MlflowLogger` through an `AsyncTracker`.
+
+    Pass it to `setup(log_experiment=[AsyncMlflowLogger()])`. Runs, params,
+    metrics, tags, artifacts and pipelines match PyCaret's MLflow logger,
+    but `compare_models` and `tune_model` no longer wait for each write.
+    Call `close()` at the end of training to end the setup run and wait
+    for the writes.
+    """
+
+    def __init__(self, tracker: AsyncTracker | None = None):
+        super().__init__()
+        self.tracker = tracker or AsyncTracker()
+        self.runs = []
+        self._setup_runs = {}
+
+    def init_experiment(self, exp_name_log, full_name=None, setup=True, **kwargs):
+        self.runs.append(self.tracker.create_run(exp_name_log, run_name=full_name))
+        return self.runs
+
+    def log_params(self, params, model_name=None):
+        from pycaret.utils.generic import mlflow_remove_bad_chars
+
+        self.tracker.log_params(
+            self.runs[-1], {mlflow_remove_bad_chars(k): v for k, v in params.items()}
+        )
+
+    def log_metrics(self, metrics, source=None):
+        self.tracker.log_metrics(self.runs[-1], metrics)
+
+    def set_tags(self, source, experiment_custom_tags, runtime, USI=None):
+        run_id = self.runs[-1]
+        tags = {
+            "Source": source,
+            "URI": secrets.token_hex(nbytes=4),
+            "USI": USI,
+            "Run Time": runtime,
+            "Run ID": run_id,
+        }
+        if isinstance(experiment_custom_tags, dict):
+            tags.update(experiment_custom_tags)
+        if source == "setup":
+            self._setup_runs[USI] = run_id
+        elif USI in self._setup_runs:
+            tags["mlflow.parentRunId"] = self._setup_runs[USI]
+        self.tracker.set_tags(run_id, tags)
+
+    def log_artifact(self, file, type="artifact"):
+        self.tracker.log_artifact(self.runs[-1], file)
+
+    def log_plot(self, plot, title=None):
+        self.log_artifact(plot)
+
+    def log_hpram_grid(self, html_file, title="hpram_grid"):
+        self.log_artifact(html_file)
+
+    def log_sklearn_pipeline(self, experiment, prep_pipe, model, path=None):
+        from mlflow.sklearn import get_default_conda_env
+        from pycaret import __version__
+
+        # The environment `MlflowLogger` records: MLflow's default with PyCaret as the pip package.
+        conda_env = get_default_conda_env()
+        conda_env["name"] = f"{experiment.exp_name_log}-env"
+        conda_env["dependencies"].pop(-3)
+        conda_env["dependencies"][-1]["pip"] = [f"pycaret=={__version__}"]
+        self.tracker.log_model(
+            self.runs[-1],
+            self._construct_pipeline_if_needed(model, prep_pipe),
+            conda_env=conda_env,
+        )
+
+    def finish_experiment(self):
+        if self.runs:
+            self.tracker.end_run(self.runs.pop())
+
+    def close(self):
+        while self.runs:
+            self.finish_experiment()
+        self.tracker.close()
+
+
+def _run_signature(run) -> tuple:
+    """Everything that makes a run's record meaningful, without its IDs and timings."""
+    # `TT` is the fit time PyCaret logs next to the scores.
+    metrics = {k: v for k, v in run.data.metrics.items() if k != "TT"}
+    return (
+        run.info.experiment_id,
+        run.info.run_name,
+        run.data.tags.get("Source"),
+        tuple(sorted(run.data.params.items())),
+        tuple(sorted(metrics.items())),
+    )
+
+
+def runs_to_prune(runs: list, registered: dict[str, list[str]] | None = None) -> dict[str, str]:
+    """
+    Pick the runs that add nothing to the tracking store.
+
+    Parameters
+    ----------
+    runs : list
+        Every run in the store.
+    registered : dict, optional
+        `{run_id: [model version, ...]}` of the runs registered model
+        versions were created from, as returned by `registered_runs`.
+
+    Returns
+    -------
+    dict
+        `{run_id: reason}` for failed or killed runs, runs with no params,
+        metrics or artifacts, and all but the newest of runs with identical
+        experiment, name, source, params and metrics. Runs that are the
+        parent of another run or the source of a registered model version
+        are kept, and a registered run is the one kept among duplicates.
+    """
+    registered = registered or {}
+    parents = {r.data.tags.get("mlflow.parentRunId") for r in runs}
+    prune = {}
+    for run in runs:
+        artifacts = local_artifact_dir(run.info.artifact_uri)
+        has_artifacts = artifacts is not None and artifacts.exists() and any(artifacts.iterdir())
+        if run.info.status in ("FAILED", "KILLED"):
+            prune[run.info.run_id] = run.info.status.lower()
+        elif not run.data.params and not run.data.metrics and not has_artifacts:
+            prune[run.info.run_id] = "empty"
+
+    newest = {}
+    # Registered runs first, then newest first.
+    order = sorted(
+        runs,
+        key=lambda r: (r.info.run_id in registered, r.info.start_time or 0),
+        reverse=True,
+    )
+    for run in order:
+        if run.info.run_id in prune or run.info.run_id in parents:
+            continue
+        signature = _run_signature(run)
+        if signature in newest:
+            prune[run.info.run_id] = f"duplicate of {newest[signature]}"
+        else:
+            newest[signature] = run.info.run_id
+    keep = parents | set(registered)
+    return {run_id: reason for run_id, reason in prune.items() if run_id not in keep}
+
+
+def registered_runs(client: MlflowClient) -> dict[str, list[str]]:
+    """`{run_id: ["<name> v<version>", ...]}` of the runs registered model versions come from."""
+    registered = defaultdict(list)
+    page_token = None
+    while True:
+        versions = client.search_model_versions(page_token=page_token)
+        for version in versions:
+            if version.run_id:
+                registered[version.run_id].append(f"{version.name} v{version.version}")
+        page_token = versions.token
+        if not page_token:
+            return dict(registered)
+
+
+def _disk_usage(path: Path) -> tuple[int, int]:
+    files = [p for p in path.rglob("*") if p.is_file()] if path.exists() else []
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+@app.command()
+def compact(
+    tracking_uri: str = MLFLOW_TRACKING_URI,
+    dry_run: bool = typer.Option(False, help="Only list the runs that would be removed."),
+):
+    """
+    Remove failed, empty and duplicate runs from the local tracking store.
+
+    Runs that registered model versions were created from are always kept
+    and listed as such. Pruned runs are deleted permanently, together with their artifacts
+    under `mlartifacts/` or the store's own artifact directory.
+    """
+    # `mlflow gc` hard-deletes runs through the store in the same way.
+    from mlflow.tracking._tracking_service.utils import _get_store
+
+    client = MlflowClient(tracking_uri)
+    store = _get_store(tracking_uri)
+    store_dir = Path(unquote(urlparse(tracking_uri).path))
+    before = [_disk_usage(store_dir), _disk_usage(MLFLOW_ARTIFACTS_DIR)]
+
+    experiments = client.search_experiments(view_type=ViewType.ALL)
+    runs = client.search_runs(
+        [e.experiment_id for e in experiments], run_view_type=ViewType.ALL, max_results=50_000
+    )
+    registered = registered_runs(client)
+    prune = runs_to_prune(runs, registered)
+    by_id = {r.info.run_id: r for r in runs}
+    for run_id, versions in registered.items():
+        if run_id in by_id:
+            logger.info(f"Keeping {run_id}: registered as {', '.join(versions)}")
+    for run_id, reason in prune.items():
+        logger.info(f"{'Would remove' if dry_run else 'Removing'} {run_id}: {reason}")
+        if dry_run:
+            continue
+        artifacts = local_artifact_dir(by_id[run_id].info.artifact_uri)
+        if by_id[run_id].info.lifecycle_stage != "deleted":
+            client.delete_run(run_id)
+        store._hard_delete_run(run_id)
+        if artifacts is not None:
+            # Artifacts live in `<run_id>/artifacts`; remove the run's whole directory.
+            shutil.rmtree(artifacts.parent if artifacts.name == "artifacts" else artifacts, True)
+
+    after = [_disk_usage(store_dir), _disk_usage(MLFLOW_ARTIFACTS_DIR)]
+    for name, (files_before, bytes_before), (files_after, bytes_after) in zip(
+        ["tracking store", "artifacts"], before, after
+    ):
+        logger.info(
+            f"{name}: {files_before:,} -> {files_after:,} files, "
+            f"{bytes_before / 2**20:,.1f} -> {bytes_after / 2**20:,.1f} MiB"
+        )
+    logger.success(f"Compaction complete: {len(prune)} of {len(runs)} runs pruned.")
+
+
+if __name__ == "__main__":
+    app()
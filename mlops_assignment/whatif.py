@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from mlops_assignment import metrics
+from mlops_assignment.predict_lung_cancer import _decode_labels
+from mlops_assignment.registry import get_model
+from mlops_assignment.schema import SCHEMAS
+
+# Values tried across a continuous feature's range; whole-number features try every value.
+DEFAULT_POINTS = 21
+
+
+def domain(rule: dict, points: int = DEFAULT_POINTS) -> np.ndarray:
+    """Values a what-if sweep tries for a column with the schema `rule`."""
+    if "values" in rule:
+        return np.asarray(rule["values"], dtype=float)
+    low, high = rule["range"]
+    if rule["dtype"] == "int":
+        return np.arange(low, high + 1, dtype=float)
+    return np.linspace(low, high, points)
+
+
+def class_probabilities(model: str, input_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Probability of every class for each row of `input_df`, in one pipeline pass.
+
+    Unlike the predictors, which return the predicted class's probability
+    only, this keeps a column per class, named by its decoded label.
+    """
+    pipeline = get_model(model)
+    X = input_df[list(pipeline.feature_names_in_[:-1])]
+    Xt, _ = pipeline._memory_full_transform(pipeline, X, None, with_final=False)
+    with metrics.timer(model, "whatif"):
+        proba = pipeline.steps[-1][1].predict_proba(Xt)
+    labels = _decode_labels(pipeline, pipeline.classes_)
+    return pd.DataFrame(proba, index=input_df.index, columns=list(labels))
+
+
+def sweep(
+    patient: pd.DataFrame,
+    model: str,
+    features: list[str] = None,
+    points: int = DEFAULT_POINTS,
+) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Score every single-feature change to one patient in one batched call.
+
+    For each feature, the patient's row is repeated once per value in the
+    feature's schema domain (every allowed code or whole number, or
+    `points` evenly spaced values of a continuous range) with only that
+    feature changed. All rows, plus the unchanged patient, go through the
+    pipeline together.
+
+    Parameters
+    ----------
+    patient : pd.DataFrame
+        One row with the model's `FEATURE_COLUMNS`. Only the first row is used.
+    model : str
+        `"alzheimer"` or `"lung_cancer"`.
+    features : list[str], optional
+        Features to sweep. Defaults to every column of the model's schema.
+    points : int
+        Values tried across a continuous feature's range.
+
+    Returns
+    -------
+    tuple[pd.Series, pd.DataFrame]
+        `(baseline, curves)`: the patient's class probabilities, and one row
+        per tried value with `Feature`, `Value` and a probability column per
+        class, grouped by feature in `features` order.
+    """
+    schema = SCHEMAS[model]
+    features = list(schema) if features is None else features
+    domains = [domain(schema[name], points) for name in features]
+    sizes = [len(values) for values in domains]
+
+    row = patient.iloc[:1][list(schema)]
+    grid = pd.DataFrame(
+        np.repeat(row.to_numpy(dtype=float), 1 + sum(sizes), axis=0), columns=row.columns
+    )
+    # Row 0 is the unchanged patient; each feature's block changes that column alone.
+    start = 1
+    for name, values in zip(features, domains):
+        grid.iloc[start : start + len(values), grid.columns.get_loc(name)] = values
+        start += len(values)
+
+    proba = class_probabilities(model, grid)
+    curves = proba.iloc[1:].reset_index(drop=True)
+    curves.insert(0, "Feature", np.repeat(features, sizes))
+    curves.insert(1, "Value", np.concatenate(domains) if domains else np.empty(0))
+    return proba.iloc[0], curves
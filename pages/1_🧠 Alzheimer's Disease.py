@@ -1,206 +1,341 @@
 import streamlit as st
 import pandas as pd
+from mlops_assignment import metrics, profiling
+from mlops_assignment.batch_results import score_upload
 from mlops_assignment.predict_alzheimer import predict
+from mlops_assignment.registry import get_model, identity
+from mlops_assignment.whatif import sweep
 
-st.title("🧠 Alzheimer's Disease Prediction")
+# Profile this run if it is sampled, or always when the page is opened with `?profile=1`
+profiling.profile_page("alzheimer_page", force=st.query_params.get("profile") == "1")
 
-# Mode selector
-mode = st.radio("Select Prediction Mode:", ["Single Patient", "Batch Prediction"], horizontal=True)
+# Number of rejected rows shown on the page; all of them are downloadable
+PREVIEW_ROWS = 1000
 
-if mode == "Single Patient":
-    st.header("Patient Information")
-    
-    # Demographic Details
-    st.subheader("📋 Demographic Details")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        age = st.slider("Age (years)", 60, 90, 75)
-        gender = st.selectbox("Gender", ["Male", "Female"])
+
+@st.cache_resource(show_spinner="Loading model...")
+def load_resources():
+    """Load the model and build the input encodings once per server, shared by every session."""
+    get_model("alzheimer")
+    return {
+        "binary": {"No": 0, "Yes": 1},
+        "gender": {"Male": 0, "Female": 1},
+        "ethnicity": {"Caucasian": 0, "African American": 1, "Asian": 2, "Other": 3},
+        "education": {"None": 0, "High School": 1, "Bachelor's": 2, "Higher": 3},
+        "labels": {
+            0: "Unlikely to have Alzheimer's disease",
+            1: "Likely to have Alzheimer's disease",
+        },
+    }
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def what_if(input_df, model_version):
+    """Every single-feature change to this patient, scored in one batch."""
+    baseline, curves = sweep(input_df, "alzheimer")
+    curves = curves.rename(columns={1: "Risk"})
+    effect = curves.groupby("Feature", sort=False)["Risk"].agg(lambda s: s.max() - s.min())
+    return baseline, curves, effect.sort_values(ascending=False, kind="stable")
+
+
+def show_prediction(input_df):
+    labels = load_resources()["labels"]
+    with st.spinner("Analyzing patient data..."):
+        pred, prob = predict(input_df)
         
-    with col2:
-        ethnicity = st.selectbox("Ethnicity", ["Caucasian", "African American", "Asian", "Other"])
-        education = st.selectbox("Education Level", ["None", "High School", "Bachelor's", "Higher"])
-    
-    # Lifestyle Factors
-    st.subheader("🏃 Lifestyle Factors")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        bmi = st.slider("BMI", 15.0, 40.0, 25.0, 0.1, 
-                       help="Underweight: <18.5, Normal: 18.5-24.9, Overweight: 25-29.9, Obese: ≥30")
-        smoking = st.selectbox("Smoking Status", ["No", "Yes"])
+        st.divider()
+        st.subheader("🔍 Prediction")
+        if pred.iloc[0] == 0:
+            st.success(f"✅ {labels[pred.iloc[0]]}")
+            st.metric("Confidence", f"{prob.iloc[0]:.2%}")
+        else:
+            st.error(f"⚠️ {labels[pred.iloc[0]]}")
+            st.metric("Confidence", f"{prob.iloc[0]:.2%}")
         
-    with col2:
-        alcohol = st.slider("Alcohol Consumption (units/week)", 0, 20, 5,
-                           help="Low: 0-7, Moderate: 8-14, High: >14")
-        physical_activity = st.slider("Physical Activity (hours/week)", 0, 10, 5,
-                                     help="Low: 0-2, Moderate: 3-6, High: >6")
+        baseline, curves, effect = what_if(input_df, identity("alzheimer"))
         
-    with col3:
-        diet_quality = st.slider("Diet Quality (Poor to Good)", 0, 10, 5,
-                                help="Poor: 0-3, Fair: 4-6, Good: 7-10")
-        sleep_quality = st.slider("Sleep Quality (Poor to Good)", 4, 10, 7,
-                                 help="Poor: 4-5, Fair: 6-7, Good: 8-10")
-    
-    # Medical History
-    st.subheader("🏥 Medical History")
-    col1, col2, col3 = st.columns(3)
+        with st.expander("📈 What-if Analysis"):
+            st.caption(
+                "Predicted risk of Alzheimer's as one feature changes and the others "
+                f"stay fixed. Current risk: {baseline[1]:.2%}"
+            )
+            chart_cols = st.columns(2)
+            for i, feature in enumerate(effect[effect > 0].index):
+                with chart_cols[i % 2]:
+                    st.markdown(f"**{feature}**")
+                    st.line_chart(
+                        curves[curves["Feature"] == feature], x="Value", y="Risk", height=200
+                    )
+            if (effect == 0).any():
+                st.caption("No effect on risk: " + ", ".join(effect[effect == 0].index))
+
+
+# Inputs sit in a form, so moving a slider does not rerun the page, and each panel is a
+# fragment, so submitting it reruns that panel alone.
+@st.fragment
+def single_patient():
+    st.header("Patient Information")
     
-    with col1:
-        family_history = st.selectbox("Family History of Alzheimer's", ["No", "Yes"])
-        cardiovascular = st.selectbox("Cardiovascular Disease", ["No", "Yes"])
-        
-    with col2:
-        diabetes = st.selectbox("Diabetes", ["No", "Yes"])
-        depression = st.selectbox("Depression", ["No", "Yes"])
+    with st.form("alzheimer_form_single"):
+        # Demographic Details
+        st.subheader("📋 Demographic Details")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            age = st.slider("Age (years)", 60, 90, 75)
+            gender = st.selectbox("Gender", ["Male", "Female"])
+
+        with col2:
+            ethnicity = st.selectbox("Ethnicity", ["Caucasian", "African American", "Asian", "Other"])
+            education = st.selectbox("Education Level", ["None", "High School", "Bachelor's", "Higher"])
+
+        # Lifestyle Factors
+        st.subheader("🏃 Lifestyle Factors")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            bmi = st.slider("BMI", 15.0, 40.0, 25.0, 0.1, 
+                           help="Underweight: <18.5, Normal: 18.5-24.9, Overweight: 25-29.9, Obese: ≥30")
+            smoking = st.selectbox("Smoking Status", ["No", "Yes"])
+
+        with col2:
+            alcohol = st.slider("Alcohol Consumption (units/week)", 0, 20, 5,
+                               help="Low: 0-7, Moderate: 8-14, High: >14")
+            physical_activity = st.slider("Physical Activity (hours/week)", 0, 10, 5,
+                                         help="Low: 0-2, Moderate: 3-6, High: >6")
+
+        with col3:
+            diet_quality = st.slider("Diet Quality (Poor to Good)", 0, 10, 5,
+                                    help="Poor: 0-3, Fair: 4-6, Good: 7-10")
+            sleep_quality = st.slider("Sleep Quality (Poor to Good)", 4, 10, 7,
+                                     help="Poor: 4-5, Fair: 6-7, Good: 8-10")
+
+        # Medical History
+        st.subheader("🏥 Medical History")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            family_history = st.selectbox("Family History of Alzheimer's", ["No", "Yes"])
+            cardiovascular = st.selectbox("Cardiovascular Disease", ["No", "Yes"])
+
+        with col2:
+            diabetes = st.selectbox("Diabetes", ["No", "Yes"])
+            depression = st.selectbox("Depression", ["No", "Yes"])
+
+        with col3:
+            head_injury = st.selectbox("Head Injury History", ["No", "Yes"])
+            hypertension = st.selectbox("Hypertension", ["No", "Yes"])
+
+        # Clinical Measurements
+        st.subheader("🩺 Clinical Measurements")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            systolic_bp = st.slider("Systolic BP (mmHg)", 90, 180, 120,
+                                   help="Normal: <120, Elevated: 120-129, High: ≥130")
+            diastolic_bp = st.slider("Diastolic BP (mmHg)", 60, 120, 80,
+                                    help="Normal: <80, Elevated: 80-89, High: ≥90")
+            cholesterol_total = st.slider("Total Cholesterol (mg/dL)", 150, 300, 200,
+                                         help="Desirable: <200, Borderline: 200-239, High: ≥240")
+
+        with col2:
+            cholesterol_ldl = st.slider("LDL Cholesterol (mg/dL)", 50, 200, 100,
+                                       help="Optimal: <100, Near optimal: 100-129, High: ≥130")
+            cholesterol_hdl = st.slider("HDL Cholesterol (mg/dL)", 20, 100, 50,
+                                       help="Low: <40, Good: 40-59, High: ≥60")
+            cholesterol_triglycerides = st.slider("Triglycerides (mg/dL)", 50, 400, 150,
+                                                 help="Normal: <150, Borderline: 150-199, High: ≥200")
+
+        # Cognitive and Functional Assessments
+        st.subheader("🧠 Cognitive & Functional Assessments")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            mmse = st.slider("MMSE Score", 0, 30, 24,
+                            help="Mini-Mental State Examination. Normal: 24-30, Mild impairment: 18-23, Moderate: 10-17, Severe: <10")
+            functional = st.slider("Functional Assessment", 0, 10, 7,
+                                 help="Higher scores indicate better function. 0=Severely impaired, 10=Independent")
+            adl = st.slider("ADL Score", 0, 10, 7,
+                           help="Activities of Daily Living. Higher scores indicate better independence. 0=Dependent, 10=Independent")
+
+        with col2:
+            memory = st.selectbox("Memory Complaints", ["No", "Yes"])
+            behavior = st.selectbox("Behavioral Problems", ["No", "Yes"])
+
+        # Symptoms
+        st.subheader("⚠️ Symptoms")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            confusion = st.selectbox("Confusion", ["No", "Yes"])
+            disorientation = st.selectbox("Disorientation", ["No", "Yes"])
+            personality_changes = st.selectbox("Personality Changes", ["No", "Yes"])
+
+        with col2:
+            difficulty_tasks = st.selectbox("Difficulty Completing Tasks", ["No", "Yes"])
+            forgetfulness = st.selectbox("Forgetfulness", ["No", "Yes"])
         
-    with col3:
-        head_injury = st.selectbox("Head Injury History", ["No", "Yes"])
-        hypertension = st.selectbox("Hypertension", ["No", "Yes"])
+        submitted = st.form_submit_button("Predict", type="primary")
     
-    # Clinical Measurements
-    st.subheader("🩺 Clinical Measurements")
-    col1, col2 = st.columns(2)
+    if submitted:
+        codes = load_resources()
+        yes_no = codes["binary"]
+        with metrics.timer("alzheimer", "page_frame"):
+            st.session_state["alzheimer_patient"] = pd.DataFrame([{
+                "Age": age,
+                "Gender": codes["gender"][gender],
+                "Ethnicity": codes["ethnicity"][ethnicity],
+                "EducationLevel": codes["education"][education],
+                "BMI": bmi,
+                "Smoking": yes_no[smoking],
+                "AlcoholConsumption": alcohol,
+                "PhysicalActivity": physical_activity,
+                "DietQuality": diet_quality,
+                "SleepQuality": sleep_quality,
+                "FamilyHistoryAlzheimers": yes_no[family_history],
+                "CardiovascularDisease": yes_no[cardiovascular],
+                "Diabetes": yes_no[diabetes],
+                "Depression": yes_no[depression],
+                "HeadInjury": yes_no[head_injury],
+                "Hypertension": yes_no[hypertension],
+                "SystolicBP": systolic_bp,
+                "DiastolicBP": diastolic_bp,
+                "CholesterolTotal": cholesterol_total,
+                "CholesterolLDL": cholesterol_ldl,
+                "CholesterolHDL": cholesterol_hdl,
+                "CholesterolTriglycerides": cholesterol_triglycerides,
+                "MMSE": mmse,
+                "FunctionalAssessment": functional,
+                "MemoryComplaints": yes_no[memory],
+                "BehavioralProblems": yes_no[behavior],
+                "ADL": adl,
+                "Confusion": yes_no[confusion],
+                "Disorientation": yes_no[disorientation],
+                "PersonalityChanges": yes_no[personality_changes],
+                "DifficultyCompletingTasks": yes_no[difficulty_tasks],
+                "Forgetfulness": yes_no[forgetfulness]
+            }])
     
-    with col1:
-        systolic_bp = st.slider("Systolic BP (mmHg)", 90, 180, 120,
-                               help="Normal: <120, Elevated: 120-129, High: ≥130")
-        diastolic_bp = st.slider("Diastolic BP (mmHg)", 60, 120, 80,
-                                help="Normal: <80, Elevated: 80-89, High: ≥90")
-        cholesterol_total = st.slider("Total Cholesterol (mg/dL)", 150, 300, 200,
-                                     help="Desirable: <200, Borderline: 200-239, High: ≥240")
-        
-    with col2:
-        cholesterol_ldl = st.slider("LDL Cholesterol (mg/dL)", 50, 200, 100,
-                                   help="Optimal: <100, Near optimal: 100-129, High: ≥130")
-        cholesterol_hdl = st.slider("HDL Cholesterol (mg/dL)", 20, 100, 50,
-                                   help="Low: <40, Good: 40-59, High: ≥60")
-        cholesterol_triglycerides = st.slider("Triglycerides (mg/dL)", 50, 400, 150,
-                                             help="Normal: <150, Borderline: 150-199, High: ≥200")
+    # The last submitted patient stays on screen until the form is submitted again
+    if "alzheimer_patient" in st.session_state:
+        show_prediction(st.session_state["alzheimer_patient"])
+
+
+def show_results(results):
+    labels = load_resources()["labels"]
+    summary = results.label_summary()
+    positives = summary["Count"].get(1, 0)
     
-    # Cognitive and Functional Assessments
-    st.subheader("🧠 Cognitive & Functional Assessments")
-    col1, col2 = st.columns(2)
+    st.success(f"✅ Predicted {results.rows} patient records")
+    st.subheader('Results')
     
+    # Summary statistics, computed while scoring
+    col1, col2, col3 = st.columns(3)
     with col1:
-        mmse = st.slider("MMSE Score", 0, 30, 24,
-                        help="Mini-Mental State Examination. Normal: 24-30, Mild impairment: 18-23, Moderate: 10-17, Severe: <10")
-        functional = st.slider("Functional Assessment", 0, 10, 7,
-                             help="Higher scores indicate better function. 0=Severely impaired, 10=Independent")
-        adl = st.slider("ADL Score", 0, 10, 7,
-                       help="Activities of Daily Living. Higher scores indicate better independence. 0=Dependent, 10=Independent")
-        
+        st.metric("Total Patients", results.rows)
     with col2:
-        memory = st.selectbox("Memory Complaints", ["No", "Yes"])
-        behavior = st.selectbox("Behavioral Problems", ["No", "Yes"])
-    
-    # Symptoms
-    st.subheader("⚠️ Symptoms")
-    col1, col2 = st.columns(2)
+        st.metric("Positive Cases", positives)
+    with col3:
+        st.metric("Negative Cases", results.rows - positives)
     
-    with col1:
-        confusion = st.selectbox("Confusion", ["No", "Yes"])
-        disorientation = st.selectbox("Disorientation", ["No", "Yes"])
-        personality_changes = st.selectbox("Personality Changes", ["No", "Yes"])
+    if results.rows:
+        st.dataframe(
+            summary.rename(index=labels),
+            column_config={
+                "Share": st.column_config.NumberColumn(format="percent"),
+                "Mean Confidence": st.column_config.NumberColumn(format="percent"),
+            },
+        )
+        st.markdown("**Records by confidence (%)**")
+        st.bar_chart(results.confidence_histogram().rename(columns=labels))
         
-    with col2:
-        difficulty_tasks = st.selectbox("Difficulty Completing Tasks", ["No", "Yes"])
-        forgetfulness = st.selectbox("Forgetfulness", ["No", "Yes"])
-    
-    # Convert selections to numeric values
-    def binary_to_int(value):
-        return 1 if value == "Yes" else 0
-    
-    ethnicity_map = {"Caucasian": 0, "African American": 1, "Asian": 2, "Other": 3}
-    education_map = {"None": 0, "High School": 1, "Bachelor's": 2, "Higher": 3}
-    
-    input_df = pd.DataFrame([{
-        "Age": age,
-        "Gender": 1 if gender == "Female" else 0,
-        "Ethnicity": ethnicity_map[ethnicity],
-        "EducationLevel": education_map[education],
-        "BMI": bmi,
-        "Smoking": binary_to_int(smoking),
-        "AlcoholConsumption": alcohol,
-        "PhysicalActivity": physical_activity,
-        "DietQuality": diet_quality,
-        "SleepQuality": sleep_quality,
-        "FamilyHistoryAlzheimers": binary_to_int(family_history),
-        "CardiovascularDisease": binary_to_int(cardiovascular),
-        "Diabetes": binary_to_int(diabetes),
-        "Depression": binary_to_int(depression),
-        "HeadInjury": binary_to_int(head_injury),
-        "Hypertension": binary_to_int(hypertension),
-        "SystolicBP": systolic_bp,
-        "DiastolicBP": diastolic_bp,
-        "CholesterolTotal": cholesterol_total,
-        "CholesterolLDL": cholesterol_ldl,
-        "CholesterolHDL": cholesterol_hdl,
-        "CholesterolTriglycerides": cholesterol_triglycerides,
-        "MMSE": mmse,
-        "FunctionalAssessment": functional,
-        "MemoryComplaints": binary_to_int(memory),
-        "BehavioralProblems": binary_to_int(behavior),
-        "ADL": adl,
-        "Confusion": binary_to_int(confusion),
-        "Disorientation": binary_to_int(disorientation),
-        "PersonalityChanges": binary_to_int(personality_changes),
-        "DifficultyCompletingTasks": binary_to_int(difficulty_tasks),
-        "Forgetfulness": binary_to_int(forgetfulness)
-    }])
+        # Only the page on screen is read from disk and sent to the browser
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page", [100, 500, 1000], key="alzheimer_page_size")
+        with col2:
+            page = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=results.page_count(page_size),
+                key=f"alzheimer_results_page_{results.key}_{page_size}",
+            )
+        rows = results.page(page - 1, page_size)
+        st.dataframe(rows, use_container_width=True)
+        st.caption(f"Records {rows.index[0] + 1}-{rows.index[-1] + 1} of {results.rows}.")
+        
+        # Downloads were written once while scoring and are read only when clicked
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="Download Results (CSV)",
+                data=results.path("csv").read_bytes,
+                file_name="alzheimers_batch_predictions.csv.gz",
+                mime="application/gzip",
+                type="primary",
+                on_click="ignore",
+            )
+        with col2:
+            st.download_button(
+                label="Download Results (Parquet)",
+                data=results.path("parquet").read_bytes,
+                file_name="alzheimers_batch_predictions.parquet",
+                mime="application/vnd.apache.parquet",
+                on_click="ignore",
+            )
     
-    if st.button("Predict", type="primary"):
-        with st.spinner("Analyzing patient data..."):
-            pred, prob = predict(input_df)
-            label_map = {
-                0: "Unlikely to have Alzheimer's disease",
-                1: "Likely to have Alzheimer's disease"
-            }
-            
-            st.divider()
-            st.subheader("🔍 Prediction")
-            if pred.iloc[0] == 0:
-                st.success(f"✅ {label_map[pred.iloc[0]]}")
-                st.metric("Confidence", f"{prob.iloc[0]:.2%}")
-            else:
-                st.error(f"⚠️ {label_map[pred.iloc[0]]}")
-                st.metric("Confidence", f"{prob.iloc[0]:.2%}")
+    # Rows failing the input schema are not scored
+    if results.rejected:
+        st.warning(f"⚠️ {results.rejected} records failed validation and were not scored.")
+        rejected_preview = pd.read_csv(results.path("rejected"), nrows=PREVIEW_ROWS)
+        st.dataframe(rejected_preview[["Row", "Errors"]], use_container_width=True)
+        st.download_button(
+            label="Download Rejected Records",
+            data=results.path("rejected").read_bytes,
+            file_name="alzheimers_rejected_records.csv.gz",
+            mime="application/gzip",
+            on_click="ignore",
+        )
 
-else:
+
+@st.fragment
+def batch_prediction():
     st.header("📂 Upload Patient Records")
     
     uploaded_file = st.file_uploader("Upload Records of Patients in CSV format", type=["csv"])
     
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
-        st.success(f"✅ Loaded {len(df)} patient records")
-        st.dataframe(df.head(), use_container_width=True)
+        preview = pd.read_csv(uploaded_file, nrows=5)
+        uploaded_file.seek(0)
+        st.dataframe(preview, use_container_width=True)
+        explain = st.checkbox(
+            "Explain predictions", help="Add each feature's contribution to every prediction."
+        )
+        run_key = (uploaded_file.file_id, explain)
         
         if st.button("Run Batch Prediction", type="primary"):
             with st.spinner("Processing batch predictions..."):
-                preds, probs = predict(df)
-                df["PredictionLabel"] = preds
-                df["Confidence"] = probs
-                
-                st.subheader('Results')
-                
-                # Summary statistics
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Patients", len(df))
-                with col2:
-                    st.metric("Positive Cases", int(preds.sum()))
-                with col3:
-                    st.metric("Negative Cases", int(len(preds) - preds.sum()))
-                
-                st.dataframe(df, use_container_width=True)
-                
-                csv_buffer = df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Download Results",
-                    data=csv_buffer,
-                    file_name="alzheimers_batch_predictions.csv",
-                    mime="text/csv",
-                    type="primary"
-                )
\ No newline at end of file
+                # Scored chunk by chunk straight to disk, once per upload
+                try:
+                    results = score_upload(uploaded_file, "alzheimer", explain=explain)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
+                st.session_state["alzheimer_batch"] = (run_key, results)
+        
+        # The results stay on screen, a page at a time, until the upload or options change
+        run = st.session_state.get("alzheimer_batch")
+        if run is not None and run[0] == run_key and run[1].exists():
+            show_results(run[1])
+
+
+st.title("🧠 Alzheimer's Disease Prediction")
+load_resources()
+
+# Mode selector
+mode = st.radio("Select Prediction Mode:", ["Single Patient", "Batch Prediction"], horizontal=True)
+
+if mode == "Single Patient":
+    single_patient()
+else:
+    batch_prediction()
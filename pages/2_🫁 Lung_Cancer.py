@@ -1,42 +1,19 @@
 import pandas as pd
 import streamlit as st
 
-from mlops_assignment.predict_lung_cancer import predict_lung_cancer
+from mlops_assignment import metrics, profiling
+from mlops_assignment.batch_results import score_upload
+from mlops_assignment.predict_lung_cancer import FEATURE_COLUMNS, predict_lung_cancer
+from mlops_assignment.registry import get_model, identity
+from mlops_assignment.whatif import sweep
 
+# Profile this run if it is sampled, or always when the page is opened with `?profile=1`
+profiling.profile_page("lung_cancer_page", force=st.query_params.get("profile") == "1")
 
-st.title("🫁 Lung Cancer Risk Prediction")
-
-# Mode selector similar to Alzheimer's page
-mode = st.radio("Select Prediction Mode:", ["Single Patient", "Batch Prediction"], horizontal=True)
+# Number of rejected rows shown on the page; all of them are downloadable
+PREVIEW_ROWS = 1000
 
 
-# Feature names inferred from the original cleaned dataset `Lung_Patient_Cleaned.csv`
-FEATURE_COLUMNS = [
-    "Age",
-    "Gender",
-    "Air_Pollution",
-    "Alcohol_use",
-    "Dust_Allergy",
-    "Occupational_Hazards",
-    "Genetic_Risk",
-    "Chronic_Lung_Disease",
-    "Balanced_Diet",
-    "Obesity",
-    "Smoking",
-    "Passive_Smoker",
-    "Chest_Pain",
-    "Coughing_of_Blood",
-    "Fatigue",
-    "Weight_Loss",
-    "Shortness_of_Breath",
-    "Wheezing",
-    "Swallowing_Difficulty",
-    "Clubbing_of_Finger_Nails",
-    "Frequent_Cold",
-    "Dry_Cough",
-    "Snoring",
-]
-
 EXPOSURE_SCALE = {
     1: "None",
     2: "Very Low",
@@ -112,7 +89,72 @@ SYMPTOM_COLUMNS = {
 }
 
 
-if mode == "Single Patient":
+@st.cache_resource(show_spinner="Loading model...")
+def load_model():
+    """Load the model once per server, before the first prediction of any session."""
+    return get_model("lung_cancer")
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def what_if(input_df, model_version):
+    """Every single-feature change to this patient, scored in one batch."""
+    baseline, curves = sweep(input_df, "lung_cancer")
+    levels = list(baseline.index)
+    effect = (
+        curves.groupby("Feature", sort=False)[levels]
+        .agg(lambda s: s.max() - s.min())
+        .max(axis=1)
+        .sort_values(ascending=False, kind="stable")
+    )
+    return levels, curves, effect
+
+
+def show_prediction(input_df):
+    try:
+        result = predict_lung_cancer(input_df)
+
+        prediction = result.get("prediction", None)
+        probability = result.get("probability", None)
+
+        if prediction is None:
+            st.error("Prediction could not be computed. Please double-check your inputs.")
+        else:
+            st.success(f"Predicted risk level: {prediction}")
+
+            if probability is not None:
+                st.write(f"Model confidence: {probability:.2%}")
+
+            levels, curves, effect = what_if(input_df, identity("lung_cancer"))
+
+            with st.expander("What-if analysis"):
+                st.caption(
+                    "Probability of each risk level as one feature moves across its "
+                    "scale and the others stay fixed."
+                )
+                chart_cols = st.columns(2)
+                for i, feature in enumerate(effect[effect > 0].index):
+                    with chart_cols[i % 2]:
+                        st.markdown(f"**{feature}**")
+                        st.line_chart(
+                            curves[curves["Feature"] == feature],
+                            x="Value",
+                            y=levels,
+                            height=200,
+                        )
+                if (effect == 0).any():
+                    st.caption("No effect: " + ", ".join(effect[effect == 0].index))
+
+    except Exception as e:
+        st.error(
+            "An error occurred while running the prediction. "
+            "Please check that all inputs are valid."
+        )
+        st.exception(e)
+
+
+# Each panel is a fragment, so submitting it reruns that panel alone.
+@st.fragment
+def single_patient():
     st.header("Patient Features")
 
     with st.form("lung_cancer_form_single"):
@@ -140,75 +182,101 @@ if mode == "Single Patient":
         submitted = st.form_submit_button("Predict")
 
     if submitted:
-        try:
+        with metrics.timer("lung_cancer", "page_frame"):
             features_dict = {col: inputs[col] for col in FEATURE_COLUMNS}
-            input_df = pd.DataFrame([features_dict])
-            result = predict_lung_cancer(input_df)
-
-            prediction = result.get("prediction", None)
-            probability = result.get("probability", None)
-
-            if prediction is None:
-                st.error("Prediction could not be computed. Please double-check your inputs.")
-            else:
-                st.success(f"Predicted risk level: {prediction}")
-
-                if probability is not None:
-                    st.write(f"Model confidence: {probability:.2%}")
+            st.session_state["lung_cancer_patient"] = pd.DataFrame([features_dict])
+
+    # The last submitted patient stays on screen until the form is submitted again
+    if "lung_cancer_patient" in st.session_state:
+        show_prediction(st.session_state["lung_cancer_patient"])
+
+
+def show_results(results):
+    st.subheader("Results")
+    summary = results.label_summary()
+    st.write(", ".join(f"{label}: {count}" for label, count in summary["Count"].items()))
+
+    if results.rows:
+        # Summary statistics, computed while scoring
+        st.dataframe(
+            summary,
+            column_config={
+                "Share": st.column_config.NumberColumn(format="percent"),
+                "Mean Confidence": st.column_config.NumberColumn(format="percent"),
+            },
+        )
+        st.markdown("**Records by confidence (%)**")
+        st.bar_chart(results.confidence_histogram())
+
+        # Only the page on screen is read from disk and sent to the browser
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rows per page", [100, 500, 1000], key="lung_page_size")
+        with col2:
+            page = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=results.page_count(page_size),
+                key=f"lung_results_page_{results.key}_{page_size}",
+            )
+        rows = results.page(page - 1, page_size)
+        st.dataframe(rows)
+        st.caption(f"Records {rows.index[0] + 1}-{rows.index[-1] + 1} of {results.rows}.")
 
-        except Exception as e:
-            st.error(
-                "An error occurred while running the prediction. "
-                "Please check that all inputs are valid."
+        # Downloads were written once while scoring and are read only when clicked
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="Download Results (CSV)",
+                data=results.path("csv").read_bytes,
+                file_name="lung_cancer_batch_predictions.csv.gz",
+                mime="application/gzip",
+                on_click="ignore",
             )
-            st.exception(e)
-else:
+        with col2:
+            st.download_button(
+                label="Download Results (Parquet)",
+                data=results.path("parquet").read_bytes,
+                file_name="lung_cancer_batch_predictions.parquet",
+                mime="application/vnd.apache.parquet",
+                on_click="ignore",
+            )
+
+    # Rows failing the input schema are not scored
+    if results.rejected:
+        st.warning(f"{results.rejected} records failed validation and were not scored.")
+        rejected_preview = pd.read_csv(results.path("rejected"), nrows=PREVIEW_ROWS)
+        st.dataframe(rejected_preview[["Row", "Errors"]])
+        st.download_button(
+            label="Download Rejected Records",
+            data=results.path("rejected").read_bytes,
+            file_name="lung_cancer_rejected_records.csv.gz",
+            mime="application/gzip",
+            on_click="ignore",
+        )
+
+
+@st.fragment
+def batch_prediction():
     st.header("Upload Patient Records")
 
     uploaded_file = st.file_uploader("Upload records in CSV format.", type=["csv"])
 
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
-        st.dataframe(df.head())
+        st.dataframe(pd.read_csv(uploaded_file, nrows=5))
+        uploaded_file.seek(0)
+        explain = st.checkbox(
+            "Explain predictions", help="Add each feature's contribution to every prediction."
+        )
+        run_key = (uploaded_file.file_id, explain)
 
         if st.button("Run Batch Prediction"):
             try:
-                # Ensure the input data has the required feature columns
-                missing_cols = [c for c in FEATURE_COLUMNS if c not in df.columns]
-                if missing_cols:
-                    st.error(
-                        "The uploaded CSV is missing required columns:\n"
-                        + ", ".join(missing_cols)
-                    )
-                else:
-                    preds = []
-                    probs = []
-
-                    for _, row in df.iterrows():
-                        row_df = pd.DataFrame([row[FEATURE_COLUMNS]])
-                        result = predict_lung_cancer(row_df)
-                        preds.append(result.get("prediction", None))
-                        probs.append(result.get("probability", None))
-
-                    df_results = df.copy()
-                    df_results["PredictionLabel"] = preds
-                    df_results["Confidence"] = [
-                        f"{p:.2f}" if p is not None else ""
-                        for p in probs
-                    ]
-
-                    st.subheader("Results")
-                    st.dataframe(df_results)
-
-                    csv_buffer = df_results.to_csv(index=False).encode("utf-8")
-
-                    st.download_button(
-                        label="Download Results",
-                        data=csv_buffer,
-                        file_name="lung_cancer_batch_predictions.csv",
-                        mime="text/csv",
-                    )
-
+                # Scored chunk by chunk straight to disk, once per upload
+                results = score_upload(uploaded_file, "lung_cancer", explain=explain)
+                st.session_state["lung_cancer_batch"] = (run_key, results)
+            except ValueError as e:
+                st.error(str(e))
             except Exception as e:
                 st.error(
                     "An error occurred while running batch prediction. "
@@ -216,3 +284,19 @@ else:
                 )
                 st.exception(e)
 
+        # The results stay on screen, a page at a time, until the upload or options change
+        run = st.session_state.get("lung_cancer_batch")
+        if run is not None and run[0] == run_key and run[1].exists():
+            show_results(run[1])
+
+
+st.title("🫁 Lung Cancer Risk Prediction")
+load_model()
+
+# Mode selector similar to Alzheimer's page
+mode = st.radio("Select Prediction Mode:", ["Single Patient", "Batch Prediction"], horizontal=True)
+
+if mode == "Single Patient":
+    single_patient()
+else:
+    batch_prediction()
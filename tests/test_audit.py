@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_assignment import audit
+from mlops_assignment.config import PROJ_ROOT
+
+# Records one single-row and one 3-row lung cancer call, then exits without
+# flushing, from the main process or from a forked pool worker as the batch CLI does.
+RECORD_AND_EXIT = """
+from concurrent.futures import ProcessPoolExecutor
+import sys
+
+import pandas as pd
+
+from mlops_assignment import audit
+
+audit.identity = lambda model: ("model.pkl", 0)
+
+
+def record(rows):
+    frame = pd.DataFrame({"Age": range(rows)})
+    audit.record("lung_cancer", frame, ["Low"] * rows, [0.5] * rows, 0.01)
+
+
+if sys.argv[1] == "main":
+    record(1)
+    record(3)
+else:
+    with ProcessPoolExecutor(1) as pool:
+        list(pool.map(record, [1, 3]))
+"""
+
+
+@pytest.mark.parametrize("where", ["main", "pool worker"])
+def test_queued_records_are_written_on_exit(tmp_path, where):
+    env = {**os.environ, "AUDIT_ENABLED": "1", "AUDIT_DIR": str(tmp_path)}
+    # Longer than the process lives, so only the exit handlers write.
+    env["AUDIT_FLUSH_SECONDS"] = "60"
+    subprocess.run(
+        [sys.executable, "-c", RECORD_AND_EXIT, where], cwd=PROJ_ROOT, env=env, check=True
+    )
+
+    (single,) = (tmp_path / "lung_cancer").glob("single-*.jsonl.gz")
+    with gzip.open(single, "rt") as handle:
+        (line,) = handle.read().splitlines()
+    assert json.loads(line)["inputs"] == {"Age": 0.0}
+    (batch,) = (tmp_path / "lung_cancer").glob("batch-*.parquet")
+    assert pd.read_parquet(batch)["Age"].tolist() == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.parametrize("rows", [1, 10_000])
+def test_record_takes_microseconds_on_the_request_path(monkeypatch, tmp_path, rows):
+    monkeypatch.setattr(audit, "identity", lambda model: ("model.pkl", 0))
+    log = audit.AuditLog(tmp_path, flush_seconds=60)
+    frame = pd.DataFrame({"Age": np.arange(rows, dtype=np.float64)})
+    predictions, probabilities = ["Low"] * rows, [0.5] * rows
+    log.record("lung_cancer", frame, predictions, probabilities, 0.01)  # Starts the writer.
+
+    seconds = []
+    for _ in range(500):
+        start = time.perf_counter()
+        log.record("lung_cancer", frame, predictions, probabilities, 0.01)
+        seconds.append(time.perf_counter() - start)
+    log.close()
+
+    assert np.median(seconds) < 250e-6
+
+
+def test_calls_beyond_max_pending_are_dropped(monkeypatch, tmp_path):
+    monkeypatch.setattr(audit, "identity", lambda model: ("model.pkl", 0))
+    # The writer only wakes on flush, so nothing leaves the queue before then.
+    log = audit.AuditLog(tmp_path, flush_seconds=60, max_pending=2)
+    frame = pd.DataFrame({"Age": [70.0]})
+    for _ in range(5):
+        log.record("lung_cancer", frame, ["Low"], [0.5], 0.01)
+    assert log.dropped == {"lung_cancer": 3}
+
+    log.flush()
+    log.record("lung_cancer", frame, ["Low"], [0.5], 0.01)
+    log.close()
+
+    (single,) = (tmp_path / "lung_cancer").glob("single-*.jsonl.gz")
+    with gzip.open(single, "rt") as handle:
+        assert len(handle.read().splitlines()) == 3
+    assert log.dropped == {"lung_cancer": 3}
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_assignment import predict_lung_cancer
+from mlops_assignment.batching import MicroBatcher
+from mlops_assignment.benchmarks.synthetic import domain_frame
+from mlops_assignment.registry import MODEL_PATHS
+
+
+def predict_batch(df: pd.DataFrame):
+    # Raises ValueError on a non-numeric value and KeyError on a missing column.
+    values = df[["a", "b"]].to_numpy(dtype=float)
+    return values.sum(axis=1), values[:, 0]
+
+
+def submit_together(batcher: MicroBatcher, frames: list[pd.DataFrame]) -> list:
+    """Submit every frame at once, so they share a batch; return each result or error."""
+
+    def submit(df):
+        try:
+            return batcher.submit(df)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(frames)) as pool:
+        return list(pool.map(submit, frames))
+
+
+def test_results_are_sliced_per_caller():
+    batcher = MicroBatcher(predict_batch, max_batch_size=64, max_wait_ms=200)
+    frames = [pd.DataFrame({"a": [i, i + 1], "b": [10, 20]}) for i in range(4)]
+
+    results = submit_together(batcher, frames)
+
+    assert batcher.batches == 1
+    for df, (predictions, probabilities) in zip(frames, results):
+        np.testing.assert_array_equal(predictions, df["a"] + df["b"])
+        np.testing.assert_array_equal(probabilities, df["a"])
+
+
+@pytest.mark.parametrize(
+    "bad, error",
+    [
+        (pd.DataFrame({"a": ["abc"], "b": [1]}), ValueError),
+        (pd.DataFrame({"a": [1]}), KeyError),
+    ],
+    ids=["non-numeric value", "missing column"],
+)
+def test_bad_request_fails_only_its_caller(bad, error):
+    batcher = MicroBatcher(predict_batch, max_batch_size=64, max_wait_ms=200)
+    good = pd.DataFrame({"a": [1.0], "b": [2.0]})
+
+    good_result, bad_result = submit_together(batcher, [good, bad])
+
+    np.testing.assert_array_equal(good_result[0], [3.0])
+    assert isinstance(bad_result, error)
+
+
+def test_batched_lung_cancer_scores_match_unbatched():
+    if not MODEL_PATHS["lung_cancer"].exists():
+        pytest.skip(f"{MODEL_PATHS['lung_cancer'].name} has not been trained")
+    batcher = MicroBatcher(predict_lung_cancer._score, max_batch_size=64, max_wait_ms=200)
+    df = domain_frame("lung_cancer", 16)
+    frames = [df.iloc[[i]] for i in range(len(df))]
+
+    results = submit_together(batcher, frames)
+
+    assert batcher.batches < len(frames)
+    for frame, (predictions, probabilities) in zip(frames, results):
+        expected_predictions, expected_probabilities = predict_lung_cancer._score(frame)
+        np.testing.assert_array_equal(predictions, expected_predictions)
+        np.testing.assert_array_equal(probabilities, expected_probabilities)
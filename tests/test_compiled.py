@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_assignment import audit, compiled
+from mlops_assignment.dataset import load_dataset
+from mlops_assignment.modeling.compile import SCORE_TOLERANCE, build_onnx, build_treelite
+from mlops_assignment.modeling.export import PARITY_DATA_PATHS, build_artifact
+from mlops_assignment.registry import MODEL_PATHS, get_model
+
+# Runtime each backend's build needs, from the `compiled` extra.
+RUNTIMES = {"onnx": "onnxruntime", "treelite": "tl2cgen"}
+
+
+class FakePipeline:
+    """Stand-in for a loaded compiled pipeline, scoring column `a` or failing at runtime."""
+
+    feature_names = ["a"]
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+
+    def to_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        return df[self.feature_names].to_numpy(dtype=np.float64)
+
+    def predict(self, X: np.ndarray):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("session failed")
+        return np.where(X[:, 0] > 0, "yes", "no"), np.full(len(X), 0.9)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Serve `pipeline` as the onnx build of model `m`."""
+
+    def serve(pipeline):
+        monkeypatch.setattr(compiled, "backend", "onnx")
+        monkeypatch.setitem(compiled._pipelines, ("m", "onnx"), ("stamp", pipeline))
+        monkeypatch.setattr(compiled, "get", lambda name: compiled._pipelines[name, "onnx"][1])
+
+    return serve
+
+
+def test_scores_with_the_build(serve):
+    serve(FakePipeline())
+    labels, scores = compiled.predict("m", pd.DataFrame({"a": [1.0, -1.0]}))
+    np.testing.assert_array_equal(labels, ["yes", "no"])
+
+
+@pytest.mark.parametrize(
+    "bad, error",
+    [(pd.DataFrame({"a": ["abc"]}), ValueError), (pd.DataFrame({"b": [1.0]}), KeyError)],
+    ids=["non-numeric value", "missing column"],
+)
+def test_bad_input_raises_and_keeps_the_build(serve, bad, error):
+    pipeline = FakePipeline()
+    serve(pipeline)
+
+    with pytest.raises(error):
+        compiled.predict("m", bad)
+
+    assert compiled._pipelines["m", "onnx"][1] is pipeline
+    assert compiled.predict("m", pd.DataFrame({"a": [1.0]})) is not None
+
+
+def test_runtime_failure_falls_back_and_disables_the_build(serve):
+    serve(FakePipeline(fail=True))
+
+    assert compiled.predict("m", pd.DataFrame({"a": [1.0]})) is None
+    assert compiled._pipelines["m", "onnx"][1] is None
+
+
+@pytest.mark.parametrize("backend", list(compiled.LOADERS))
+@pytest.mark.parametrize("name", list(MODEL_PATHS))
+def test_build_matches_the_native_pipeline(name, backend, monkeypatch, tmp_path):
+    if not MODEL_PATHS[name].exists():
+        pytest.skip(f"{MODEL_PATHS[name].name} has not been trained")
+    pytest.importorskip(RUNTIMES[backend])
+    from mlops_assignment.streaming import PREDICTORS
+
+    artifact = build_artifact(get_model(name))
+    model_path = tmp_path / f"{name}{compiled.SUFFIXES[backend]}"
+    metadata = {"feature_names": artifact["feature_names"], "classes": artifact["classes"]}
+    try:
+        if backend == "onnx":
+            model, metadata["output"] = build_onnx(artifact)
+            model_path.write_bytes(model.SerializeToString())
+        else:
+            build_treelite(artifact, model_path)
+            metadata["steps"] = artifact["steps"]
+    except (ImportError, ValueError) as e:
+        pytest.skip(f"{backend} cannot compile {name}: {e}")
+    pipeline = compiled.LOADERS[backend](model_path, metadata)
+
+    monkeypatch.setattr(audit, "enabled", False)
+    monkeypatch.setattr(compiled, "backend", "native")
+    df = load_dataset(PARITY_DATA_PATHS[name])
+    labels, scores = PREDICTORS[name](df)
+    compiled_labels, compiled_scores = pipeline.predict(pipeline.to_matrix(df))
+
+    np.testing.assert_array_equal(compiled_labels, np.asarray(labels))
+    np.testing.assert_allclose(compiled_scores, np.asarray(scores), atol=SCORE_TOLERANCE)
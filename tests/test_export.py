@@ -0,0 +1,27 @@
+import joblib
+import numpy as np
+import pytest
+
+from mlops_assignment import fast_inference
+from mlops_assignment.modeling.export import _parity_frame, build_artifact
+from mlops_assignment.registry import MODEL_PATHS, get_model
+
+
+@pytest.mark.parametrize("name", list(MODEL_PATHS))
+def test_lean_artifact_matches_predict_model(name, tmp_path):
+    if not MODEL_PATHS[name].exists():
+        pytest.skip(f"{MODEL_PATHS[name].name} has not been trained")
+    from pycaret.classification import predict_model
+
+    model = get_model(name)
+    path = tmp_path / "lean.joblib"
+    joblib.dump(build_artifact(model), path)
+    lean = fast_inference.load(path)
+    df = _parity_frame(name, lean.feature_names)
+
+    reference = predict_model(model, data=df, verbose=False)
+    labels, scores = lean.predict(lean.to_matrix(df))
+
+    np.testing.assert_array_equal(labels, reference["prediction_label"].to_numpy())
+    # PyCaret rounds its scores to 4 decimals.
+    np.testing.assert_allclose(scores, reference["prediction_score"].to_numpy(), atol=1e-4)
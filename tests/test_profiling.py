@@ -0,0 +1,62 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import threading
+import time
+
+import pytest
+
+from mlops_assignment import profiling
+
+
+@pytest.fixture(autouse=True)
+def profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "_calls", defaultdict(itertools.count))
+    return tmp_path
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def stacks(profiles) -> dict[str, list[str]]:
+    """`{thread name: [leaf frame, ...]}` of the one profile written."""
+    (path,) = profiles.iterdir()
+    leaves = {}
+    for line in path.read_text().splitlines():
+        stack, _ = line.rsplit(" ", 1)
+        name, thread, *frames = stack.split(";")
+        assert name == "test"
+        leaves.setdefault(thread, []).append(frames[-1])
+    return leaves
+
+
+def test_one_in_every_call_is_sampled(monkeypatch, profiles):
+    monkeypatch.setattr(profiling, "every", 3)
+    sampled = [profiling.profile("test") is not profiling._disabled for _ in range(6)]
+    assert sampled == [True, False, False, True, False, False]
+
+    monkeypatch.setattr(profiling, "every", 0)
+    assert profiling.profile("test") is profiling._disabled
+    assert not list(profiles.iterdir())
+
+
+def test_work_handed_to_another_thread_is_sampled(profiles):
+    with ThreadPoolExecutor(1, thread_name_prefix="worker") as pool:
+        with profiling.profile("test", force=True):
+            pool.submit(busy, 0.2).result()
+
+    leaves = stacks(profiles)
+    assert any(frame.startswith("busy ") for frame in leaves["worker_0"])
+    assert threading.current_thread().name in leaves
+    assert not any(thread.startswith("profiler-") for thread in leaves)
+
+
+def test_nested_calls_are_profiled_once(profiles):
+    with profiling.profile("test", force=True):
+        assert profiling.profile("test", force=True) is profiling._disabled
+        busy(0.05)
+    assert len(list(profiles.iterdir())) == 1
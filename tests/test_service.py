@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from mlops_assignment import service
+from mlops_assignment.benchmarks.synthetic import domain_frame
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def predict(df):
+        return ["Low"] * len(df), [0.5] * len(df)
+
+    monkeypatch.setattr(service, "_predict_lung_cancer", predict)
+    return TestClient(service.app)
+
+
+def patient(seed: int = 0) -> dict:
+    return domain_frame("lung_cancer", 1, seed).astype(object).iloc[0].to_dict()
+
+
+def test_valid_batch_is_scored(client):
+    response = client.post("/predict/lung-cancer", json=[patient(0), patient(1)])
+    assert response.status_code == 200
+    assert response.json()["predictions"] == ["Low", "Low"]
+
+
+def test_numbers_sent_as_text_are_scored(client):
+    record = {name: str(value) for name, value in patient().items()}
+    response = client.post("/predict/lung-cancer", json=record)
+    assert response.status_code == 200
+
+
+def test_non_numeric_value_is_a_422_with_row_errors(client):
+    bad = {**patient(1), "Air_Pollution": "abc"}
+    response = client.post("/predict/lung-cancer", json=[patient(0), bad])
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["errors"] == [{"row": 2, "errors": "Air_Pollution abc is not a number"}]
+
+
+def test_invalid_csv_rows_are_reported(client):
+    csv = "\n".join(
+        [",".join(patient()), ",".join(map(str, patient().values())), ",".join(["0"] * 23)]
+    )
+    response = client.post(
+        "/predict/lung-cancer", content=csv, headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json()["detail"]["errors"]] == [2]
+
+
+def test_missing_column_is_a_422(client):
+    record = patient()
+    del record["Age"]
+    response = client.post("/predict/lung-cancer", json=record)
+    assert response.status_code == 422
+    assert "Age" in response.json()["detail"]
@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from mlops_assignment.benchmarks.synthetic import domain_frame
+from mlops_assignment.shadow import ShadowScorer, parse
+
+
+def test_calls_beyond_max_pending_are_dropped():
+    scorer = ShadowScorer(parse("lung_cancer=models/candidate.pkl"), workers=1, max_pending=2)
+    frame = domain_frame("lung_cancer", 1)
+    try:
+        # The spawned worker takes seconds to start, so the first two calls are still pending.
+        for _ in range(5):
+            scorer.record("lung_cancer", frame, ["Low"], [0.9], 0.01)
+        assert scorer.flush(timeout=120)
+
+        (row,) = scorer.report().to_dict("records")
+        assert row["dropped"] == 3
+        # The candidate does not exist, so the calls it was handed are counted as errors.
+        assert row["calls"] + row["errors"] == 2
+
+        scorer.record("lung_cancer", frame, ["Low"], [0.9], 0.01)
+        assert scorer.flush(timeout=120)
+        assert scorer.report()["dropped"].tolist() == [3]
+    finally:
+        scorer.close()
+
+
+def test_models_without_candidates_are_not_shadowed():
+    scorer = ShadowScorer(parse("lung_cancer=models/candidate.pkl"))
+    try:
+        scorer.record("alzheimer", pd.DataFrame({"Age": [70]}), [0], [0.9], 0.01)
+        assert scorer._pending == 0
+        assert scorer.report()["model"].tolist() == ["lung_cancer"]
+    finally:
+        scorer.close()
+
+
+def record_seconds(scorer: ShadowScorer, frame: pd.DataFrame, calls: int) -> float:
+    """Median time of `record` on the served call of `frame`."""
+    seconds = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        scorer.record("lung_cancer", frame, ["Low"], [0.9], 0.01)
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds))
+
+
+def test_shadows_add_no_latency_to_the_request_path():
+    frame = domain_frame("lung_cancer", 1)
+    off = ShadowScorer({})
+    on = ShadowScorer(parse("lung_cancer=models/candidate.pkl"), workers=1, max_pending=1000)
+    try:
+        # The pool starts in the background; the first call waits for it, not `record`.
+        start = time.perf_counter()
+        on.record("lung_cancer", frame, ["Low"], [0.9], 0.01)
+        assert time.perf_counter() - start < 0.01
+        assert on.flush(timeout=120)
+
+        without_shadows = record_seconds(off, frame, 200)
+        with_shadows = record_seconds(on, frame, 200)
+        assert on.flush(timeout=120)
+        assert with_shadows - without_shadows < 250e-6
+    finally:
+        on.close()
+
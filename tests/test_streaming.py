@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from mlops_assignment import streaming
+from mlops_assignment.benchmarks.synthetic import domain_frame
+
+
+def predict(df: pd.DataFrame):
+    return np.where(df["Smoking"] > 4, "High", "Low"), np.full(len(df), 0.75)
+
+
+def test_parquet_output_with_a_late_typed_column(tmp_path, monkeypatch):
+    monkeypatch.setitem(streaming.PREDICTORS, "lung_cancer", predict)
+    # An extra upload column that is empty in the first chunk and text in the next.
+    chunks = [
+        domain_frame("lung_cancer", 5, seed=0).assign(Notes=np.nan),
+        domain_frame("lung_cancer", 5, seed=1).assign(Notes="x"),
+    ]
+    # One invalid row per chunk, so the rejected rows are written too.
+    chunks[0].loc[0, "Age"] = 500
+    chunks[1]["Age"] = chunks[1]["Age"].astype(object)
+    chunks[1].loc[0, "Age"] = "old"
+
+    writer = streaming.ShardWriter(tmp_path / "scored.parquet")
+    rejected_writer = streaming.ShardWriter(tmp_path / "rejected.parquet")
+    first_row = 0
+    for chunk in chunks:
+        scored, rejected = streaming.score_chunk(chunk, "lung_cancer", first_row)
+        writer.write(scored)
+        rejected_writer.write(rejected)
+        first_row += len(chunk)
+    writer.close()
+    rejected_writer.close()
+
+    scored = pq.read_table(tmp_path / "scored.parquet").to_pandas()
+    assert len(scored) == 8
+    assert scored["Notes"].tolist() == [None] * 4 + ["x"] * 4
+    assert scored["Confidence"].tolist() == [0.75] * 8
+    rejected = pq.read_table(tmp_path / "rejected.parquet").to_pandas()
+    assert rejected["Age"].tolist() == ["500", "old"]
+    assert rejected["Row"].tolist() == [1, 6]
+
+
+def test_empty_first_shard_column_is_written_as_text(tmp_path):
+    writer = streaming.ShardWriter(tmp_path / "out.parquet")
+    writer.write(pd.DataFrame({"a": [1.0], "b": [None]}))
+    writer.write(pd.DataFrame({"a": [2.0], "b": ["text"]}))
+    writer.close()
+
+    out = pq.read_table(tmp_path / "out.parquet").to_pandas()
+    assert out["b"].tolist() == [None, "text"]
@@ -0,0 +1,31 @@
+import subprocess
+
+from mlops_assignment.benchmarks import suite
+
+
+def test_files_written_by_benchmark_runs_do_not_make_the_commit_dirty(monkeypatch, tmp_path):
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    results = tmp_path / "reports" / "benchmarks.json"
+    results.parent.mkdir()
+    for path in [results, tmp_path / "code.py"]:
+        path.write_text("before\n")
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "baseline")
+    monkeypatch.setattr(suite, "PROJ_ROOT", tmp_path)
+    monkeypatch.setattr(suite, "WRITTEN_BY_RUNS", [results])
+    sha = git("rev-parse", "HEAD")
+
+    results.write_text("after\n")
+    assert suite.commit_key() == sha
+
+    (tmp_path / "code.py").write_text("after\n")
+    assert suite.commit_key() == f"{sha}+dirty"
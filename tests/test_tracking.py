@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+from mlops_assignment.tracking import runs_to_prune
+
+
+def run(run_id: str, start_time: int, status: str = "FINISHED", empty: bool = False):
+    return SimpleNamespace(
+        info=SimpleNamespace(
+            run_id=run_id,
+            experiment_id="1",
+            run_name="lr",
+            status=status,
+            start_time=start_time,
+            artifact_uri=None,
+        ),
+        data=SimpleNamespace(
+            params={} if empty else {"C": "1"}, metrics={} if empty else {"AUC": 0.9}, tags={}
+        ),
+    )
+
+
+def test_registered_runs_are_kept():
+    runs = [run("failed", 1, status="FAILED"), run("empty", 2, empty=True)]
+
+    assert runs_to_prune(runs) == {"failed": "failed", "empty": "empty"}
+    assert runs_to_prune(runs, {"failed": ["lung v1"], "empty": ["lung v2"]}) == {}
+
+
+def test_registered_run_is_the_duplicate_kept():
+    runs = [run("old", 1), run("new", 2)]
+
+    assert runs_to_prune(runs) == {"old": "duplicate of new"}
+    assert runs_to_prune(runs, {"old": ["lung v1"]}) == {"new": "duplicate of old"}
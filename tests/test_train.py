@@ -0,0 +1,15 @@
+from mlops_assignment.modeling import train
+
+
+def test_holdout_is_scored_with_the_fitted_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(train, "TRAINING_CACHE_DIR", tmp_path)
+    data, unseen = train.load_training_data("lung_cancer")
+    experiment = train.setup_experiment("lung_cancer", data, n_jobs=1)
+    # As the tuned models come back from the single-threaded workers.
+    model = experiment.create_model("rf", fold=2, n_estimators=10, verbose=False)
+
+    score = train.score_holdout(experiment, model, unseen, "F1")
+
+    assert 0 <= score <= 1
+    # The copy `finalize_model` refits with all cores is unfitted, so it cannot score.
+    assert not hasattr(train._restore_n_jobs(model, -1), "estimators_")
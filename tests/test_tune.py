@@ -0,0 +1,41 @@
+from catboost import CatBoostClassifier
+from lightgbm import LGBMClassifier
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_assignment.modeling import tune
+
+
+def fold(rows: int = 400, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 4)), columns=list("abcd"))
+    y = pd.Series((X["a"] + rng.normal(scale=0.5, size=rows) > 0).astype(int))
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [
+        LGBMClassifier(n_estimators=500, verbose=-1),
+        CatBoostClassifier(n_estimators=500, verbose=False, allow_writing_files=False),
+    ],
+    ids=["lightgbm", "catboost"],
+)
+def test_early_stopping_holds_out_part_of_the_training_fold(monkeypatch, estimator):
+    X, y = fold()
+    eval_rows = []
+    fit = type(estimator).fit
+
+    def spy(self, X, y, eval_set=None, **kwargs):
+        eval_X, _ = eval_set[0] if isinstance(eval_set, list) else eval_set
+        eval_rows.append(set(eval_X.index))
+        return fit(self, X, y, eval_set=eval_set, **kwargs)
+
+    monkeypatch.setattr(type(estimator), "fit", spy)
+    fitted, rounds = tune._fit_fold(estimator, X, y, early_stopping=True, seed=0)
+
+    (held_out,) = eval_rows
+    assert held_out < set(X.index)
+    assert len(held_out) == len(X) * tune.EARLY_STOPPING_FRACTION
+    assert 0 < rounds < 500